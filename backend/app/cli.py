@@ -0,0 +1,198 @@
+"""
+Maintenance commands, run from the backend directory:
+
+    python -m app.cli rebuild-rollups [--user-id UUID]
+    python -m app.cli partition-transactions [--interval year|month]
+    python -m app.cli create-partitions [--ahead N]
+    python -m app.cli list-partitions
+    python -m app.cli detach-partitions --before YYYY-MM-DD [--drop]
+    python -m app.cli snapshot-analytics [--user-id UUID] [--run]
+    python -m app.cli run-jobs
+    python -m app.cli rebuild-search-index
+    python -m app.cli reconcile-budgets [--user-id UUID]
+    python -m app.cli materialize-recurring [--through YYYY-MM-DD]
+
+The partition commands need Postgres. Run create-partitions regularly
+(e.g. daily from cron) so new periods never land in the default partition.
+"""
+import argparse
+from datetime import date
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+# Import all models so relationships between them can be resolved
+from app.models import user, transaction, budget, rollup, job, snapshot, recurring  # noqa: F401
+from app.services import budget_spend, jobs, partitions, recurring, search, snapshots
+from app.services.rollups import rebuild_rollups
+
+def rebuild_rollups_command(args):
+    """Recompute the monthly_rollups table from the transactions table"""
+    db = SessionLocal()
+    try:
+        written = rebuild_rollups(db, user_id=args.user_id)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Rebuilt {written} monthly rollup rows")
+
+def _partitioned_session():
+    """A session on Postgres with a partitioned transactions table"""
+    db = SessionLocal()
+    if db.get_bind().dialect.name != "postgresql":
+        db.close()
+        raise SystemExit("Partitioning needs a Postgres database")
+    return db
+
+def partition_transactions_command(args):
+    """Convert the transactions table into one range-partitioned by date"""
+    db = _partitioned_session()
+    try:
+        partitions.partition_table(db.connection(), args.interval, settings.TRANSACTION_PARTITIONS_AHEAD)
+        db.commit()
+    finally:
+        db.close()
+    print(f"transactions is partitioned by {args.interval}")
+
+def create_partitions_command(args):
+    """Create partitions for the current and coming periods"""
+    db = _partitioned_session()
+    try:
+        if not partitions.is_partitioned(db.connection()):
+            raise SystemExit("transactions is not partitioned")
+        created = partitions.create_future_partitions(db.connection(), args.ahead)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Created {len(created)} partitions{': ' + ', '.join(created) if created else ''}")
+
+def list_partitions_command(args):
+    """Show the partitions of the transactions table"""
+    db = _partitioned_session()
+    try:
+        if not partitions.is_partitioned(db.connection()):
+            print("transactions is not partitioned")
+        for partition in partitions.list_partitions(db.connection()):
+            bounds = f"{partition.start} to {partition.end}" if partition.start else "default"
+            print(f"{partition.name:<28} {bounds}")
+    finally:
+        db.close()
+
+def detach_partitions_command(args):
+    """Detach (or drop) partitions that only hold dates before --before"""
+    db = _partitioned_session()
+    try:
+        names = partitions.detach_partitions(db, args.before, drop=args.drop)
+        db.commit()
+    finally:
+        db.close()
+    action = "Dropped" if args.drop else "Detached"
+    print(f"{action} {len(names)} partitions{': ' + ', '.join(names) if names else ''}")
+
+def snapshot_analytics_command(args):
+    """Queue analytics snapshot jobs for every user (or one), e.g. to backfill after a deploy"""
+    db = SessionLocal()
+    try:
+        if args.user_id:
+            snapshots.enqueue_user_snapshots(db, args.user_id)
+        else:
+            snapshots.snapshot_all(db, {})
+        db.commit()
+    finally:
+        db.close()
+    if args.run:
+        run_jobs_command(args)
+    else:
+        print("Queued snapshot jobs; the app's job runners will pick them up")
+
+def run_jobs_command(args):
+    """Run every due background job in this process, without waiting for the app's runners"""
+    ran = jobs.run_until_empty(settings.JOBS_CONCURRENCY)
+    print(f"Ran {ran} jobs")
+
+def rebuild_search_index_command(args):
+    """Rebuild the SQLite full-text search table (after VACUUM, or for databases created before it)"""
+    db = SessionLocal()
+    try:
+        if db.get_bind().dialect.name != "sqlite":
+            raise SystemExit("Postgres keeps its search indexes up to date; see migration 0008")
+        search.rebuild_sqlite_index(db.connection())
+        db.commit()
+    finally:
+        db.close()
+    print("Rebuilt the search index")
+
+def reconcile_budgets_command(args):
+    """Recompute budgets' spent amounts that have drifted from their transactions"""
+    db = SessionLocal()
+    try:
+        repaired = budget_spend.reconcile(db, user_id=args.user_id)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Repaired {repaired} budgets")
+
+def materialize_recurring_command(args):
+    """Write the recurring transactions that are due, for every user"""
+    db = SessionLocal()
+    try:
+        summary = recurring.materialize(db, through=args.through)
+    finally:
+        db.close()
+    print(f"Wrote {summary['transactions']} transactions for {summary['rules']} recurring rules")
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser with one subcommand per maintenance task"""
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = subparsers.add_parser("rebuild-rollups", help=rebuild_rollups_command.__doc__)
+    rebuild.add_argument("--user-id", type=UUID, default=None, help="Only rebuild this user's rollups")
+    rebuild.set_defaults(func=rebuild_rollups_command)
+
+    partition = subparsers.add_parser("partition-transactions", help=partition_transactions_command.__doc__)
+    partition.add_argument(
+        "--interval", choices=partitions.INTERVALS,
+        default=settings.TRANSACTION_PARTITION_INTERVAL or "year",
+    )
+    partition.set_defaults(func=partition_transactions_command)
+
+    create = subparsers.add_parser("create-partitions", help=create_partitions_command.__doc__)
+    create.add_argument("--ahead", type=int, default=settings.TRANSACTION_PARTITIONS_AHEAD, help="Future periods")
+    create.set_defaults(func=create_partitions_command)
+
+    listing = subparsers.add_parser("list-partitions", help=list_partitions_command.__doc__)
+    listing.set_defaults(func=list_partitions_command)
+
+    detach = subparsers.add_parser("detach-partitions", help=detach_partitions_command.__doc__)
+    detach.add_argument("--before", type=date.fromisoformat, required=True)
+    detach.add_argument("--drop", action="store_true", help="Drop the partitions instead of keeping them as tables")
+    detach.set_defaults(func=detach_partitions_command)
+
+    snapshot = subparsers.add_parser("snapshot-analytics", help=snapshot_analytics_command.__doc__)
+    snapshot.add_argument("--user-id", type=UUID, default=None, help="Only snapshot this user's analytics")
+    snapshot.add_argument("--run", action="store_true", help="Run the jobs here instead of leaving them to the app")
+    snapshot.set_defaults(func=snapshot_analytics_command)
+
+    run = subparsers.add_parser("run-jobs", help=run_jobs_command.__doc__)
+    run.set_defaults(func=run_jobs_command)
+
+    reindex = subparsers.add_parser("rebuild-search-index", help=rebuild_search_index_command.__doc__)
+    reindex.set_defaults(func=rebuild_search_index_command)
+
+    reconcile = subparsers.add_parser("reconcile-budgets", help=reconcile_budgets_command.__doc__)
+    reconcile.add_argument("--user-id", type=UUID, default=None, help="Only check this user's budgets")
+    reconcile.set_defaults(func=reconcile_budgets_command)
+
+    materialize = subparsers.add_parser("materialize-recurring", help=materialize_recurring_command.__doc__)
+    materialize.add_argument("--through", type=date.fromisoformat, default=None, help="Defaults to today")
+    materialize.set_defaults(func=materialize_recurring_command)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import os
 from typing import List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from sqlalchemy.engine import make_url
 
 class Settings(BaseSettings):
     # Project info
@@ -10,6 +11,34 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    # Serve the API from async routers on an AsyncEngine (asyncpg/aiosqlite)
+    # instead of sync routers running in the threadpool
+    DATABASE_ASYNC: bool = False
+    # Connection pool, per engine and worker process
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30 # Seconds to wait for a free connection
+    DATABASE_POOL_RECYCLE: int = 300 # Reopen connections older than this (seconds); -1 never
+    DATABASE_POOL_PRE_PING: bool = True # Check a connection is alive before handing it out
+    # Open DATABASE_POOL_SIZE connections at startup instead of on first use
+    DATABASE_POOL_WARM_UP: bool = True
+    # Postgres statement_timeout set on every connection (ms); 0 leaves the server default
+    DATABASE_STATEMENT_TIMEOUT_MS: int = 30000
+    # Connections go through an external pooler such as PgBouncer: open and
+    # close them per session (NullPool) and let the pooler reuse them
+    DATABASE_EXTERNAL_POOLER: bool = False
+    # Read replicas (JSON list of URLs): GET requests read from one of them,
+    # round-robin among those passing health checks; writes use DATABASE_URL
+    DATABASE_REPLICA_URLS: List[str] = []
+    DATABASE_REPLICA_HEALTH_CHECK_SECONDS: float = 5
+    # After a user writes, their reads use the primary for this long so
+    # replication lag never hides their own changes (per worker); 0 disables
+    DATABASE_READ_YOUR_WRITES_SECONDS: float = 5
+    # Postgres only: range-partition transactions by date, "year" or "month".
+    # Read by migration 0006; empty keeps a plain table
+    TRANSACTION_PARTITION_INTERVAL: str = ""
+    # Future periods `python -m app.cli create-partitions` keeps partitions for
+    TRANSACTION_PARTITIONS_AHEAD: int = 2
     
     # CORS
     CORS_ORIGINS: List[str] = ["*"]
@@ -22,6 +51,51 @@ class Settings(BaseSettings):
     # Password hashing
     PWD_CONTEXT_SCHEMES: List[str] = ["bcrypt"]
     PWD_CONTEXT_DEPRECATED: str = "auto"
+    # bcrypt runs on its own worker threads; requests beyond workers + pending
+    # get a 503. Keep the sum well below the request threadpool size (40).
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 16
+    
+    # Authenticated user cache (per process); a TTL of 0 disables it
+    USER_CACHE_TTL_SECONDS: int = 300
+    USER_CACHE_MAX_SIZE: int = 10000
+    
+    # Analytics
+    # Serve summaries from the monthly_rollups table (run
+    # `python -m app.cli rebuild-rollups` once after enabling)
+    ANALYTICS_USE_ROLLUPS: bool = True
+    # Per-process cache of summary/analytics/budget list responses, validated
+    # by each user's data version; 0 entries disables storing (ETags still work)
+    RESPONSE_CACHE_MAX_ENTRIES: int = 2048
+    RESPONSE_CACHE_TTL_SECONDS: int = 3600
+    # Serve an outdated cached response while recomputing it in the background
+    RESPONSE_CACHE_STALE_WHILE_REVALIDATE: bool = False
+    
+    # Background jobs, run by every worker process from the jobs table
+    JOBS_ENABLED: bool = True
+    JOBS_CONCURRENCY: int = 2 # Jobs running at once per process
+    JOBS_POLL_SECONDS: float = 5
+    JOBS_MAX_ATTEMPTS: int = 3
+    JOBS_RETRY_BASE_SECONDS: float = 30 # Doubles with every failed attempt
+    JOBS_TIMEOUT_SECONDS: int = 1800 # Running longer means its process died; requeue
+    JOBS_RETENTION_DAYS: int = 7 # Keep finished jobs this long
+    # Local hour after which each day's analytics snapshots are precomputed; -1 disables
+    ANALYTICS_SNAPSHOT_HOUR: int = 3
+    # Local hour after which budgets' spent amounts are checked against their transactions; -1 disables
+    BUDGET_RECONCILE_HOUR: int = 4
+    # Local hour after which each day's due recurring transactions are written; -1 disables
+    RECURRING_MATERIALIZE_HOUR: int = 0
+    RECURRING_BATCH_SIZE: int = 5000 # Rules per bulk insert and commit; each batch holds its rules locked
+    RECURRING_CATCH_UP_LIMIT: int = 100 # Occurrences a rule's save writes itself; the job writes the rest
+    
+    # Metrics
+    # Record request/DB metrics and serve them at /api/metrics (Prometheus format)
+    METRICS_ENABLED: bool = True
+    # Log statements slower than this, with parameters redacted; 0 disables
+    SQL_SLOW_QUERY_MS: int = 200
+    # Flag requests running the same statement more than this many times
+    # (N+1): raises outside production, logs a warning in production; 0 disables
+    SQL_N_PLUS_ONE_THRESHOLD: int = 20
     
     # Environment
     ENV: Optional[str] = os.getenv("ENV", "development")
@@ -52,5 +126,21 @@ class Settings(BaseSettings):
         Return the database URL with SSL configuration if necessary
         """
         return self.database_url_with_ssl
+    
+    def get_async_db_url(self, url: Optional[str] = None) -> str:
+        """
+        Return the database URL (or another one, e.g. a replica's) with the
+        async driver for its backend
+        """
+        url = make_url(url or self.get_db_url())
+        backend = url.get_backend_name()
+        if backend == "postgresql":
+            query = dict(url.query)
+            if "sslmode" in query: # asyncpg calls it ssl
+                query["ssl"] = query.pop("sslmode")
+            url = url.set(drivername="postgresql+asyncpg", query=query)
+        elif backend == "sqlite":
+            url = url.set(drivername="sqlite+aiosqlite")
+        return url.render_as_string(hide_password=False)
 
 settings = Settings()
\ No newline at end of file
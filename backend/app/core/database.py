@@ -1,28 +1,137 @@
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 
+from app.core import metrics, query_monitor, replicas
 from app.core.config import settings
 
 SQLALCHEMY_DATABASE_URL = settings.get_db_url()
 
-engine_args = {}
-if "neon.tech" in SQLALCHEMY_DATABASE_URL:
-    engine_args.update({
-        "pool_pre_ping": True,  # Check connection before using from pool
-        "pool_recycle": 300,    # Recycle connections every 5 minutes
-        "pool_size": 5,         # Maintain a pool of 5 connections
-        "max_overflow": 10      # Allow up to 10 overflow connections
-    })
-
-engine = create_engine(SQLALCHEMY_DATABASE_URL,**engine_args)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def engine_options(url: str) -> dict:
+    """
+    create_engine() arguments for the pool settings. Only queue pools
+    (Postgres, SQLite files, including aiosqlite ones) take size/overflow
+    options; in-memory SQLite keeps its single-connection pool.
+    """
+    url = make_url(url)
+    options = {"pool_pre_ping": settings.DATABASE_POOL_PRE_PING}
+    connect_args = {}
+    if settings.DATABASE_EXTERNAL_POOLER:
+        options["poolclass"] = NullPool
+        if url.get_driver_name() == "asyncpg":
+            # Transaction-mode poolers can't keep prepared statements per client
+            connect_args["statement_cache_size"] = 0
+    elif url.get_backend_name() != "sqlite" or url.database not in (None, "", ":memory:"):
+        if url.get_driver_name() == "aiosqlite":
+            # SQLAlchemy defaults aiosqlite files to a NullPool, which takes no size options
+            options["poolclass"] = AsyncAdaptedQueuePool
+        options.update({
+            "pool_size": settings.DATABASE_POOL_SIZE,
+            "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+            "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+            "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+        })
+
+    if url.get_backend_name() == "postgresql" and settings.DATABASE_STATEMENT_TIMEOUT_MS > 0:
+        # Sent as a startup parameter, so it costs no extra round trip
+        timeout = str(settings.DATABASE_STATEMENT_TIMEOUT_MS)
+        if url.get_driver_name() == "asyncpg":
+            connect_args["server_settings"] = {"statement_timeout": timeout}
+        else:
+            connect_args["options"] = f"-c statement_timeout={timeout}"
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+def warm_up_pool(engine: Engine) -> int:
+    """
+    Open the pool's steady-state connections now, so the first requests
+    reuse them instead of connecting. Returns how many were opened.
+    """
+    if not isinstance(engine.pool, QueuePool):
+        return 0
+    connections = []
+    try:
+        for _ in range(engine.pool.size()):
+            connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+async def warm_up_async_pool(engine: AsyncEngine) -> int:
+    """warm_up_pool for an AsyncEngine"""
+    if not isinstance(engine.pool, QueuePool):
+        return 0
+    connections = []
+    try:
+        for _ in range(engine.pool.size()):
+            connections.append(await engine.connect())
+    finally:
+        for connection in connections:
+            await connection.close()
+    return len(connections)
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
+# Sessions use the primary unless get_db routes a request's reads to a replica
+SessionLocal = sessionmaker(class_=replicas.RoutingSession, autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-def get_db():
+def instrument(engine, name: str):
+    """Hook statement timing (and metrics, when enabled) into an engine"""
+    if settings.METRICS_ENABLED:
+        metrics.instrument_engine(engine, name)
+    else:
+        query_monitor.instrument_engine(engine, name)
+
+instrument(engine, "default")
+
+# Async engine for DATABASE_ASYNC mode. Objects stay loaded after commit,
+# since expired attributes can't be lazy-loaded outside an await.
+async_engine = None
+AsyncSessionLocal = None
+if settings.DATABASE_ASYNC:
+    async_engine = create_async_engine(settings.get_async_db_url(), **engine_options(settings.get_async_db_url()))
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, sync_session_class=replicas.RoutingSession, autoflush=False, expire_on_commit=False
+    )
+    instrument(async_engine.sync_engine, "async")
+
+# Read replicas for the mode being served, or None
+replica_set = None
+if settings.DATABASE_REPLICA_URLS:
+    replica_engines = {}
+    for index, url in enumerate(settings.DATABASE_REPLICA_URLS, 1):
+        name = f"replica{index}"
+        if settings.DATABASE_ASYNC:
+            url = settings.get_async_db_url(url)
+            replica_engines[name] = create_async_engine(url, **engine_options(url))
+            instrument(replica_engines[name].sync_engine, name)
+        else:
+            replica_engines[name] = create_engine(url, **engine_options(url))
+            instrument(replica_engines[name], name)
+    replica_set = replicas.ReplicaSet(replica_engines)
+
+def get_db(request: Request):
+    """
+    The request's session. FastAPI resolves a dependency once per request,
+    so get_current_user and the handler share this session and its
+    connection; depend on this function rather than wrapping it. GET
+    requests read from a replica when any are configured.
+    """
     db = SessionLocal()
+    replicas.route_reads(db, request.method, replica_set)
     try:
         yield db
     finally:
         db.close()
-    
\ No newline at end of file
+
+async def get_async_db(request: Request):
+    """The request's AsyncSession (see get_db)"""
+    async with AsyncSessionLocal() as db:
+        replicas.route_reads(db, request.method, replica_set)
+        yield db
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+class PasswordHashingPool:
+    """
+    Runs bcrypt hashing/verification on a fixed set of worker threads (bcrypt
+    releases the GIL while it works). At most `workers + max_pending` calls
+    can be running or queued; beyond that callers get an immediate 503 rather
+    than queuing behind a login storm and tying up request threads.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.wait_seconds_total = 0.0 # Time spent queued for a worker
+        self.hash_seconds_total = 0.0 # Time spent hashing
+        self.hash_seconds_max = 0.0
+
+    def _submit(self, fn: Callable, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many sign-ins in progress, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        with self._lock:
+            self.in_flight += 1
+        future = self._executor.submit(self._timed, time.perf_counter(), fn, *args)
+        # Free the slot when the work finishes, even if the caller has gone away
+        future.add_done_callback(self._release)
+        return future
+
+    def _timed(self, submitted: float, fn: Callable, *args) -> Any:
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.completed += 1
+                self.wait_seconds_total += started - submitted
+                self.hash_seconds_total += elapsed
+                self.hash_seconds_max = max(self.hash_seconds_max, elapsed)
+
+    def _release(self, _future: Future):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def call(self, fn: Callable, *args) -> Any:
+        """Run fn on the pool and wait for it (for sync route handlers)"""
+        return self._submit(fn, *args).result()
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Run fn on the pool without blocking the event loop"""
+        return await asyncio.wrap_future(self._submit(fn, *args))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "in_flight": self.in_flight,
+                "wait_seconds_total": self.wait_seconds_total,
+                "hash_seconds_total": self.hash_seconds_total,
+                "hash_seconds_max": self.hash_seconds_max,
+            }
+
+password_pool = PasswordHashingPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
@@ -0,0 +1,253 @@
+"""
+In-process request, database and cache metrics, rendered in the Prometheus
+text format at /api/metrics. Each worker process reports its own values.
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.engine import Engine
+
+from app.core import query_monitor
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+QUERY_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names: Sequence[str], values: Sequence) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [count per bucket (+Inf last), sum]
+        self._values: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        names = self.labelnames + ("le",)
+        with self._lock:
+            for labels, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _format_value(bound)
+                    lines.append(f"{self.name}_bucket{_format_labels(names, labels + (le,))} {cumulative}")
+                label_text = _format_labels(self.labelnames, labels)
+                lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+                lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+def gauge_lines(name: str, documentation: str, samples: Iterable[Tuple[dict, float]], kind: str = "gauge") -> List[str]:
+    """Render values read at scrape time, e.g. pool or cache state"""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_format_labels(tuple(labels), tuple(labels.values()))} {_format_value(value)}")
+    return lines
+
+REQUESTS = Counter("http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time to send the full response", ("method", "route"), LATENCY_BUCKETS
+)
+QUERIES_PER_REQUEST = Histogram(
+    "http_request_db_queries", "SQL statements executed per request", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_seconds", "Time spent executing SQL per request", ("method", "route"), LATENCY_BUCKETS
+)
+DB_QUERIES = Counter("db_queries_total", "SQL statements executed", ("pool",))
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "Time to execute one SQL statement", ("pool",), QUERY_LATENCY_BUCKETS
+)
+POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time to get a connection from the pool", ("pool",), POOL_WAIT_BUCKETS
+)
+
+_engines: Dict[str, Engine] = {}
+_collectors: List[Callable[[], List[str]]] = []
+
+def instrument_engine(engine: Engine, name: str):
+    """
+    Count and time an engine's statements and time its pool checkouts (for
+    an AsyncEngine pass its sync_engine). Per-request tallies come from
+    app.core.query_monitor, which this hooks into.
+    """
+    _engines[name] = engine
+    labels = (name,)
+
+    def observe(elapsed: float):
+        DB_QUERIES.inc(labels)
+        DB_QUERY_LATENCY.observe(labels, elapsed)
+
+    query_monitor.instrument_engine(engine, name, on_statement=observe)
+
+    # Sessions, and AsyncEngine through its sync_engine, get connections
+    # from engine.connect(): the pool wait plus any connect or pre-ping
+    connect = engine.connect
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            POOL_WAIT.observe(labels, time.perf_counter() - started)
+
+    engine.connect = timed_connect
+
+def register_collector(collector: Callable[[], List[str]]):
+    """Add a function returning metric lines computed at scrape time"""
+    _collectors.append(collector)
+
+def cache_collector(name: str, cache) -> Callable[[], List[str]]:
+    """Collector for an app.utils.cache.TTLCache"""
+    def collect() -> List[str]:
+        stats = cache.stats()
+        labels = {"cache": name}
+        return (
+            gauge_lines("cache_hits_total", "Cache lookups that found an entry", [(labels, stats["hits"])], "counter")
+            + gauge_lines("cache_misses_total", "Cache lookups that found nothing", [(labels, stats["misses"])], "counter")
+            + gauge_lines("cache_entries", "Entries currently cached", [(labels, stats["size"])])
+        )
+    return collect
+
+def password_pool_collector(pool) -> Callable[[], List[str]]:
+    """Collector for an app.core.hashing.PasswordHashingPool"""
+    def collect() -> List[str]:
+        stats = pool.stats()
+        return (
+            gauge_lines(
+                "password_hash_calls_total",
+                "bcrypt calls by outcome",
+                [({"outcome": "completed"}, stats["completed"]), ({"outcome": "rejected"}, stats["rejected"])],
+                "counter",
+            )
+            + gauge_lines("password_hash_in_flight", "bcrypt calls running or queued", [({}, stats["in_flight"])])
+            + gauge_lines("password_hash_seconds_total", "Time spent hashing", [({}, stats["hash_seconds_total"])], "counter")
+            + gauge_lines("password_hash_wait_seconds_total", "Time queued for a worker", [({}, stats["wait_seconds_total"])], "counter")
+            + gauge_lines("password_hash_seconds_max", "Slowest single bcrypt call", [({}, stats["hash_seconds_max"])])
+        )
+    return collect
+
+def replica_collector(replica_set) -> Callable[[], List[str]]:
+    """Collector for an app.core.replicas.ReplicaSet"""
+    def collect() -> List[str]:
+        return gauge_lines(
+            "db_replica_healthy",
+            "Whether a read replica passed its last health check",
+            [({"pool": replica.name}, int(replica.healthy)) for replica in replica_set.replicas],
+        )
+    return collect
+
+def _pool_lines() -> List[str]:
+    checked_out, overflow, size = [], [], []
+    for name, engine in _engines.items():
+        pool = engine.pool
+        labels = {"pool": name}
+        if hasattr(pool, "checkedout"):
+            checked_out.append((labels, pool.checkedout()))
+        if hasattr(pool, "overflow"):
+            overflow.append((labels, max(pool.overflow(), 0)))
+        if hasattr(pool, "size"):
+            size.append((labels, pool.size()))
+    return (
+        gauge_lines("db_pool_checked_out", "Connections currently checked out", checked_out)
+        + gauge_lines("db_pool_overflow", "Connections open beyond the pool size", overflow)
+        + gauge_lines("db_pool_size", "Configured pool size", size)
+    )
+
+def render() -> str:
+    lines = []
+    for metric in (REQUESTS, REQUEST_LATENCY, QUERIES_PER_REQUEST, REQUEST_DB_TIME, DB_QUERIES, DB_QUERY_LATENCY, POOL_WAIT):
+        lines.extend(metric.render())
+    lines.extend(_pool_lines())
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording count, latency, query count and SQL time
+    per route template (e.g. /api/transactions/{transaction_id}), so IDs
+    don't create new series. Statement tallies come from
+    query_monitor.QueryContextMiddleware, which must wrap this one.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = query_monitor.current_request.get() or query_monitor.RequestQueries(scope)
+        started = time.perf_counter()
+        status_code = 500
+        finished = None
+        query_count, query_seconds = 0, 0.0
+
+        async def send_wrapper(message):
+            nonlocal status_code, finished, query_count, query_seconds
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                # Background tasks run after this; they aren't part of the latency
+                finished = time.perf_counter()
+                query_count, query_seconds = queries.count, queries.seconds
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if finished is None:
+                finished = time.perf_counter()
+                query_count, query_seconds = queries.count, queries.seconds
+            labels = (scope["method"], queries.route)
+            REQUESTS.inc(labels + (str(status_code),))
+            REQUEST_LATENCY.observe(labels, finished - started)
+            QUERIES_PER_REQUEST.observe(labels, query_count)
+            REQUEST_DB_TIME.observe(labels, query_seconds)
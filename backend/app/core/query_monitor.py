@@ -0,0 +1,154 @@
+"""
+Per-statement SQL timing. Every statement is timed and attributed to the
+route serving the current request; slow statements are logged with their
+parameters redacted, and requests that repeat one statement many times
+(the N+1 pattern) are flagged.
+"""
+import logging
+import re
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Set
+
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.utils.environment import is_production
+
+logger = logging.getLogger("app.sql")
+
+# Longest statement text written to the log
+MAX_LOGGED_STATEMENT = 2000
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$])\d+(?:\.\d+)?\b")
+_PLACEHOLDER = r"(?:%\(\w+\)s|%s|\?|\$\d+|:\w+)"
+_PLACEHOLDER_LIST = re.compile(r"\(\s*" + _PLACEHOLDER + r"(?:\s*,\s*" + _PLACEHOLDER + r")+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+class NPlusOneError(RuntimeError):
+    """A request ran the same statement more than SQL_N_PLUS_ONE_THRESHOLD times"""
+
+class RequestQueries:
+    """Per-request statement tallies, shared with threadpool workers through a ContextVar"""
+    __slots__ = ("scope", "count", "seconds", "repeats", "flagged")
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.scope = scope
+        self.count = 0
+        self.seconds = 0.0
+        self.repeats: Dict[str, int] = {} # normalized statement -> executions
+        self.flagged: Set[str] = set()
+
+    @property
+    def route(self) -> str:
+        """Route template serving the request, once routing has happened"""
+        route = self.scope.get("route") if self.scope else None
+        return getattr(route, "path", None) or "unmatched"
+
+current_request: ContextVar[Optional[RequestQueries]] = ContextVar("current_request", default=None)
+
+@lru_cache(maxsize=2048)
+def normalize(statement: str) -> str:
+    """
+    Reduce a statement to its shape: literals become ? and IN lists of any
+    length collapse to (?), so repeated lookups with different values match
+    """
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _PLACEHOLDER_LIST.sub("(?)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+def _parameter_count(parameters) -> int:
+    if not parameters:
+        return 0
+    if isinstance(parameters, (list, tuple)) and parameters and isinstance(parameters[0], (list, tuple, dict)):
+        return sum(len(row) for row in parameters)
+    return len(parameters)
+
+def _log_slow(pool: str, route: str, elapsed: float, statement: str, parameters):
+    text = _WHITESPACE.sub(" ", statement).strip()
+    if len(text) > MAX_LOGGED_STATEMENT:
+        text = text[:MAX_LOGGED_STATEMENT] + "..."
+    logger.warning(
+        "slow query: %.1f ms on %s (pool %s, %d parameters redacted): %s",
+        elapsed * 1000, route, pool, _parameter_count(parameters), text,
+    )
+
+def _check_repeats(queries: RequestQueries, statement: str):
+    shape = normalize(statement)
+    executions = queries.repeats.get(shape, 0) + 1
+    queries.repeats[shape] = executions
+    if executions <= settings.SQL_N_PLUS_ONE_THRESHOLD or shape in queries.flagged:
+        return
+    queries.flagged.add(shape)
+    message = (
+        f"N+1 query pattern on {queries.route}: statement run more than "
+        f"{settings.SQL_N_PLUS_ONE_THRESHOLD} times in one request: {shape[:MAX_LOGGED_STATEMENT]}"
+    )
+    if not is_production():
+        raise NPlusOneError(message)
+    logger.warning(message)
+
+def instrument_engine(engine: Engine, name: str, on_statement: Optional[Callable[[float], None]] = None):
+    """
+    Time every statement an engine runs (for an AsyncEngine pass its
+    sync_engine) and feed the request tallies, slow-query log and N+1
+    check. on_statement, if given, receives each statement's duration.
+
+    This wraps the dialect's execute methods (the point where the cursor
+    executes) rather than using before/after_cursor_execute events: any
+    engine event listener moves SQLAlchemy onto its slower event-dispatch
+    path for every connection and statement (see
+    benchmarks/metrics_overhead.py).
+    """
+    dialect = engine.dialect
+
+    def timed(execute, batch: bool, has_parameters: bool):
+        def wrapper(cursor, statement, *args):
+            # args is (parameters, context) or, without parameters, (context,)
+            queries = current_request.get()
+            context = args[-1] if args else None
+            # Batched inserts (executemany, insertmanyvalues) repeat a
+            # statement by design and aren't N+1 lookups
+            if queries is not None and settings.SQL_N_PLUS_ONE_THRESHOLD > 0 and not batch and not getattr(context, "executemany", False):
+                _check_repeats(queries, statement)
+            started = time.perf_counter()
+            try:
+                return execute(cursor, statement, *args)
+            finally:
+                elapsed = time.perf_counter() - started
+                if queries is not None:
+                    queries.count += 1
+                    queries.seconds += elapsed
+                if on_statement is not None:
+                    on_statement(elapsed)
+                if settings.SQL_SLOW_QUERY_MS and elapsed * 1000 >= settings.SQL_SLOW_QUERY_MS:
+                    route = queries.route if queries is not None else "-"
+                    parameters = args[0] if has_parameters and args else None
+                    _log_slow(name, route, elapsed, statement, parameters)
+        return wrapper
+
+    dialect.do_execute = timed(dialect.do_execute, batch=False, has_parameters=True)
+    dialect.do_executemany = timed(dialect.do_executemany, batch=True, has_parameters=True)
+    dialect.do_execute_no_params = timed(dialect.do_execute_no_params, batch=False, has_parameters=False)
+
+class QueryContextMiddleware:
+    """
+    Pure ASGI middleware giving each HTTP request its own statement tallies.
+    Add it after (outside) MetricsMiddleware, which reads them.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_request.set(RequestQueries(scope))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_request.reset(token)
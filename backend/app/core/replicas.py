@@ -0,0 +1,131 @@
+"""
+Read replica routing. Requests with a read-only method (GET, HEAD) run their
+queries on one replica, picked round-robin among those passing health
+checks; all other requests, and any flush or INSERT/UPDATE/DELETE, use the
+primary. For DATABASE_READ_YOUR_WRITES_SECONDS after a user's request
+writes, that user's reads also use the primary, so replication lag never
+hides their own changes. The window is tracked per worker process.
+"""
+import asyncio
+import itertools
+import logging
+from typing import Dict, List, Optional, Union
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+READ_ONLY_METHODS = frozenset({"GET", "HEAD"})
+
+# user id -> True while the user's reads must use the primary
+recent_writers = TTLCache(maxsize=100000, ttl=settings.DATABASE_READ_YOUR_WRITES_SECONDS)
+
+class Replica:
+    __slots__ = ("name", "engine", "healthy")
+
+    def __init__(self, name: str, engine: Union[Engine, AsyncEngine]):
+        self.name = name
+        self.engine = engine
+        self.healthy = True
+
+    @property
+    def bind(self) -> Engine:
+        """What Session.get_bind returns: the sync engine, also for an AsyncEngine"""
+        return self.engine.sync_engine if isinstance(self.engine, AsyncEngine) else self.engine
+
+class ReplicaSet:
+    """The configured replicas and their health"""
+
+    def __init__(self, engines: Dict[str, Union[Engine, AsyncEngine]]):
+        self.replicas: List[Replica] = [Replica(name, engine) for name, engine in engines.items()]
+        self._next = itertools.count()
+
+    def choose(self) -> Optional[Engine]:
+        """The next healthy replica's bind, or None to use the primary"""
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._next) % len(healthy)].bind
+
+    async def check(self, timeout: float):
+        """Ping every replica and update its health"""
+        for replica in self.replicas:
+            try:
+                if isinstance(replica.engine, AsyncEngine):
+                    await asyncio.wait_for(_ping_async(replica.engine), timeout)
+                else:
+                    await asyncio.wait_for(asyncio.to_thread(_ping, replica.engine), timeout)
+                healthy = True
+            except Exception as exc:
+                healthy = False
+                if replica.healthy:
+                    logger.warning("Replica %s failed its health check, reading from others: %s", replica.name, exc)
+            if healthy and not replica.healthy:
+                logger.info("Replica %s is healthy again", replica.name)
+            replica.healthy = healthy
+
+    async def monitor(self):
+        """Check the replicas every DATABASE_REPLICA_HEALTH_CHECK_SECONDS until cancelled"""
+        interval = settings.DATABASE_REPLICA_HEALTH_CHECK_SECONDS
+        while True:
+            await self.check(timeout=interval)
+            await asyncio.sleep(interval)
+
+def _ping(engine: Engine):
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+async def _ping_async(engine: AsyncEngine):
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+class RoutingSession(Session):
+    """
+    A Session that runs its queries on info["replica"] when set. Flushes
+    and DML statements go to the primary and mark the session as having
+    written; its later queries then stay on the primary too.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or getattr(clause, "is_dml", False):
+            self.info["wrote"] = True
+        replica = self.info.get("replica")
+        if replica is not None and not self.info.get("wrote"):
+            return replica
+        return super().get_bind(mapper, clause=clause, **kw)
+
+    def commit(self):
+        super().commit()
+        if self.info.get("wrote") and self.info.get("user_id") is not None:
+            recent_writers.set(self.info["user_id"], True)
+
+def _sync_session(db) -> Session:
+    """The Session behind an AsyncSession, or the session itself"""
+    return getattr(db, "sync_session", db)
+
+def route_reads(db, method: str, replica_set: Optional[ReplicaSet]):
+    """Send a request's reads to a replica if its method is read-only"""
+    if replica_set is not None and method in READ_ONLY_METHODS:
+        replica = replica_set.choose()
+        if replica is not None:
+            _sync_session(db).info["replica"] = replica
+
+def bind_user(db, user_id):
+    """
+    Note whose request this is: the session's writes open that user's
+    read-your-writes window, and reads inside the window use the primary
+    """
+    info = _sync_session(db).info
+    info["user_id"] = user_id
+    if recent_writers.get(user_id):
+        info.pop("replica", None)
+
+def use_primary(db) -> bool:
+    """Move the session's reads to the primary; False if they already were"""
+    return _sync_session(db).info.pop("replica", None) is not None
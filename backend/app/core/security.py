@@ -1,15 +1,20 @@
 from datetime import datetime, timedelta
 from typing import Any, Optional, Union
+from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
 
+from app.core import replicas
 from app.core.config import settings
 from app.models.user import User
-from app.core.database import SessionLocal
+from app.core.database import get_async_db, get_db
+from app.utils.cache import TTLCache
 
 # Password hashing
 pwd_context = CryptContext(
@@ -20,6 +25,10 @@ pwd_context = CryptContext(
 # OAuth2 scheme for tokens
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# Detached User snapshots keyed by token subject, so repeated requests skip
+# the user lookup. Call invalidate_cached_user() after changing a user.
+user_cache = TTLCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify that the plain password matches the hashed password
@@ -50,40 +59,85 @@ def create_access_token(subject: Union[str, Any], expires_delta: Optional[timede
     
     return encoded_jwt
 
-def get_db():
-    """
-    Get a database session
-    """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-async def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
-) -> User:
-    """
-    Get the current user from the token
-    """
-    credentials_exception = HTTPException(
+def credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+def decode_user_id(token: str) -> UUID:
+    """
+    Get the user ID from a token, or raise a 401
+    """
     try:
         payload = jwt.decode(
             token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
         )
         user_id: str = payload.get("sub")
         if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+            raise credentials_exception()
+        return UUID(user_id)
+    except (JWTError, ValueError):
+        raise credentials_exception()
+
+def cache_user(user: User):
+    """
+    Cache a detached copy of a loaded user; the session's own instance
+    stays private to its request
+    """
+    snapshot = User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+    make_transient_to_detached(snapshot)
+    user_cache.set(user.id, snapshot)
+
+def invalidate_cached_user(user_id):
+    user_cache.invalidate(user_id)
+
+def get_current_user(
+    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+) -> User:
+    """
+    Get the current user from the token. A plain def, so FastAPI runs the
+    lookup in the threadpool instead of blocking the event loop. The user
+    belongs to the request's session (get_db is resolved once per request),
+    so handlers can modify and commit it directly.
+    """
+    user_id = decode_user_id(token)
+    replicas.bind_user(db, user_id)
+    
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        # Copy the snapshot into this session without a query
+        return db.merge(cached, load=False)
+    
+    user = db.get(User, user_id)
+    if user is None and replicas.use_primary(db):
+        # A just-created user may not have reached the replica yet
+        user = db.get(User, user_id)
+    if user is None:
+        raise credentials_exception()
+    
+    cache_user(user)
+    return user
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)
+) -> User:
+    """
+    Get the current user from the token (async session)
+    """
+    user_id = decode_user_id(token)
+    replicas.bind_user(db, user_id)
+    
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return await db.merge(cached, load=False)
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
+    if user is None and replicas.use_primary(db):
+        user = await db.get(User, user_id)
     if user is None:
-        raise credentials_exception
+        raise credentials_exception()
     
-    return user
\ No newline at end of file
+    cache_user(user)
+    return user
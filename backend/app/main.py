@@ -1,18 +1,81 @@
-from fastapi import FastAPI, Depends
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
 
+from app.core import database, metrics, query_monitor
 from app.core.config import settings
-from app.core.database import engine, SessionLocal, Base
-from app.routes import auth, transactions, analytics, budgets
+from app.core.hashing import password_pool
+from app.core.security import user_cache
+# Import all models so create_all knows every table
+from app.models import user, transaction, budget, rollup, job, snapshot, recurring  # noqa: F401
+from app.services import budget_spend, jobs, snapshots  # noqa: F401 (budget_spend and snapshots register job handlers)
+from app.services.response_cache import response_cache
 from app.utils.environment import load_env_file, is_development
 
 # Load environment variables from .env file
 load_env_file()
 
-# Create database tables if in development mode
-if is_development():
-    Base.metadata.create_all(bind=engine)
+if settings.DATABASE_ASYNC:
+    from app.routes import (
+        auth_async as auth,
+        transactions_async as transactions,
+        analytics_async as analytics,
+        budgets_async as budgets,
+        recurring_async as recurring,
+    )
+else:
+    from app.routes import auth, transactions, analytics, budgets, recurring
+
+# Postgres tables are managed by Alembic migrations: run `alembic upgrade
+# head`. SQLite databases (development) are created from the models at startup.
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Open the connection pool before serving, so the first requests after a
+    deploy don't pay for connection setup, health-check read replicas and
+    run background jobs while serving, and close the pools on shutdown
+    """
+    if database.engine.dialect.name == "sqlite":
+        await run_in_threadpool(database.Base.metadata.create_all, database.engine)
+    if settings.DATABASE_POOL_WARM_UP:
+        try:
+            if settings.DATABASE_ASYNC:
+                opened = await database.warm_up_async_pool(database.async_engine)
+            else:
+                opened = await run_in_threadpool(database.warm_up_pool, database.engine)
+            logger.info("Opened %d database connections", opened)
+        except SQLAlchemyError as exc:
+            # Serve anyway; requests connect on demand once the database is back
+            logger.warning("Database pool warm-up failed: %s", exc)
+    monitor = None
+    if database.replica_set is not None:
+        monitor = asyncio.create_task(database.replica_set.monitor())
+    runner = None
+    if settings.JOBS_ENABLED:
+        runner = asyncio.create_task(jobs.JobRunner(settings.JOBS_CONCURRENCY, settings.JOBS_POLL_SECONDS).run())
+    yield
+    if runner is not None:
+        runner.cancel()
+    if database.replica_set is not None:
+        monitor.cancel()
+        for replica in database.replica_set.replicas:
+            if isinstance(replica.engine, AsyncEngine):
+                await replica.engine.dispose()
+            else:
+                replica.engine.dispose()
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
+    database.engine.dispose()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -21,6 +84,7 @@ app = FastAPI(
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     openapi_url="/api/openapi.json",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -30,21 +94,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
-# Get database session
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Added after CORS so it wraps it and times the whole request
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+    metrics.register_collector(metrics.cache_collector("user", user_cache))
+    metrics.register_collector(metrics.cache_collector("response", response_cache))
+    metrics.register_collector(metrics.password_pool_collector(password_pool))
+    if database.replica_set is not None:
+        metrics.register_collector(metrics.replica_collector(database.replica_set))
+
+# Per-request SQL tallies for the slow-query log, N+1 check and metrics.
+# Added last: it must wrap MetricsMiddleware, which reads them.
+app.add_middleware(query_monitor.QueryContextMiddleware)
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(transactions.router, prefix="/api/transactions", tags=["Transactions"])
 app.include_router(analytics.router, prefix="/api/analytics", tags=["Analytics"])
 app.include_router(budgets.router, prefix="/api/budgets", tags=["Budgets"])
+app.include_router(recurring.router, prefix="/api/recurring", tags=["Recurring"])
 
 @app.get("/api/health", tags=["Health"])
 def health_check():
@@ -53,6 +124,14 @@ def health_check():
     """
     return {"status": "ok", "version": settings.PROJECT_VERSION, "environment": settings.ENV}
 
+if settings.METRICS_ENABLED:
+    @app.get("/api/metrics", tags=["Health"], response_class=PlainTextResponse)
+    def get_metrics():
+        """
+        Request, database and cache metrics for this worker in Prometheus text format
+        """
+        return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=is_development())
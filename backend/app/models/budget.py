@@ -1,6 +1,6 @@
 import uuid
-from sqlalchemy import Column, String, Float, Date, DateTime, ForeignKey, Enum as SQLAlchemyEnum
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import DDL, Column, String, Float, Date, DateTime, ForeignKey, Index, Uuid, Enum as SQLAlchemyEnum, event, text
+from sqlalchemy.engine import Connection
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -8,6 +8,65 @@ import enum
 from app.core.database import Base
 from app.models.user import User # Import User for relationship
 
+# A user's budgets for one category may not overlap (both end dates count).
+# Violations name OVERLAP_CONSTRAINT in the database error whichever guard
+# raised them.
+OVERLAP_CONSTRAINT = "budgets_no_overlap"
+
+# Postgres with btree_gist: an exclusion constraint over a GiST index
+POSTGRES_EXCLUDE_DDL = (
+    f"ALTER TABLE budgets ADD CONSTRAINT {OVERLAP_CONSTRAINT} EXCLUDE USING gist "
+    "(user_id WITH =, category WITH =, daterange(start_date, end_date, '[]') WITH &&)"
+)
+
+# Everywhere else a trigger checks the one budget that could overlap: as
+# the category's budgets do not overlap, the latest one starting on or
+# before the new end date also ends last. That is a single probe of
+# ix_budgets_user_id_category_start_date_end_date, however many there are.
+# On Postgres a per-(user, category) advisory lock makes concurrent writers
+# see each other's rows.
+POSTGRES_OVERLAP_TRIGGER_DDL = [
+    "CREATE OR REPLACE FUNCTION budgets_prevent_overlap() RETURNS trigger LANGUAGE plpgsql AS $$ "
+    "BEGIN "
+    "PERFORM pg_advisory_xact_lock(hashtextextended(NEW.user_id::text || '/' || NEW.category, 0)); "
+    "IF EXISTS (SELECT 1 FROM (SELECT end_date FROM budgets "
+    "WHERE user_id = NEW.user_id AND category = NEW.category AND start_date <= NEW.end_date "
+    "AND id IS DISTINCT FROM NEW.id ORDER BY start_date DESC LIMIT 1) latest "
+    "WHERE latest.end_date >= NEW.start_date) THEN "
+    f"RAISE EXCEPTION 'budget overlaps another ({OVERLAP_CONSTRAINT})' "
+    f"USING ERRCODE = 'exclusion_violation', CONSTRAINT = '{OVERLAP_CONSTRAINT}'; "
+    "END IF; "
+    "RETURN NEW; "
+    "END $$",
+    f"CREATE TRIGGER {OVERLAP_CONSTRAINT} BEFORE INSERT OR UPDATE OF user_id, category, start_date, end_date "
+    "ON budgets FOR EACH ROW EXECUTE FUNCTION budgets_prevent_overlap()",
+]
+
+_SQLITE_OVERLAP = (
+    "WHEN EXISTS (SELECT 1 FROM (SELECT end_date FROM budgets "
+    "WHERE user_id = new.user_id AND category = new.category AND start_date <= new.end_date "
+    "AND id IS NOT new.id ORDER BY start_date DESC LIMIT 1) "
+    "WHERE end_date >= new.start_date) "
+    f"BEGIN SELECT RAISE(ABORT, 'budget overlaps another ({OVERLAP_CONSTRAINT})'); END"
+)
+SQLITE_OVERLAP_DDL = [
+    f"CREATE TRIGGER IF NOT EXISTS {OVERLAP_CONSTRAINT}_insert BEFORE INSERT ON budgets {_SQLITE_OVERLAP}",
+    f"CREATE TRIGGER IF NOT EXISTS {OVERLAP_CONSTRAINT}_update "
+    f"BEFORE UPDATE OF user_id, category, start_date, end_date ON budgets {_SQLITE_OVERLAP}",
+]
+
+def has_btree_gist(conn: Connection) -> bool:
+    return conn.execute(text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'btree_gist')")).scalar()
+
+def create_overlap_guard(conn: Connection) -> str:
+    """Add the overlap check to a Postgres budgets table; returns which kind was used"""
+    if has_btree_gist(conn):
+        conn.execute(text(POSTGRES_EXCLUDE_DDL))
+        return "exclusion constraint"
+    for statement in POSTGRES_OVERLAP_TRIGGER_DDL:
+        conn.execute(text(statement))
+    return "trigger"
+
 class BudgetPeriod(str, enum.Enum):
     MONTHLY = "monthly"
     YEARLY = "yearly"
@@ -15,9 +74,13 @@ class BudgetPeriod(str, enum.Enum):
 
 class Budget(Base):
     __tablename__ = "budgets"
+    __table_args__ = (
+        # Per-user listings and the per-category overlap check
+        Index("ix_budgets_user_id_category_start_date_end_date", "user_id", "category", "start_date", "end_date"),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=False)
     name = Column(String, nullable=False) # e.g., "Monthly Groceries", "Vacation Fund 2025"
     category = Column(String, nullable=False) # Corresponds to transaction categories
     amount = Column(Float, nullable=False)
@@ -27,6 +90,8 @@ class Budget(Base):
     # For custom, these define the budget's active period.
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
+    # Expenses in the category and period, kept current by app.services.budget_spend
+    spent_amount = Column(Float, nullable=False, default=0.0, server_default="0")
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -36,3 +101,10 @@ class Budget(Base):
     def __repr__(self):
         return f"<Budget {self.name} - {self.category}: {self.amount}>"
 
+for statement in SQLITE_OVERLAP_DDL:
+    event.listen(Budget.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+@event.listens_for(Budget.__table__, "after_create")
+def _create_postgres_overlap_guard(target, connection, **kw):
+    if connection.dialect.name == "postgresql":
+        create_overlap_guard(connection)
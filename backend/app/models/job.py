@@ -0,0 +1,39 @@
+import uuid
+from sqlalchemy import Column, String, Integer, DateTime, Text, JSON, Index, Uuid, Enum
+from sqlalchemy.sql import func
+import enum
+
+from app.core.database import Base
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+class Job(Base):
+    """
+    A unit of background work run by app.services.jobs. Jobs with a key
+    are enqueued at most once per key.
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # The runner's poll: due queued jobs, oldest first
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String, nullable=False) # Handler name, e.g. "snapshot_user"
+    payload = Column(JSON, nullable=False, default=dict)
+    key = Column(String, nullable=True, unique=True)
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.QUEUED)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_at = Column(DateTime(timezone=True), nullable=False) # Not before this time
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<Job {self.kind} {self.status}>"
@@ -0,0 +1,49 @@
+import uuid
+from sqlalchemy import Column, String, Float, Integer, Date, DateTime, ForeignKey, Text, Index, Uuid, Enum
+from sqlalchemy.sql import func
+import enum
+
+from app.core.database import Base
+from app.models.transaction import TransactionType
+
+class RecurrenceFrequency(str, enum.Enum):
+    WEEKLY = "weekly" # Every `interval` weeks from start_date
+    MONTHLY = "monthly" # On day_of_month every `interval` months
+    YEARLY = "yearly" # On start_date's day and month every `interval` years
+
+class RecurringRule(Base):
+    """
+    A transaction that repeats, e.g. a salary or rent. app.services.recurring
+    writes its occurrences as they fall due: every occurrence up to
+    materialized_through exists as a transaction, and next_date is the first
+    one that does not yet (NULL once the rule has ended).
+    """
+    __tablename__ = "recurring_rules"
+    __table_args__ = (
+        # The scheduler's scan: rules with occurrences due
+        Index("ix_recurring_rules_next_date", "next_date"),
+        Index("ix_recurring_rules_user_id", "user_id"),
+    )
+
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    # Copied onto each occurrence
+    description = Column(String, nullable=False)
+    amount = Column(Float, nullable=False)
+    type = Column(Enum(TransactionType), nullable=False)
+    category = Column(String, nullable=False)
+    notes = Column(Text, nullable=True)
+
+    frequency = Column(Enum(RecurrenceFrequency), nullable=False)
+    interval = Column(Integer, nullable=False, default=1)
+    day_of_month = Column(Integer, nullable=True) # Monthly rules; clamped to short months. Defaults to start_date's day
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=True) # Last day an occurrence may fall on
+
+    next_date = Column(Date, nullable=True)
+    materialized_through = Column(Date, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<RecurringRule {self.description} {self.frequency} next {self.next_date}>"
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, Float, Date, Integer, ForeignKey, Enum, Uuid
+
+from app.core.database import Base
+from app.models.transaction import TransactionType
+
+class MonthlyRollup(Base):
+    """
+    Per-user totals for one (month, category, type) bucket, maintained by the
+    transaction write handlers and rebuilt with `python -m app.cli rebuild-rollups`
+    """
+    __tablename__ = "monthly_rollups"
+
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    month = Column(Date, primary_key=True) # First day of the month
+    category = Column(String, primary_key=True)
+    type = Column(Enum(TransactionType), primary_key=True)
+    total = Column(Float, nullable=False, default=0.0)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<MonthlyRollup {self.month} {self.category} {self.type}: {self.total}>"
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, Integer, Date, DateTime, ForeignKey, JSON, Uuid
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class AnalyticsSnapshot(Base):
+    """
+    A user's precomputed analytics response for one timeframe, valid while
+    the user's data_version and the day it was computed on are current
+    """
+    __tablename__ = "analytics_snapshots"
+
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    timeframe = Column(String, primary_key=True)
+    data_version = Column(Integer, nullable=False) # users.data_version it was computed from
+    computed_on = Column(Date, nullable=False) # Timeframes are relative to this day
+    data = Column(JSON, nullable=False)
+    computed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<AnalyticsSnapshot {self.user_id} {self.timeframe} v{self.data_version}>"
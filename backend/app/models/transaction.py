@@ -1,6 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Float, Date, DateTime, ForeignKey, Text, Enum
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import DDL, Column, String, Float, Date, DateTime, ForeignKey, Text, Enum, Index, Uuid, event, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -11,11 +10,43 @@ class TransactionType(str, enum.Enum):
     INCOME = "income"
     EXPENSE = "expense"
 
+# The document full-text search matches (app.services.search). On Postgres
+# it is indexed as an expression; queries must spell it the same way.
+SEARCH_DOCUMENT = "to_tsvector('simple', description || ' ' || coalesce(notes, ''))"
+
+# SQLite keeps an FTS5 index of the same columns in transactions_fts,
+# updated by triggers. It is keyed by the transactions rowid, which VACUUM
+# may renumber: run `python -m app.cli rebuild-search-index` after one.
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5("
+    "description, notes, content='transactions', content_rowid='rowid', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_insert AFTER INSERT ON transactions BEGIN "
+    "INSERT INTO transactions_fts (rowid, description, notes) VALUES (new.rowid, new.description, new.notes); END",
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_delete AFTER DELETE ON transactions BEGIN "
+    "INSERT INTO transactions_fts (transactions_fts, rowid, description, notes) "
+    "VALUES ('delete', old.rowid, old.description, old.notes); END",
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_update AFTER UPDATE OF description, notes ON transactions BEGIN "
+    "INSERT INTO transactions_fts (transactions_fts, rowid, description, notes) "
+    "VALUES ('delete', old.rowid, old.description, old.notes); "
+    "INSERT INTO transactions_fts (rowid, description, notes) VALUES (new.rowid, new.description, new.notes); END",
+]
+
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Per-user lookups and listings ordered by (date, id) for keyset pagination
+        Index("ix_transactions_user_id_date_id", "user_id", "date", "id"),
+        # Budget progress: expenses of one category within a date range
+        Index("ix_transactions_user_id_category_type_date", "user_id", "category", "type", "date"),
+        # Full-text search (Postgres; see SQLITE_SEARCH_DDL for SQLite)
+        Index("ix_transactions_search", text(SEARCH_DOCUMENT), postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    # When the table is partitioned by date (app.services.partitions) the
+    # database key is (id, date); ids are still unique UUIDs
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=False)
     description = Column(String, nullable=False)
     amount = Column(Float, nullable=False)
     date = Column(Date, nullable=False)
@@ -29,4 +60,7 @@ class Transaction(Base):
     user = relationship("User", back_populates="transactions")
     
     def __repr__(self):
-        return f"<Transaction {self.description} - {self.amount}>"
\ No newline at end of file
+        return f"<Transaction {self.description} - {self.amount}>"
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(Transaction.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(Transaction.__table__, "before_drop", DDL("DROP TABLE IF EXISTS transactions_fts").execute_if(dialect="sqlite"))
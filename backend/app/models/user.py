@@ -1,6 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, DateTime
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, Integer, Uuid
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -9,12 +8,14 @@ from app.core.database import Base
 class User(Base):
     __tablename__ = "users"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False)
     email = Column(String, unique=True, index=True, nullable=False)
     password = Column(String, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Bumped by every transaction/budget write; versions cached responses
+    data_version = Column(Integer, nullable=False, server_default="0")
     budgets = relationship("Budget", back_populates="user", cascade="all, delete-orphan")
     # Relationships
     transactions = relationship("Transaction", back_populates="user", cascade="all, delete-orphan")
@@ -1,18 +1,25 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from collections import defaultdict
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.security import get_current_user
 from app.models.user import User
-from app.models.transaction import Transaction
-from app.schemas.transaction import TransactionAnalytics
+from app.schemas.transaction import TransactionAnalytics, TransactionSeries, TransactionTrends
+from app.services import snapshots
+from app.services.aggregation import get_transaction_series, series_range
+from app.services.columnar import get_transaction_trends
+from app.services.response_cache import cached_json_response
+from app.utils.dates import GRANULARITIES
 
 router = APIRouter()
 
 @router.get("", response_model=TransactionAnalytics)
 def get_analytics(
+    request: Request,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
     timeframe: str = "month",  # month, quarter, year
@@ -20,31 +27,78 @@ def get_analytics(
     """
     Get analytics for a user
     """
-    # Get all transactions for the user
-    transactions = (
-        db.query(Transaction)
-        .filter(Transaction.user_id == current_user.id)
-        .all()
+    # Aggregate in the database so cost depends on the number of buckets,
+    # not on the number of transactions; unchanged data is served from the
+    # response cache (or as a 304), and a cache miss from today's precomputed
+    # snapshot when the jobs runner has made one
+    return cached_json_response(
+        request,
+        background_tasks,
+        db,
+        current_user.id,
+        TransactionAnalytics,
+        lambda session: snapshots.get_analytics(session, current_user.id, timeframe),
+    )
+
+@router.get("/series", response_model=TransactionSeries)
+def get_series(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    date_from: Optional[date] = Query(None, alias="from", description="First day (default: 12 buckets back)"),
+    date_to: Optional[date] = Query(None, alias="to", description="Last day (default: today)"),
+    granularity: str = Query("month", pattern=f"^({'|'.join(GRANULARITIES)})$"),
+):
+    """
+    Income, expense and net per calendar day, week (from Monday), month or
+    quarter between two dates, with empty buckets as zeros, and the same
+    series for the period just before for comparison
+    """
+    # Grouped in the database, so the response scales with the number of
+    # buckets; months and quarters are read from the monthly rollups, so
+    # their cost does too
+    try:
+        start_date, end_date = series_range(date_from, date_to, granularity)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return cached_json_response(
+        request,
+        background_tasks,
+        db,
+        current_user.id,
+        TransactionSeries,
+        lambda session: get_transaction_series(session, current_user.id, start_date, end_date, granularity),
+    )
+
+@router.get("/trends", response_model=TransactionTrends)
+def get_trends(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    days: int = Query(90, ge=7, le=730, description="Number of days in the daily series"),
+    window: int = Query(7, ge=2, le=90, description="Rolling average and comparison window in days"),
+):
+    """
+    Daily totals with a rolling average and running balance, spending
+    velocity and per-category trends
+    """
+    # Loads the history as NumPy arrays and computes everything vectorized
+    return cached_json_response(
+        request,
+        background_tasks,
+        db,
+        current_user.id,
+        TransactionTrends,
+        lambda session: get_transaction_trends(session, current_user.id, days, window),
     )
-    
-    # Calculate monthly summary
-    monthly_summary = calculate_monthly_summary(transactions, timeframe)
-    
-    # Calculate category breakdown
-    category_breakdown = calculate_category_breakdown(transactions)
-    
-    # Calculate income vs expense
-    income_vs_expense = calculate_income_vs_expense(transactions)
-    
-    return {
-        "monthly_summary": monthly_summary,
-        "category_breakdown": category_breakdown,
-        "income_vs_expense": income_vs_expense,
-    }
 
 def calculate_monthly_summary(transactions, timeframe):
     """
-    Calculate monthly summary
+    Calculate monthly summary from a list of transactions in Python.
+    Kept for callers that already hold the rows; get_analytics uses
+    app.services.aggregation instead.
     """
     # Determine number of months to include
     months_to_include = 6
@@ -0,0 +1,87 @@
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db
+from app.core.security import get_current_user_async
+from app.models.user import User
+from app.schemas.transaction import TransactionAnalytics, TransactionSeries, TransactionTrends
+from app.services import snapshots
+from app.services.aggregation import get_transaction_series, series_range
+from app.services.columnar import get_transaction_trends
+from app.services.response_cache import cached_json_response_async
+from app.utils.dates import GRANULARITIES
+
+# Async version of app.routes.analytics, used when DATABASE_ASYNC is set
+router = APIRouter()
+
+@router.get("", response_model=TransactionAnalytics)
+async def get_analytics(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+    timeframe: str = "month",  # month, quarter, year
+):
+    """
+    Get analytics for a user
+    """
+    # The aggregation service is written against Session; run_sync hands it
+    # the session's sync facade while the queries still await the driver
+    return await cached_json_response_async(
+        request,
+        background_tasks,
+        db,
+        current_user.id,
+        TransactionAnalytics,
+        lambda session: snapshots.get_analytics(session, current_user.id, timeframe),
+    )
+
+@router.get("/series", response_model=TransactionSeries)
+async def get_series(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+    date_from: Optional[date] = Query(None, alias="from", description="First day (default: 12 buckets back)"),
+    date_to: Optional[date] = Query(None, alias="to", description="Last day (default: today)"),
+    granularity: str = Query("month", pattern=f"^({'|'.join(GRANULARITIES)})$"),
+):
+    """
+    Bucketed income/expense series with the previous period (see the sync router)
+    """
+    try:
+        start_date, end_date = series_range(date_from, date_to, granularity)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return await cached_json_response_async(
+        request,
+        background_tasks,
+        db,
+        current_user.id,
+        TransactionSeries,
+        lambda session: get_transaction_series(session, current_user.id, start_date, end_date, granularity),
+    )
+
+@router.get("/trends", response_model=TransactionTrends)
+async def get_trends(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+    days: int = Query(90, ge=7, le=730, description="Number of days in the daily series"),
+    window: int = Query(7, ge=2, le=90, description="Rolling average and comparison window in days"),
+):
+    """
+    Daily totals with a rolling average and running balance, spending
+    velocity and per-category trends
+    """
+    return await cached_json_response_async(
+        request,
+        background_tasks,
+        db,
+        current_user.id,
+        TransactionTrends,
+        lambda session: get_transaction_trends(session, current_user.id, days, window),
+    )
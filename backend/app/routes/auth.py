@@ -8,9 +8,11 @@ from app.core.security import (
     get_password_hash, 
     verify_password, 
     create_access_token, 
-    get_current_user
+    get_current_user,
+    invalidate_cached_user,
 )
 from app.core.config import settings
+from app.core.hashing import password_pool
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse, Token, UserLogin, UserUpdate
 
@@ -29,8 +31,11 @@ def signup(user_in: UserCreate, db: Session = Depends(get_db)):
             detail="Email already registered",
         )
     
+    # End the read transaction so no pooled connection is held while bcrypt runs
+    db.rollback()
+    
     # Create the user
-    hashed_password = get_password_hash(user_in.password)
+    hashed_password = password_pool.call(get_password_hash, user_in.password)
     user = User(
         email=user_in.email,
         name=user_in.name,
@@ -57,8 +62,11 @@ def login(user_in: UserLogin, db: Session = Depends(get_db)):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Release the connection (the user stays loaded) while bcrypt runs
+    db.close()
+    
     # Check the password
-    if not verify_password(user_in.password, user.password):
+    if not password_pool.call(verify_password, user_in.password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -75,7 +83,7 @@ def login(user_in: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.put("/me", response_model=UserResponse)
-async def update_current_user_info(
+def update_current_user_info(
     user_in: UserUpdate, # Use UserUpdate schema
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -101,11 +109,12 @@ async def update_current_user_info(
     if user_in.password is not None:
         # This is a simplified password update. A real system would ask for current password.
         # Consider a dedicated /change-password endpoint.
-        current_user.password = get_password_hash(user_in.password)
+        current_user.password = password_pool.call(get_password_hash, user_in.password)
         
-    db.add(current_user)
+    # current_user already belongs to this request's session
     db.commit()
     db.refresh(current_user)
+    invalidate_cached_user(current_user.id)
     return current_user
 
 
@@ -0,0 +1,96 @@
+from datetime import timedelta
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db
+from app.core.security import (
+    get_password_hash,
+    verify_password,
+    create_access_token,
+    get_current_user_async,
+    invalidate_cached_user,
+)
+from app.core.config import settings
+from app.core.hashing import password_pool
+from app.models.user import User
+from app.schemas.user import UserCreate, UserResponse, Token, UserLogin, UserUpdate
+
+# Async versions of app.routes.auth, used when DATABASE_ASYNC is set.
+# bcrypt is CPU-bound, so hashing runs on the password pool rather than on the event loop.
+router = APIRouter()
+
+async def get_user_by_email(db: AsyncSession, email: str):
+    return (await db.execute(select(User).where(User.email == email))).scalars().first()
+
+@router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+async def signup(user_in: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    """
+    Create a new user
+    """
+    if await get_user_by_email(db, user_in.email):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered",
+        )
+    
+    # End the read transaction so no pooled connection is held while bcrypt runs
+    await db.rollback()
+    user = User(
+        email=user_in.email,
+        name=user_in.name,
+        password=await password_pool.run(get_password_hash, user_in.password),
+    )
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    
+    return user
+
+@router.post("/login", response_model=Token)
+async def login(user_in: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    """
+    OAuth2 compatible token login, get an access token for future requests
+    """
+    user = await get_user_by_email(db, user_in.email)
+    await db.close() # Release the connection (the user stays loaded) while bcrypt runs
+    if not user or not await password_pool.run(verify_password, user_in.password, user.password):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    access_token_expires = timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        subject=str(user.id), expires_delta=access_token_expires
+    )
+    
+    return {"access_token": access_token, "token_type": "bearer", "user": user}
+
+@router.put("/me", response_model=UserResponse)
+async def update_current_user_info(
+    user_in: UserUpdate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Update current user's information (e.g., name).
+    """
+    if user_in.name is not None:
+        current_user.name = user_in.name
+    
+    if user_in.email is not None and user_in.email != current_user.email:
+        existing_user = await get_user_by_email(db, user_in.email)
+        if existing_user and existing_user.id != current_user.id:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered by another user.")
+        current_user.email = user_in.email
+    
+    if user_in.password is not None:
+        current_user.password = await password_pool.run(get_password_hash, user_in.password)
+    
+    db.add(current_user)
+    await db.commit()
+    await db.refresh(current_user)
+    invalidate_cached_user(current_user.id)
+    return current_user
@@ -1,63 +1,66 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status, Query
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from sqlalchemy import func as sql_func # Renamed to avoid conflict with datetime.func
 from uuid import UUID
 from datetime import date, datetime, timedelta
 
 from app.core.database import get_db
 from app.core.security import get_current_user
 from app.models.user import User
-from app.models.budget import Budget, BudgetPeriod
-from app.models.transaction import Transaction, TransactionType
+from app.models.budget import OVERLAP_CONSTRAINT, Budget, BudgetPeriod
 from app.schemas.budget import BudgetCreate, BudgetUpdate, BudgetResponse, BudgetWithProgressResponse
+from app.services import budget_spend
+from app.services.budget_progress import progress_fields, spent_by_category
+from app.services.response_cache import bump_data_version, cached_json_response
+from app.utils.dates import next_month_start
 
 router = APIRouter()
 
-def calculate_budget_progress(db: Session, budget: Budget, current_user: User) -> dict:
-    """Calculates spending progress for a single budget."""
-    
-    # Ensure start_date and end_date are date objects if they are strings
-    start_dt = budget.start_date
-    end_dt = budget.end_date
-    if isinstance(start_dt, str):
-        start_dt = date.fromisoformat(start_dt)
-    if isinstance(end_dt, str):
-        end_dt = date.fromisoformat(end_dt)
-
-    total_spent_query = (
-        db.query(sql_func.sum(Transaction.amount))
-        .filter(
-            Transaction.user_id == current_user.id,
-            Transaction.category == budget.category,
-            Transaction.type == TransactionType.EXPENSE,
-            Transaction.date >= start_dt,
-            Transaction.date <= end_dt,
-        )
-    )
-    total_spent = total_spent_query.scalar() or 0.0
-
-    remaining_amount = budget.amount - total_spent
-    percentage_spent = (total_spent / budget.amount * 100) if budget.amount > 0 else 0
-    is_over_budget = total_spent > budget.amount
+def with_progress(budget: Budget, total_spent: float) -> BudgetWithProgressResponse:
+    """Combine a budget with its spent amount into a progress response."""
+    budget_data = BudgetResponse.model_validate(budget).model_dump() # Pydantic V2
+    return BudgetWithProgressResponse(**budget_data, **progress_fields(budget, total_spent))
 
-    days_left = None
-    today = date.today()
-    if end_dt >= today >= start_dt:
-        days_left = (end_dt - today).days
-    elif today < start_dt: # Budget period hasn't started
-        days_left = (end_dt - start_dt).days # Total duration
-    elif today > end_dt: # Budget period has passed
-        days_left = 0
+def is_overlap_violation(error: IntegrityError) -> bool:
+    """Whether the database rejected a write for overlapping another budget (see app.models.budget)"""
+    return OVERLAP_CONSTRAINT in str(error.orig)
 
+def overlap_error(category: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"An overlapping budget for category '{category}' already exists for this period."
+    )
 
-    return {
-        "spent_amount": total_spent,
-        "remaining_amount": remaining_amount,
-        "percentage_spent": round(percentage_spent, 2),
-        "is_over_budget": is_over_budget,
-        "days_left_in_period": days_left
-    }
+def commit_budget(db: Session, category: str):
+    """Commit a budget insert or update, turning an overlap into a 400"""
+    try:
+        db.commit()
+    except IntegrityError as error:
+        db.rollback()
+        if is_overlap_violation(error):
+            raise overlap_error(category)
+        raise
+
+def list_budgets_with_progress(
+    db: Session,
+    user_id,
+    active_only: bool = False,
+    period: Optional[BudgetPeriod] = None,
+) -> List[BudgetWithProgressResponse]:
+    """List a user's budgets with progress, from their maintained spent amounts (one indexed read)."""
+    query = db.query(Budget).filter(Budget.user_id == user_id)
+    
+    if active_only:
+        today = date.today()
+        query = query.filter(Budget.end_date >= today)
+    
+    if period:
+        query = query.filter(Budget.period == period)
+        
+    budgets = query.order_by(Budget.start_date.desc(), Budget.name).all()
+    
+    return [with_progress(budget, budget.spent_amount) for budget in budgets]
 
 
 @router.post("", response_model=BudgetResponse, status_code=status.HTTP_201_CREATED)
@@ -66,62 +69,68 @@ def create_budget(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    # Check for overlapping budgets for the same category and user (optional but good)
-    existing_budget = db.query(Budget).filter(
-        Budget.user_id == current_user.id,
-        Budget.category == budget_in.category,
-        Budget.start_date <= budget_in.end_date, # Existing budget starts before or when new one ends
-        Budget.end_date >= budget_in.start_date   # Existing budget ends after or when new one starts
-    ).first()
-
-    if existing_budget:
-        # Allow if periods are distinct, e.g. new monthly budget does not conflict with an old one
-        # This logic needs to be more precise if allowing multiple budgets for same category
-        # For now, a simple overlap check on dates.
-        # If periods are strictly defined (e.g., only one monthly budget per category per month),
-        # this check should be more specific.
-        # For this iteration, let's assume category + overlapping date range is a conflict
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"An overlapping budget for category '{budget_in.category}' already exists for this period."
-        )
-
     budget = Budget(
         **budget_in.model_dump(),  # Pydantic V2
         user_id=current_user.id
     )
+    budget_spend.compute_spent(db, budget)
     db.add(budget)
-    db.commit()
+    bump_data_version(db, current_user.id)
+    commit_budget(db, budget_in.category)
     db.refresh(budget)
     return budget
 
 @router.get("", response_model=List[BudgetWithProgressResponse])
 def get_budgets(
+    request: Request,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
     active_only: bool = Query(False, description="Only return budgets for current or future periods"),
     period: Optional[BudgetPeriod] = Query(None, description="Filter by budget period type")
 ):
-    query = db.query(Budget).filter(Budget.user_id == current_user.id)
-    
-    if active_only:
-        today = date.today()
-        query = query.filter(Budget.end_date >= today)
-    
-    if period:
-        query = query.filter(Budget.period == period)
-        
-    budgets = query.order_by(Budget.start_date.desc(), Budget.name).all()
+    return cached_json_response(
+        request,
+        background_tasks,
+        db,
+        current_user.id,
+        List[BudgetWithProgressResponse],
+        lambda session: list_budgets_with_progress(session, current_user.id, active_only, period),
+    )
+
+@router.get("/progress", response_model=List[BudgetWithProgressResponse])
+def get_budget_progress(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    month: Optional[int] = Query(None, ge=1, le=12, description="Month (defaults to the current month)"),
+    year: Optional[int] = Query(None, ge=1, le=9999, description="Year (defaults to the current year)"),
+):
+    """
+    Progress of every budget active in a given month, with spending for that
+    month grouped by category in a single query (see Algo2.txt)
+    """
+    today = date.today()
+    month_start = date(year or today.year, month or today.month, 1)
+    month_end = next_month_start(month_start) - timedelta(days=1)
     
-    budgets_with_progress = []
-    for budget in budgets:
-        progress_data = calculate_budget_progress(db, budget, current_user)
-        budget_data = BudgetResponse.model_validate(budget).model_dump() # Pydantic V2
-        budgets_with_progress.append(
-            BudgetWithProgressResponse(**budget_data, **progress_data)
+    budgets = (
+        db.query(Budget)
+        .filter(
+            Budget.user_id == current_user.id,
+            Budget.start_date <= month_end,
+            Budget.end_date >= month_start,
         )
-        
-    return budgets_with_progress
+        .order_by(Budget.category, Budget.name)
+        .all()
+    )
+    if not budgets:
+        return []
+    
+    expenses_by_category = spent_by_category(db, current_user.id, month_start, month_end)
+    return [
+        with_progress(budget, expenses_by_category.get(budget.category, 0.0))
+        for budget in budgets
+    ]
 
 @router.get("/{budget_id}", response_model=BudgetWithProgressResponse)
 def get_budget(
@@ -133,9 +142,7 @@ def get_budget(
     if not budget:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Budget not found")
     
-    progress_data = calculate_budget_progress(db, budget, current_user)
-    budget_data = BudgetResponse.model_validate(budget).model_dump() # Pydantic V2
-    return BudgetWithProgressResponse(**budget_data, **progress_data)
+    return with_progress(budget, budget.spent_amount)
 
 @router.put("/{budget_id}", response_model=BudgetResponse)
 def update_budget(
@@ -161,14 +168,14 @@ def update_budget(
             detail="End date must be after start date."
         )
         
-    # Check for overlaps if category or dates change significantly
-    # This can be complex; for now, we'll skip full overlap check on update for brevity,
-    # but it's important for production. Assume frontend/user manages this correctly for now.
-
     for field, value in update_data.items():
         setattr(budget, field, value)
+    if update_data.keys() & {"category", "start_date", "end_date"}:
+        budget_spend.compute_spent(db, budget)
+    bump_data_version(db, current_user.id)
     
-    db.commit()
+    # The database rejects a budget overlapping another of its category
+    commit_budget(db, budget.category)
     db.refresh(budget)
     return budget
 
@@ -183,5 +190,6 @@ def delete_budget(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Budget not found")
     
     db.delete(budget)
+    bump_data_version(db, current_user.id)
     db.commit()
     return None # FastAPI handles 204 No Content response
\ No newline at end of file
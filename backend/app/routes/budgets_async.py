@@ -0,0 +1,163 @@
+from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status, Query
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+from datetime import date, timedelta
+
+from app.core.database import get_async_db
+from app.core.security import get_current_user_async
+from app.models.user import User
+from app.models.budget import Budget, BudgetPeriod
+from app.routes.budgets import is_overlap_violation, list_budgets_with_progress, overlap_error, with_progress
+from app.schemas.budget import BudgetCreate, BudgetUpdate, BudgetResponse, BudgetWithProgressResponse
+from app.services import budget_spend
+from app.services.budget_progress import spent_by_category
+from app.services.response_cache import bump_data_version, cached_json_response_async
+from app.utils.dates import next_month_start
+
+# Async version of app.routes.budgets, used when DATABASE_ASYNC is set
+router = APIRouter()
+
+async def get_user_budget(db: AsyncSession, budget_id: UUID, user_id) -> Budget:
+    """
+    Get one of the user's budgets, or raise a 404
+    """
+    budget = (
+        await db.execute(select(Budget).where(Budget.id == budget_id, Budget.user_id == user_id))
+    ).scalars().first()
+    if not budget:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Budget not found")
+    return budget
+
+async def commit_budget(db: AsyncSession, category: str):
+    """Commit a budget insert or update, turning an overlap into a 400"""
+    try:
+        await db.commit()
+    except IntegrityError as error:
+        await db.rollback()
+        if is_overlap_violation(error):
+            raise overlap_error(category)
+        raise
+
+@router.post("", response_model=BudgetResponse, status_code=status.HTTP_201_CREATED)
+async def create_budget(
+    budget_in: BudgetCreate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    budget = Budget(
+        **budget_in.model_dump(),
+        user_id=current_user.id
+    )
+    await db.run_sync(budget_spend.compute_spent, budget)
+    db.add(budget)
+    await db.run_sync(bump_data_version, current_user.id)
+    await commit_budget(db, budget_in.category)
+    await db.refresh(budget)
+    return budget
+
+@router.get("", response_model=List[BudgetWithProgressResponse])
+async def get_budgets(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+    active_only: bool = Query(False, description="Only return budgets for current or future periods"),
+    period: Optional[BudgetPeriod] = Query(None, description="Filter by budget period type")
+):
+    return await cached_json_response_async(
+        request,
+        background_tasks,
+        db,
+        current_user.id,
+        List[BudgetWithProgressResponse],
+        lambda session: list_budgets_with_progress(session, current_user.id, active_only, period),
+    )
+
+@router.get("/progress", response_model=List[BudgetWithProgressResponse])
+async def get_budget_progress(
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+    month: Optional[int] = Query(None, ge=1, le=12, description="Month (defaults to the current month)"),
+    year: Optional[int] = Query(None, ge=1, le=9999, description="Year (defaults to the current year)"),
+):
+    """
+    Progress of every budget active in a given month
+    """
+    today = date.today()
+    month_start = date(year or today.year, month or today.month, 1)
+    month_end = next_month_start(month_start) - timedelta(days=1)
+    
+    budgets = (
+        await db.execute(
+            select(Budget)
+            .where(
+                Budget.user_id == current_user.id,
+                Budget.start_date <= month_end,
+                Budget.end_date >= month_start,
+            )
+            .order_by(Budget.category, Budget.name)
+        )
+    ).scalars().all()
+    if not budgets:
+        return []
+    
+    expenses_by_category = await db.run_sync(spent_by_category, current_user.id, month_start, month_end)
+    return [
+        with_progress(budget, expenses_by_category.get(budget.category, 0.0))
+        for budget in budgets
+    ]
+
+@router.get("/{budget_id}", response_model=BudgetWithProgressResponse)
+async def get_budget(
+    budget_id: UUID,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    budget = await get_user_budget(db, budget_id, current_user.id)
+    return with_progress(budget, budget.spent_amount)
+
+@router.put("/{budget_id}", response_model=BudgetResponse)
+async def update_budget(
+    budget_id: UUID,
+    budget_in: BudgetUpdate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    budget = await get_user_budget(db, budget_id, current_user.id)
+    
+    update_data = budget_in.model_dump(exclude_unset=True)
+    new_start_date = update_data.get('start_date', budget.start_date)
+    new_end_date = update_data.get('end_date', budget.end_date)
+    
+    if new_start_date and new_end_date and new_end_date < new_start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="End date must be after start date."
+        )
+    
+    for field, value in update_data.items():
+        setattr(budget, field, value)
+    if update_data.keys() & {"category", "start_date", "end_date"}:
+        await db.run_sync(budget_spend.compute_spent, budget)
+    await db.run_sync(bump_data_version, current_user.id)
+    
+    # The database rejects a budget overlapping another of its category
+    await commit_budget(db, budget.category)
+    await db.refresh(budget)
+    return budget
+
+@router.delete("/{budget_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_budget(
+    budget_id: UUID,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    budget = await get_user_budget(db, budget_id, current_user.id)
+    
+    await db.delete(budget)
+    await db.run_sync(bump_data_version, current_user.id)
+    await db.commit()
+    return None
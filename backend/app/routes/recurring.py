@@ -0,0 +1,151 @@
+from itertools import islice
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from uuid import UUID
+from datetime import date
+
+from app.core.database import get_db
+from app.core.security import get_current_user
+from app.models.recurring import RecurrenceFrequency, RecurringRule
+from app.models.user import User
+from app.schemas.recurring import ProjectedTransaction, RecurringRuleCreate, RecurringRuleResponse, RecurringRuleUpdate
+from app.services import recurring
+from app.utils.dates import add_months
+
+router = APIRouter()
+
+# Fields that change which dates a rule falls on
+SCHEDULE_FIELDS = {"frequency", "interval", "day_of_month", "start_date", "end_date"}
+
+def projected(rules: List[RecurringRule], months: int, limit: int) -> List[ProjectedTransaction]:
+    """The first `limit` unwritten occurrences of the rules within `months` months from today"""
+    occurrences = recurring.project(rules, add_months(date.today(), months))
+    return [
+        ProjectedTransaction(
+            rule_id=rule.id,
+            date=day,
+            description=rule.description,
+            amount=rule.amount,
+            type=rule.type,
+            category=rule.category,
+        )
+        for day, rule in islice(occurrences, limit)
+    ]
+
+def check_rule(rule: RecurringRule):
+    """Reject an edited rule whose fields no longer fit together"""
+    if rule.end_date is not None and rule.end_date < rule.start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="End date must be after start date."
+        )
+    if rule.day_of_month is not None and rule.frequency != RecurrenceFrequency.MONTHLY:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Day of month only applies to monthly rules."
+        )
+
+def get_user_rule(db: Session, rule_id: UUID, user_id, for_update: bool = False) -> RecurringRule:
+    """
+    Get one of the user's recurring rules, or raise a 404. for_update locks
+    it until commit, so a scheduler run can't advance its cursor meanwhile.
+    """
+    query = db.query(RecurringRule).filter(RecurringRule.id == rule_id, RecurringRule.user_id == user_id)
+    if for_update:
+        query = query.with_for_update()
+    rule = query.first()
+    if not rule:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recurring rule not found")
+    return rule
+
+@router.post("", response_model=RecurringRuleResponse, status_code=status.HTTP_201_CREATED)
+def create_rule(
+    rule_in: RecurringRuleCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Create a recurring transaction. Occurrences already due are written
+    now, up to RECURRING_CATCH_UP_LIMIT; a background job writes the rest.
+    """
+    rule = RecurringRule(**rule_in.model_dump(), user_id=current_user.id)
+    db.add(rule)
+    recurring.save_rule(db, rule)
+    db.commit()
+    db.refresh(rule)
+    return rule
+
+@router.get("", response_model=List[RecurringRuleResponse])
+def get_rules(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    return (
+        db.query(RecurringRule)
+        .filter(RecurringRule.user_id == current_user.id)
+        .order_by(RecurringRule.next_date, RecurringRule.description)
+        .all()
+    )
+
+@router.get("/projection", response_model=List[ProjectedTransaction])
+def get_projection(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    months: int = Query(3, ge=1, le=120, description="How far ahead to project"),
+    limit: int = Query(1000, ge=1, le=10000),
+):
+    """
+    Upcoming occurrences of the user's recurring transactions, in date
+    order. They are computed on the fly, not written.
+    """
+    rules = (
+        db.query(RecurringRule)
+        .filter(RecurringRule.user_id == current_user.id, RecurringRule.next_date.isnot(None))
+        .all()
+    )
+    return projected(rules, months, limit)
+
+@router.get("/{rule_id}", response_model=RecurringRuleResponse)
+def get_rule(
+    rule_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    return get_user_rule(db, rule_id, current_user.id)
+
+@router.put("/{rule_id}", response_model=RecurringRuleResponse)
+def update_rule(
+    rule_id: UUID,
+    rule_in: RecurringRuleUpdate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Update a recurring rule. Occurrences already written are kept; a new
+    schedule applies after them.
+    """
+    rule = get_user_rule(db, rule_id, current_user.id, for_update=True)
+    update_data = rule_in.model_dump(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(rule, field, value)
+    check_rule(rule)
+    if update_data.keys() & SCHEDULE_FIELDS:
+        recurring.save_rule(db, rule)
+    db.commit()
+    db.refresh(rule)
+    return rule
+
+@router.delete("/{rule_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_rule(
+    rule_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Delete a recurring rule; the transactions it wrote are kept
+    """
+    rule = get_user_rule(db, rule_id, current_user.id)
+    db.delete(rule)
+    db.commit()
+    return None
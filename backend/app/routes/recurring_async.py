@@ -0,0 +1,115 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+
+from app.core.database import get_async_db
+from app.core.security import get_current_user_async
+from app.models.recurring import RecurringRule
+from app.models.user import User
+from app.routes.recurring import SCHEDULE_FIELDS, check_rule, projected
+from app.schemas.recurring import ProjectedTransaction, RecurringRuleCreate, RecurringRuleResponse, RecurringRuleUpdate
+from app.services import recurring
+
+# Async version of app.routes.recurring, used when DATABASE_ASYNC is set
+router = APIRouter()
+
+async def get_user_rule(db: AsyncSession, rule_id: UUID, user_id, for_update: bool = False) -> RecurringRule:
+    """
+    Get one of the user's recurring rules, or raise a 404 (see the sync
+    get_user_rule for for_update)
+    """
+    stmt = select(RecurringRule).where(RecurringRule.id == rule_id, RecurringRule.user_id == user_id)
+    if for_update:
+        stmt = stmt.with_for_update()
+    rule = (await db.execute(stmt)).scalars().first()
+    if not rule:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recurring rule not found")
+    return rule
+
+@router.post("", response_model=RecurringRuleResponse, status_code=status.HTTP_201_CREATED)
+async def create_rule(
+    rule_in: RecurringRuleCreate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Create a recurring transaction. Occurrences already due are written
+    now, up to RECURRING_CATCH_UP_LIMIT; a background job writes the rest.
+    """
+    rule = RecurringRule(**rule_in.model_dump(), user_id=current_user.id)
+    db.add(rule)
+    await db.run_sync(recurring.save_rule, rule)
+    await db.commit()
+    await db.refresh(rule)
+    return rule
+
+@router.get("", response_model=List[RecurringRuleResponse])
+async def get_rules(
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return (
+        await db.execute(
+            select(RecurringRule)
+            .where(RecurringRule.user_id == current_user.id)
+            .order_by(RecurringRule.next_date, RecurringRule.description)
+        )
+    ).scalars().all()
+
+@router.get("/projection", response_model=List[ProjectedTransaction])
+async def get_projection(
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+    months: int = Query(3, ge=1, le=120, description="How far ahead to project"),
+    limit: int = Query(1000, ge=1, le=10000),
+):
+    """
+    Upcoming occurrences of the user's recurring transactions, in date
+    order. They are computed on the fly, not written.
+    """
+    rules = (
+        await db.execute(
+            select(RecurringRule)
+            .where(RecurringRule.user_id == current_user.id, RecurringRule.next_date.isnot(None))
+        )
+    ).scalars().all()
+    return projected(rules, months, limit)
+
+@router.get("/{rule_id}", response_model=RecurringRuleResponse)
+async def get_rule(
+    rule_id: UUID,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await get_user_rule(db, rule_id, current_user.id)
+
+@router.put("/{rule_id}", response_model=RecurringRuleResponse)
+async def update_rule(
+    rule_id: UUID,
+    rule_in: RecurringRuleUpdate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    rule = await get_user_rule(db, rule_id, current_user.id, for_update=True)
+    update_data = rule_in.model_dump(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(rule, field, value)
+    check_rule(rule)
+    if update_data.keys() & SCHEDULE_FIELDS:
+        await db.run_sync(recurring.save_rule, rule)
+    await db.commit()
+    await db.refresh(rule)
+    return rule
+
+@router.delete("/{rule_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_rule(
+    rule_id: UUID,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    rule = await get_user_rule(db, rule_id, current_user.id)
+    await db.delete(rule)
+    await db.commit()
+    return None
@@ -1,18 +1,26 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from datetime import date
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 from uuid import UUID
 
 from app.core.database import get_db
 from app.core.security import get_current_user
 from app.models.user import User
-from app.models.transaction import Transaction
+from app.models.transaction import Transaction, TransactionType
 from app.schemas.transaction import (
     TransactionCreate,
     TransactionUpdate,
     TransactionResponse,
-    TransactionSummary
+    TransactionSummary,
+    TransactionImportSummary,
 )
+from app.services import budget_spend, exporter, importer, rollups, search, snapshots
+from app.services.aggregation import get_transaction_summary as compute_transaction_summary
+from app.services.response_cache import bump_data_version, cached_json_response
+from app.utils.pagination import encode_cursor, decode_cursor
 
 router = APIRouter()
 
@@ -31,79 +39,216 @@ def create_transaction(
         user_id=current_user.id,
     )
     db.add(transaction)
+    rollups.record_transaction(db, transaction)
+    budget_spend.record_transaction(db, transaction)
+    bump_data_version(db, current_user.id)
     db.commit()
     db.refresh(transaction)
     
     return transaction
 
+def filter_transactions(
+    query,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    category: Optional[str] = None,
+    transaction_type: Optional[TransactionType] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+):
+    """
+    Apply the optional list filters to a transaction query
+    """
+    if start_date is not None:
+        query = query.filter(Transaction.date >= start_date)
+    if end_date is not None:
+        query = query.filter(Transaction.date <= end_date)
+    if category is not None:
+        query = query.filter(Transaction.category == category)
+    if transaction_type is not None:
+        query = query.filter(Transaction.type == transaction_type)
+    if min_amount is not None:
+        query = query.filter(Transaction.amount >= min_amount)
+    if max_amount is not None:
+        query = query.filter(Transaction.amount <= max_amount)
+    return query
+
 @router.get("", response_model=List[TransactionResponse])
 def get_transactions(
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page; replaces skip"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    category: Optional[str] = None,
+    transaction_type: Optional[TransactionType] = Query(None, alias="type"),
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
 ):
     """
-    Get all transactions for a user
+    Get transactions for a user, newest first.
+    
+    When the page is full, the X-Next-Cursor response header holds an opaque
+    cursor for the next page. Passing it back as `cursor` seeks directly to
+    the next (date, id) position via the index, so deep pages cost the same
+    as the first one. `skip` still works for existing clients.
     """
-    transactions = (
-        db.query(Transaction)
-        .filter(Transaction.user_id == current_user.id)
-        .order_by(Transaction.date.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    query = filter_transactions(
+        db.query(Transaction).filter(Transaction.user_id == current_user.id),
+        start_date=start_date,
+        end_date=end_date,
+        category=category,
+        transaction_type=transaction_type,
+        min_amount=min_amount,
+        max_amount=max_amount,
     )
     
+    # id breaks ties between transactions on the same date, keeping pages stable
+    query = query.order_by(Transaction.date.desc(), Transaction.id.desc())
+    
+    if cursor:
+        try:
+            cursor_date, cursor_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+        query = query.filter(tuple_(Transaction.date, Transaction.id) < tuple_(cursor_date, cursor_id))
+    elif skip:
+        query = query.offset(skip)
+    
+    transactions = query.limit(limit).all()
+    
+    if transactions and len(transactions) == limit:
+        last = transactions[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.date, last.id)
+    
     return transactions
 
 @router.get("/summary", response_model=TransactionSummary)
 def get_transaction_summary(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Get transaction summary for a user.
+    
+    Responses carry an ETag derived from the user's data version; sending it
+    back in If-None-Match returns 304 until a transaction or budget changes.
+    """
+    return cached_json_response(
+        request,
+        background_tasks,
+        db,
+        current_user.id,
+        TransactionSummary,
+        lambda session: compute_transaction_summary(session, current_user.id),
+    )
+
+@router.get("/search", response_model=List[TransactionResponse])
+def search_transactions(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find in descriptions and notes"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
+    skip: int = 0,
+    limit: int = Query(50, ge=1, le=200),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    category: Optional[str] = None,
+    transaction_type: Optional[TransactionType] = Query(None, alias="type"),
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
 ):
     """
-    Get transaction summary for a user
+    Search a user's transactions, best matches first.
+    
+    Each word of `q` matches the start of a word in the description or
+    notes, through a full-text index rather than a scan; the list filters
+    narrow the results further.
     """
-    # Get all transactions for the user
-    transactions = (
-        db.query(Transaction)
-        .filter(Transaction.user_id == current_user.id)
-        .all()
+    stmt = search.search_statement(db, current_user.id, q)
+    if stmt is None:
+        return []
+    stmt = filter_transactions(
+        stmt,
+        start_date=start_date,
+        end_date=end_date,
+        category=category,
+        transaction_type=transaction_type,
+        min_amount=min_amount,
+        max_amount=max_amount,
+    )
+    return db.execute(stmt.offset(skip).limit(limit)).scalars().all()
+
+@router.post("/import", response_model=TransactionImportSummary)
+def import_transactions(
+    file: UploadFile = File(..., description="CSV (with header), NDJSON or OFX/QFX bank export"),
+    file_format: Optional[str] = Query(None, alias="format", description="csv, ndjson or ofx; detected from the file name if omitted"),
+    default_category: str = Query("Uncategorized", description="Category for rows that have none"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Bulk import transactions from a bank export.
+    
+    The upload is parsed incrementally and validated against TransactionCreate
+    in chunks, which are written with multi-row INSERTs. Invalid rows are
+    skipped and reported by row number; all valid rows are committed together.
+    """
+    resolved_format = importer.detect_format(file.filename, file_format)
+    if resolved_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported import format. Use one of: {', '.join(importer.SUPPORTED_FORMATS)}",
+        )
+    
+    summary = importer.import_transactions(
+        db,
+        current_user.id,
+        file.file,
+        resolved_format,
+        default_category=default_category,
     )
+    bump_data_version(db, current_user.id)
+    if summary["imported"]:
+        # Refresh the precomputed analytics in the background, not on the
+        # user's next page load
+        snapshots.enqueue_user_snapshots(db, current_user.id)
+    db.commit()
     
-    # Calculate total income and expense
-    total_income = sum(t.amount for t in transactions if t.type == "income")
-    total_expense = sum(t.amount for t in transactions if t.type == "expense")
-    net_balance = total_income - total_expense
-    
-    # Calculate category breakdown for expenses
-    expense_transactions = [t for t in transactions if t.type == "expense"]
-    category_totals = {}
-    for t in expense_transactions:
-        if t.category not in category_totals:
-            category_totals[t.category] = 0
-        category_totals[t.category] += t.amount
-    
-    # Calculate percentages
-    categories = []
-    for category, amount in category_totals.items():
-        percentage = (amount / total_expense * 100) if total_expense > 0 else 0
-        categories.append({
-            "name": category,
-            "amount": amount,
-            "percentage": round(percentage, 2),
-        })
-    
-    # Sort by amount
-    categories.sort(key=lambda x: x["amount"], reverse=True)
-    
-    return {
-        "total_income": total_income,
-        "total_expense": total_expense,
-        "net_balance": net_balance,
-        "categories": categories,
-    }
+    return summary
+
+@router.get("/export")
+def export_transactions(
+    export_format: str = Query("csv", alias="format", description="csv or ndjson"),
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Stream a user's full transaction history as CSV or NDJSON.
+    
+    Rows are read through a server-side cursor and serialized as they
+    arrive, so the export starts immediately and runs in constant memory.
+    """
+    if export_format not in exporter.EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported export format. Use one of: {', '.join(exporter.EXPORT_FORMATS)}",
+        )
+    
+    return StreamingResponse(
+        exporter.stream_export(db, current_user.id, export_format, date_from, date_to),
+        media_type=exporter.EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="transactions.{export_format}"'},
+    )
 
 @router.get("/{transaction_id}", response_model=TransactionResponse)
 def get_transaction(
@@ -151,8 +296,12 @@ def update_transaction(
         )
     
     # Update fields
+    before = rollups.snapshot(transaction)
     for field, value in transaction_in.dict(exclude_unset=True).items():
         setattr(transaction, field, value)
+    rollups.update_transaction(db, before, transaction)
+    budget_spend.update_transaction(db, before, transaction)
+    bump_data_version(db, current_user.id)
     
     db.commit()
     db.refresh(transaction)
@@ -180,5 +329,8 @@ def delete_transaction(
             detail="Transaction not found",
         )
     
+    rollups.remove_transaction(db, transaction)
+    budget_spend.remove_transaction(db, transaction)
     db.delete(transaction)
+    bump_data_version(db, current_user.id)
     db.commit()
\ No newline at end of file
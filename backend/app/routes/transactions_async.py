@@ -0,0 +1,227 @@
+from typing import List, Optional
+from datetime import date
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+
+from app.core.database import get_async_db
+from app.core.security import get_current_user_async
+from app.models.user import User
+from app.models.transaction import Transaction, TransactionType
+from app.routes import transactions as sync_routes
+from app.routes.transactions import filter_transactions
+from app.schemas.transaction import (
+    TransactionCreate,
+    TransactionUpdate,
+    TransactionResponse,
+    TransactionSummary,
+    TransactionImportSummary,
+)
+from app.services import budget_spend, rollups, search
+from app.services.aggregation import get_transaction_summary as compute_transaction_summary
+from app.services.response_cache import bump_data_version, cached_json_response_async
+from app.utils.pagination import encode_cursor, decode_cursor
+
+# Async version of app.routes.transactions, used when DATABASE_ASYNC is set
+router = APIRouter()
+
+async def get_user_transaction(db: AsyncSession, transaction_id: UUID, user_id) -> Transaction:
+    """
+    Get one of the user's transactions, or raise a 404
+    """
+    transaction = (
+        await db.execute(
+            select(Transaction).where(Transaction.id == transaction_id, Transaction.user_id == user_id)
+        )
+    ).scalars().first()
+    
+    if not transaction:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Transaction not found",
+        )
+    return transaction
+
+@router.post("", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
+async def create_transaction(
+    transaction_in: TransactionCreate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Create a new transaction
+    """
+    transaction = Transaction(
+        **transaction_in.dict(),
+        user_id=current_user.id,
+    )
+    db.add(transaction)
+    await db.run_sync(rollups.record_transaction, transaction)
+    await db.run_sync(budget_spend.record_transaction, transaction)
+    await db.run_sync(bump_data_version, current_user.id)
+    await db.commit()
+    await db.refresh(transaction)
+    
+    return transaction
+
+@router.get("", response_model=List[TransactionResponse])
+async def get_transactions(
+    response: Response,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page; replaces skip"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    category: Optional[str] = None,
+    transaction_type: Optional[TransactionType] = Query(None, alias="type"),
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+):
+    """
+    Get transactions for a user, newest first (see the sync router for paging)
+    """
+    stmt = filter_transactions(
+        select(Transaction).where(Transaction.user_id == current_user.id),
+        start_date=start_date,
+        end_date=end_date,
+        category=category,
+        transaction_type=transaction_type,
+        min_amount=min_amount,
+        max_amount=max_amount,
+    ).order_by(Transaction.date.desc(), Transaction.id.desc())
+    
+    if cursor:
+        try:
+            cursor_date, cursor_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+        stmt = stmt.where(tuple_(Transaction.date, Transaction.id) < tuple_(cursor_date, cursor_id))
+    elif skip:
+        stmt = stmt.offset(skip)
+    
+    transactions = (await db.execute(stmt.limit(limit))).scalars().all()
+    
+    if transactions and len(transactions) == limit:
+        last = transactions[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.date, last.id)
+    
+    return transactions
+
+@router.get("/summary", response_model=TransactionSummary)
+async def get_transaction_summary(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Get transaction summary for a user (ETag/If-None-Match aware)
+    """
+    return await cached_json_response_async(
+        request,
+        background_tasks,
+        db,
+        current_user.id,
+        TransactionSummary,
+        lambda session: compute_transaction_summary(session, current_user.id),
+    )
+
+@router.get("/search", response_model=List[TransactionResponse])
+async def search_transactions(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find in descriptions and notes"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+    skip: int = 0,
+    limit: int = Query(50, ge=1, le=200),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    category: Optional[str] = None,
+    transaction_type: Optional[TransactionType] = Query(None, alias="type"),
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+):
+    """
+    Search a user's transactions, best matches first (see the sync router)
+    """
+    stmt = await db.run_sync(search.search_statement, current_user.id, q)
+    if stmt is None:
+        return []
+    stmt = filter_transactions(
+        stmt,
+        start_date=start_date,
+        end_date=end_date,
+        category=category,
+        transaction_type=transaction_type,
+        min_amount=min_amount,
+        max_amount=max_amount,
+    )
+    return (await db.execute(stmt.offset(skip).limit(limit))).scalars().all()
+
+# Bulk import/export parse and serialize whole files and use psycopg2's COPY
+# and server-side cursors, so they keep the sync handlers and run in the
+# threadpool instead of holding the event loop
+router.add_api_route(
+    "/import",
+    sync_routes.import_transactions,
+    methods=["POST"],
+    response_model=TransactionImportSummary,
+)
+router.add_api_route("/export", sync_routes.export_transactions, methods=["GET"])
+
+@router.get("/{transaction_id}", response_model=TransactionResponse)
+async def get_transaction(
+    transaction_id: UUID,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Get a transaction by ID
+    """
+    return await get_user_transaction(db, transaction_id, current_user.id)
+
+@router.put("/{transaction_id}", response_model=TransactionResponse)
+async def update_transaction(
+    transaction_id: UUID,
+    transaction_in: TransactionUpdate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Update a transaction
+    """
+    transaction = await get_user_transaction(db, transaction_id, current_user.id)
+    
+    before = rollups.snapshot(transaction)
+    for field, value in transaction_in.dict(exclude_unset=True).items():
+        setattr(transaction, field, value)
+    await db.run_sync(rollups.update_transaction, before, transaction)
+    await db.run_sync(budget_spend.update_transaction, before, transaction)
+    await db.run_sync(bump_data_version, current_user.id)
+    
+    await db.commit()
+    await db.refresh(transaction)
+    
+    return transaction
+
+@router.delete("/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_transaction(
+    transaction_id: UUID,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Delete a transaction
+    """
+    transaction = await get_user_transaction(db, transaction_id, current_user.id)
+    
+    await db.run_sync(rollups.remove_transaction, transaction)
+    await db.run_sync(budget_spend.remove_transaction, transaction)
+    await db.delete(transaction)
+    await db.run_sync(bump_data_version, current_user.id)
+    await db.commit()
@@ -0,0 +1,80 @@
+from typing import Optional
+from uuid import UUID
+from pydantic import BaseModel, Field, confloat, field_validator
+import datetime as dt
+from datetime import date, datetime
+
+from app.models.recurring import RecurrenceFrequency
+from app.models.transaction import TransactionType
+
+def day_of_month_only_for_monthly_rules(cls, v, info):
+    # An update without frequency is checked against the stored rule instead
+    if v is not None and info.data.get('frequency') not in (None, RecurrenceFrequency.MONTHLY):
+        raise ValueError('Day of month only applies to monthly rules')
+    return v
+
+class RecurringRuleBase(BaseModel):
+    description: str
+    amount: confloat(gt=0)
+    type: TransactionType
+    category: str
+    notes: Optional[str] = None
+    frequency: RecurrenceFrequency
+    interval: int = Field(1, ge=1, le=100) # Every N weeks/months/years
+    day_of_month: Optional[int] = Field(None, ge=1, le=31) # Monthly only; defaults to start_date's day
+    start_date: date
+    end_date: Optional[date] = None
+
+    check_day_of_month = field_validator('day_of_month')(day_of_month_only_for_monthly_rules)
+
+    @field_validator('end_date')
+    @classmethod
+    def end_date_after_start_date(cls, v, info):
+        values = info.data
+        if v and 'start_date' in values and v < values['start_date']:
+            raise ValueError('End date must be after start date')
+        return v
+
+class RecurringRuleCreate(RecurringRuleBase):
+    pass
+
+class RecurringRuleUpdate(BaseModel):
+    description: Optional[str] = None
+    amount: Optional[confloat(gt=0)] = None
+    type: Optional[TransactionType] = None
+    category: Optional[str] = None
+    notes: Optional[str] = None
+    frequency: Optional[RecurrenceFrequency] = None
+    interval: Optional[int] = Field(None, ge=1, le=100)
+    day_of_month: Optional[int] = Field(None, ge=1, le=31)
+    start_date: Optional[dt.date] = None
+    end_date: Optional[dt.date] = None
+
+    check_day_of_month = field_validator('day_of_month')(day_of_month_only_for_monthly_rules)
+
+    # Omitted fields are left alone, but these columns can't be cleared
+    @field_validator('description', 'amount', 'type', 'category', 'frequency', 'interval', 'start_date')
+    @classmethod
+    def not_null(cls, v):
+        if v is None:
+            raise ValueError('Field cannot be null')
+        return v
+
+class RecurringRuleResponse(RecurringRuleBase):
+    id: UUID
+    user_id: UUID
+    next_date: Optional[date] = None # Next occurrence not yet written; None once ended
+    materialized_through: Optional[date] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+# An occurrence that has not been written yet
+class ProjectedTransaction(BaseModel):
+    rule_id: UUID
+    date: date
+    description: str
+    amount: float
+    type: TransactionType
+    category: str
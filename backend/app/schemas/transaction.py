@@ -1,6 +1,7 @@
 from typing import Optional, List
 from uuid import UUID
 from pydantic import BaseModel, validator, confloat, field_validator
+import datetime as dt
 from datetime import date, datetime
 
 from app.models.transaction import TransactionType
@@ -22,7 +23,7 @@ class TransactionCreate(TransactionBase):
 class TransactionUpdate(BaseModel):
     description: Optional[str] = None
     amount: Optional[confloat(gt=0)] = None
-    date: Optional[date] = None
+    date: Optional[dt.date] = None # dt.date: the field's default would shadow `date`
     type: Optional[TransactionType] = None
     category: Optional[str] = None
     notes: Optional[str] = None
@@ -40,6 +41,19 @@ class TransactionResponse(TransactionBase):
 class TransactionInDB(TransactionResponse):
     updated_at: datetime
 
+# Result of a bulk import
+class TransactionImportError(BaseModel):
+    row: int
+    error: str
+
+class TransactionImportSummary(BaseModel):
+    format: str
+    total_rows: int
+    imported: int
+    failed: int
+    errors: List[TransactionImportError]
+    errors_truncated: bool = False
+
 # Transaction summary
 class TransactionSummary(BaseModel):
     total_income: float
@@ -85,4 +99,65 @@ class TransactionAnalytics(BaseModel):
                     "net": 4100.0
                 }
             }
-        }
\ No newline at end of file
+        }
+# Transaction trends
+class DailyTrend(BaseModel):
+    date: date
+    income: float
+    expense: float
+    net: float
+    balance: float # Running balance at the end of the day
+    expense_rolling_average: float
+
+class SpendingVelocity(BaseModel):
+    recent_daily_expense: float
+    previous_daily_expense: float
+    change_percentage: Optional[float] = None
+    month_to_date_expense: float
+    projected_month_expense: float
+
+class CategoryMonth(BaseModel):
+    month: str
+    amount: float
+
+class CategoryTrend(BaseModel):
+    name: str
+    total: float
+    recent_daily_average: float
+    previous_daily_average: float
+    change_percentage: Optional[float] = None
+    monthly: List[CategoryMonth]
+
+class TransactionTrends(BaseModel):
+    start_date: date
+    end_date: date
+    window_days: int
+    opening_balance: float
+    daily: List[DailyTrend]
+    velocity: SpendingVelocity
+    categories: List[CategoryTrend]
+
+# Bucketed income/expense series
+class SeriesBucket(BaseModel):
+    start: date
+    end: date # Last day of the calendar bucket
+    label: str
+    income: float
+    expense: float
+    net: float
+    count: int
+
+class SeriesPeriod(BaseModel):
+    start_date: date
+    end_date: date
+    income: float
+    expense: float
+    net: float
+    buckets: List[SeriesBucket]
+
+class TransactionSeries(BaseModel):
+    granularity: str
+    current: SeriesPeriod
+    previous: SeriesPeriod # The same length of time just before current
+    income_change_percentage: Optional[float] = None
+    expense_change_percentage: Optional[float] = None
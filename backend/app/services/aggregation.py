@@ -0,0 +1,297 @@
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.transaction import Transaction, TransactionType
+from app.services import rollups
+from app.utils.dates import (
+    add_months,
+    bucket_label,
+    bucket_start,
+    date_bucket,
+    month_bucket,
+    next_bucket_start,
+    to_date,
+)
+
+# Number of months shown for each analytics timeframe
+TIMEFRAME_MONTHS = {
+    "month": 6,
+    "quarter": 12,
+    "year": 24,
+}
+
+def timeframe_start(timeframe: str) -> date:
+    """
+    Get the first date included in the monthly summary for a timeframe
+    """
+    months_to_include = TIMEFRAME_MONTHS.get(timeframe, TIMEFRAME_MONTHS["month"])
+    start = datetime.now() - timedelta(days=30 * months_to_include)
+    # A transaction dated on the cutoff day falls before the cutoff time
+    if start.time() > datetime.min.time():
+        return start.date() + timedelta(days=1)
+    return start.date()
+
+def totals_by_type_and_category(db: Session, user_id) -> List[Tuple]:
+    """
+    Get (type, category, total) rows for a user, one per group
+    """
+    return (
+        db.query(Transaction.type, Transaction.category, func.sum(Transaction.amount))
+        .filter(Transaction.user_id == user_id)
+        .group_by(Transaction.type, Transaction.category)
+        .all()
+    )
+
+def build_category_breakdown(rows) -> List[dict]:
+    """
+    Build the expense category breakdown from (type, category, total) rows
+    """
+    category_totals = {
+        category: total or 0.0
+        for type_, category, total in rows
+        if type_ == TransactionType.EXPENSE
+    }
+    total_expense = sum(category_totals.values())
+
+    category_breakdown = []
+    for category, amount in category_totals.items():
+        percentage = (amount / total_expense * 100) if total_expense > 0 else 0
+        category_breakdown.append({
+            "name": category,
+            "amount": amount,
+            "percentage": round(percentage, 2),
+        })
+
+    # Sort by amount
+    category_breakdown.sort(key=lambda x: x["amount"], reverse=True)
+
+    return category_breakdown
+
+def build_income_vs_expense(rows) -> dict:
+    """
+    Build income/expense totals from (type, category, total) rows
+    """
+    total_income = sum(total or 0.0 for type_, _, total in rows if type_ == TransactionType.INCOME)
+    total_expense = sum(total or 0.0 for type_, _, total in rows if type_ == TransactionType.EXPENSE)
+
+    return {
+        "income": total_income,
+        "expense": total_expense,
+        "net": total_income - total_expense,
+    }
+
+def monthly_totals(db: Session, user_id, start_date: date) -> List[Tuple]:
+    """
+    Get (month, type, total) rows for a user from `start_date` onwards
+    """
+    bucket = month_bucket(db, Transaction.date).label("bucket")
+    return (
+        db.query(bucket, Transaction.type, func.sum(Transaction.amount))
+        .filter(
+            Transaction.user_id == user_id,
+            Transaction.date >= start_date,
+        )
+        .group_by(bucket, Transaction.type)
+        .all()
+    )
+
+def build_monthly_summary(rows) -> List[dict]:
+    """
+    Build the monthly summary from (month, type, total) rows
+    """
+    months = {}
+    for bucket_value, type_, total in rows:
+        month_start = to_date(bucket_value)
+        data = months.setdefault(month_start, {"income": 0, "expense": 0, "net": 0})
+        if type_ == TransactionType.INCOME:
+            data["income"] += total or 0.0
+        else:
+            data["expense"] += total or 0.0
+        data["net"] = data["income"] - data["expense"]
+
+    return [
+        {"month": month_start.strftime("%b %Y"), **data}
+        for month_start, data in sorted(months.items())
+    ]
+
+def get_category_totals(db: Session, user_id) -> List[Tuple]:
+    """
+    Get (type, category, total) rows, from the rollups when enabled
+    """
+    if settings.ANALYTICS_USE_ROLLUPS:
+        return rollups.totals_by_type_and_category(db, user_id)
+    return totals_by_type_and_category(db, user_id)
+
+def get_transaction_summary(db: Session, user_id) -> dict:
+    """
+    Compute the transaction summary payload (one grouped query; rows scale
+    with the number of categories)
+    """
+    rows = get_category_totals(db, user_id)
+    totals = build_income_vs_expense(rows)
+    return {
+        "total_income": totals["income"],
+        "total_expense": totals["expense"],
+        "net_balance": totals["net"],
+        "categories": build_category_breakdown(rows),
+    }
+
+def get_monthly_summary(db: Session, user_id, timeframe: str = "month") -> List[dict]:
+    """
+    Get income, expense and net per calendar month, from the rollups when enabled
+    """
+    start_date = timeframe_start(timeframe)
+    if settings.ANALYTICS_USE_ROLLUPS:
+        rows = rollups.monthly_totals(db, user_id, start_date)
+    else:
+        rows = monthly_totals(db, user_id, start_date)
+    return build_monthly_summary(rows)
+
+def get_transaction_analytics(db: Session, user_id, timeframe: str = "month") -> dict:
+    """
+    Compute the full analytics payload from grouped queries
+    """
+    rows = get_category_totals(db, user_id)
+
+    return {
+        "monthly_summary": get_monthly_summary(db, user_id, timeframe),
+        "category_breakdown": build_category_breakdown(rows),
+        "income_vs_expense": build_income_vs_expense(rows),
+    }
+
+# Series length when no start date is given, and the most buckets one may have
+DEFAULT_SERIES_BUCKETS = 12
+MAX_SERIES_BUCKETS = 1000
+
+def bucket_starts(start_date: date, end_date: date, granularity: str) -> List[date]:
+    """First days of the calendar buckets overlapping start_date..end_date"""
+    starts = []
+    current = bucket_start(start_date, granularity)
+    while current <= end_date:
+        starts.append(current)
+        current = next_bucket_start(current, granularity)
+    return starts
+
+def series_range(start_date: Optional[date], end_date: Optional[date], granularity: str) -> Tuple[date, date]:
+    """
+    Resolve the requested range: up to today by default, starting
+    DEFAULT_SERIES_BUCKETS buckets back. Raises ValueError for an empty or
+    too long range.
+    """
+    end_date = end_date or date.today()
+    if start_date is None:
+        start_date = bucket_start(end_date, granularity)
+        for _ in range(DEFAULT_SERIES_BUCKETS - 1):
+            start_date = bucket_start(start_date - timedelta(days=1), granularity)
+    if start_date > end_date:
+        raise ValueError("from must not be after to")
+    if len(bucket_starts(start_date, end_date, granularity)) > MAX_SERIES_BUCKETS:
+        raise ValueError(f"The range spans more than {MAX_SERIES_BUCKETS} {granularity} buckets")
+    return start_date, end_date
+
+def previous_period(start_date: date, end_date: date, granularity: str) -> Tuple[date, date]:
+    """
+    The period of the same length just before start_date..end_date: as
+    many whole months when the range is whole months (so March compares
+    with February, not with the 31 days before it), otherwise as many days
+    """
+    end_exclusive = end_date + timedelta(days=1)
+    if granularity in ("month", "quarter") and start_date.day == 1 and end_exclusive.day == 1:
+        months = (end_exclusive.year - start_date.year) * 12 + end_exclusive.month - start_date.month
+        return add_months(start_date, -months), start_date - timedelta(days=1)
+    return start_date - (end_exclusive - start_date), start_date - timedelta(days=1)
+
+def bucket_totals(db: Session, user_id, start_date: date, end_date: date, granularity: str) -> List[Tuple]:
+    """
+    Get (bucket start, type, total, count) rows for a user between two
+    dates (inclusive), grouped in the database
+    """
+    bucket = date_bucket(db, Transaction.date, granularity).label("bucket")
+    return (
+        db.query(bucket, Transaction.type, func.sum(Transaction.amount), func.count(Transaction.id))
+        .filter(
+            Transaction.user_id == user_id,
+            Transaction.date >= start_date,
+            Transaction.date <= end_date,
+        )
+        .group_by(bucket, Transaction.type)
+        .all()
+    )
+
+def get_bucket_totals(db: Session, user_id, start_date: date, end_date: date, granularity: str) -> List[Tuple]:
+    """
+    bucket_totals, with month and quarter buckets built from the monthly
+    rollups when enabled so their cost doesn't grow with the row count
+    """
+    if settings.ANALYTICS_USE_ROLLUPS and granularity in ("month", "quarter"):
+        return [
+            (bucket_start(to_date(month), granularity), type_, total, count)
+            for month, type_, total, count in rollups.monthly_totals_between(db, user_id, start_date, end_date)
+        ]
+    return bucket_totals(db, user_id, start_date, end_date, granularity)
+
+def build_series(rows, start_date: date, end_date: date, granularity: str) -> dict:
+    """
+    Build one period of the series from (bucket start, type, total, count)
+    rows, with a zero bucket for every calendar bucket that has none
+    """
+    starts = bucket_starts(start_date, end_date, granularity)
+    buckets = {
+        start: {
+            "start": start,
+            "end": next_bucket_start(start, granularity) - timedelta(days=1),
+            "label": bucket_label(start, granularity),
+            "income": 0.0,
+            "expense": 0.0,
+            "net": 0.0,
+            "count": 0,
+        }
+        for start in starts
+    }
+    for bucket_value, type_, total, count in rows:
+        bucket = buckets[to_date(bucket_value)]
+        bucket["income" if type_ == TransactionType.INCOME else "expense"] += total or 0.0
+        bucket["count"] += count or 0
+    for bucket in buckets.values():
+        bucket["net"] = bucket["income"] - bucket["expense"]
+
+    series = [buckets[start] for start in starts]
+    income = sum(bucket["income"] for bucket in series)
+    expense = sum(bucket["expense"] for bucket in series)
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "income": income,
+        "expense": expense,
+        "net": income - expense,
+        "buckets": series,
+    }
+
+def change_percentage(current: float, previous: float) -> Optional[float]:
+    """Percentage change from previous to current, None without a previous value"""
+    return round((current - previous) / previous * 100, 2) if previous > 0 else None
+
+def get_transaction_series(db: Session, user_id, start_date: date, end_date: date, granularity: str) -> dict:
+    """
+    Income, expense and net per calendar bucket between two dates, plus the
+    same series for the previous period; rows scale with the number of
+    buckets
+    """
+    previous_start, previous_end = previous_period(start_date, end_date, granularity)
+    current = build_series(
+        get_bucket_totals(db, user_id, start_date, end_date, granularity), start_date, end_date, granularity
+    )
+    previous = build_series(
+        get_bucket_totals(db, user_id, previous_start, previous_end, granularity), previous_start, previous_end, granularity
+    )
+    return {
+        "granularity": granularity,
+        "current": current,
+        "previous": previous,
+        "income_change_percentage": change_percentage(current["income"], previous["income"]),
+        "expense_change_percentage": change_percentage(current["expense"], previous["expense"]),
+    }
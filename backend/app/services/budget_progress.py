@@ -0,0 +1,58 @@
+from datetime import date
+from typing import Dict
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.budget import Budget
+from app.models.transaction import Transaction, TransactionType
+
+def progress_fields(budget: Budget, total_spent: float) -> dict:
+    """
+    Derive the progress fields of a budget from its spent amount
+    """
+    total_spent = total_spent or 0.0
+    start_dt = budget.start_date
+    end_dt = budget.end_date
+    if isinstance(start_dt, str):
+        start_dt = date.fromisoformat(start_dt)
+    if isinstance(end_dt, str):
+        end_dt = date.fromisoformat(end_dt)
+
+    remaining_amount = budget.amount - total_spent
+    percentage_spent = (total_spent / budget.amount * 100) if budget.amount > 0 else 0
+    is_over_budget = total_spent > budget.amount
+
+    days_left = None
+    today = date.today()
+    if end_dt >= today >= start_dt:
+        days_left = (end_dt - today).days
+    elif today < start_dt: # Budget period hasn't started
+        days_left = (end_dt - start_dt).days # Total duration
+    elif today > end_dt: # Budget period has passed
+        days_left = 0
+
+    return {
+        "spent_amount": total_spent,
+        "remaining_amount": remaining_amount,
+        "percentage_spent": round(percentage_spent, 2),
+        "is_over_budget": is_over_budget,
+        "days_left_in_period": days_left
+    }
+
+def spent_by_category(db: Session, user_id, start_date: date, end_date: date) -> Dict[str, float]:
+    """
+    Get expense totals per category for one date window (one GROUP BY query)
+    """
+    rows = (
+        db.query(Transaction.category, func.sum(Transaction.amount))
+        .filter(
+            Transaction.user_id == user_id,
+            Transaction.type == TransactionType.EXPENSE,
+            Transaction.date >= start_date,
+            Transaction.date <= end_date,
+        )
+        .group_by(Transaction.category)
+        .all()
+    )
+    return {category: total or 0.0 for category, total in rows}
@@ -0,0 +1,197 @@
+"""
+Maintained budget spend. A budget's spent_amount is the sum of its
+user's expenses in its category from start_date to end_date inclusive.
+
+Transaction writes adjust it in their own DB transaction, like the monthly
+rollups (record/remove/update_transaction take the same snapshots). New and
+edited budgets, and bulk imports, recompute it from the transactions. The
+nightly reconcile_budgets job (BUDGET_RECONCILE_HOUR) repairs any drift,
+e.g. from an expense written while its budget was being created, or from
+transactions removed with their partition.
+"""
+import logging
+from datetime import datetime
+from typing import Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.budget import Budget
+from app.models.transaction import Transaction, TransactionType
+from app.services import jobs
+from app.services.response_cache import bump_data_versions
+from app.services.rollups import RollupEntry, snapshot
+
+# Differences below this are float rounding, not drift
+TOLERANCE = 0.005
+
+logger = logging.getLogger(__name__)
+
+def _covering_budget(entry: RollupEntry):
+    """
+    Conditions matching the budget (if any) an expense counts towards. As a
+    category's budgets never overlap, it can only be the latest one starting
+    on or before the expense: one probe of the composite budgets index.
+    """
+    latest = (
+        select(Budget.id)
+        .where(Budget.user_id == entry.user_id, Budget.category == entry.category, Budget.start_date <= entry.date)
+        .order_by(Budget.start_date.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    return Budget.id == latest, Budget.end_date >= entry.date
+
+def _apply(db: Session, entry: RollupEntry, sign: int):
+    """Add (sign=1) or remove (sign=-1) one transaction from its budget's spend"""
+    if entry.type != TransactionType.EXPENSE:
+        return
+    db.execute(
+        update(Budget)
+        .where(*_covering_budget(entry))
+        .values(spent_amount=Budget.spent_amount + sign * entry.amount)
+        .execution_options(synchronize_session=False)
+    )
+
+def record_transaction(db: Session, transaction: Transaction):
+    """
+    Count a newly created transaction towards its budget
+    """
+    _apply(db, snapshot(transaction), 1)
+
+def remove_transaction(db: Session, transaction: Transaction):
+    """
+    Take a deleted transaction off its budget
+    """
+    _apply(db, snapshot(transaction), -1)
+
+def update_transaction(db: Session, before: RollupEntry, transaction: Transaction):
+    """
+    Move an edited transaction's amount between budgets; it may have
+    changed category, date, type or amount. `before` is the snapshot taken
+    before the update was applied.
+    """
+    after = snapshot(transaction)
+    if after == before:
+        return
+    _apply(db, before, -1)
+    _apply(db, after, 1)
+
+def spent_expression():
+    """A budget's spent amount summed from its transactions (correlated subquery)"""
+    return (
+        select(func.coalesce(func.sum(Transaction.amount), 0.0))
+        .where(
+            Transaction.user_id == Budget.user_id,
+            Transaction.category == Budget.category,
+            Transaction.type == TransactionType.EXPENSE,
+            Transaction.date >= Budget.start_date,
+            Transaction.date <= Budget.end_date,
+        )
+        .scalar_subquery()
+    )
+
+def compute_spent(db: Session, budget: Budget):
+    """Set a new or edited budget's spent_amount from its transactions"""
+    budget.spent_amount = db.execute(
+        select(func.coalesce(func.sum(Transaction.amount), 0.0)).where(
+            Transaction.user_id == budget.user_id,
+            Transaction.category == budget.category,
+            Transaction.type == TransactionType.EXPENSE,
+            Transaction.date >= budget.start_date,
+            Transaction.date <= budget.end_date,
+        )
+    ).scalar()
+
+def refresh_spent(db: Session, user_id):
+    """Recompute all of a user's budgets, e.g. after a bulk import (caller commits)"""
+    db.execute(
+        update(Budget)
+        .where(Budget.user_id == user_id)
+        .values(spent_amount=spent_expression())
+        .execution_options(synchronize_session=False)
+    )
+
+# Postgres: many new expenses as array parameters, summed per budget they fall in
+ADD_EXPENSES = text("""
+UPDATE budgets SET spent_amount = budgets.spent_amount + added.total
+FROM (
+    SELECT budgets.id, sum(expenses.amount) AS total
+    FROM unnest(CAST(:user_ids AS uuid[]), CAST(:categories AS varchar[]), CAST(:dates AS date[]), CAST(:amounts AS float8[]))
+        AS expenses (user_id, category, date, amount)
+    JOIN budgets ON budgets.user_id = expenses.user_id AND budgets.category = expenses.category
+        AND expenses.date BETWEEN budgets.start_date AND budgets.end_date
+    GROUP BY budgets.id
+) AS added
+WHERE budgets.id = added.id
+""")
+
+def record_entries(db: Session, entries: Iterable[RollupEntry]):
+    """
+    Count many new transactions towards their budgets at once, e.g. after a
+    bulk insert: one statement on Postgres; elsewhere the budgets they may
+    fall in are recomputed (caller commits)
+    """
+    expenses = [entry for entry in entries if entry.type == TransactionType.EXPENSE]
+    if not expenses:
+        return
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(ADD_EXPENSES, {
+            "user_ids": [str(entry.user_id) for entry in expenses],
+            "categories": [entry.category for entry in expenses],
+            "dates": [entry.date for entry in expenses],
+            "amounts": [entry.amount for entry in expenses],
+        })
+        return
+    db.execute(
+        update(Budget)
+        .where(
+            Budget.user_id.in_({entry.user_id for entry in expenses}),
+            Budget.start_date <= max(entry.date for entry in expenses),
+            Budget.end_date >= min(entry.date for entry in expenses),
+        )
+        .values(spent_amount=spent_expression())
+        .execution_options(synchronize_session=False)
+    )
+
+def reconcile_statement(user_id=None):
+    """UPDATE of the budgets whose spent_amount has drifted from their transactions"""
+    expected = spent_expression()
+    stmt = (
+        update(Budget)
+        .where(func.abs(Budget.spent_amount - expected) > TOLERANCE)
+        .values(spent_amount=expected)
+        .returning(Budget.user_id)
+        .execution_options(synchronize_session=False)
+    )
+    if user_id is not None:
+        stmt = stmt.where(Budget.user_id == user_id)
+    return stmt
+
+def reconcile(db: Session, user_id=None) -> int:
+    """
+    Repair drifted spent amounts, for one user or everyone, and invalidate
+    the cached responses of the users whose budgets changed. Returns the
+    number of budgets corrected. The caller commits.
+    """
+    user_ids = db.execute(reconcile_statement(user_id)).scalars().all()
+    if user_ids:
+        logger.warning("Repaired the spent amount of %d budgets", len(user_ids))
+        bump_data_versions(db, set(user_ids))
+    return len(user_ids)
+
+@jobs.handler("reconcile_budgets")
+def reconcile_budgets(db: Session, payload: dict):
+    user_id = payload.get("user_id")
+    reconcile(db, UUID(user_id) if user_id else None)
+
+def schedule_nightly(db: Session, now: Optional[datetime] = None):
+    """Queue today's reconcile_budgets job once BUDGET_RECONCILE_HOUR has passed"""
+    now = now or datetime.now()
+    if settings.BUDGET_RECONCILE_HOUR < 0 or now.hour < settings.BUDGET_RECONCILE_HOUR:
+        return
+    jobs.enqueue(db, "reconcile_budgets", key=f"reconcile_budgets:{now.date().isoformat()}")
+
+jobs.PERIODIC.append(schedule_nightly)
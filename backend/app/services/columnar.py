@@ -0,0 +1,268 @@
+"""
+Vectorized analytics over a user's whole transaction history.
+
+load_columns() fetches (day, amount, is_income, category) with a Core
+select, without building ORM objects, into NumPy arrays. The kernels below
+group and roll over those arrays instead of looping over rows in Python,
+for computations that are awkward in SQL: rolling averages, running
+balance, spending velocity and per-category trends.
+"""
+import calendar
+from datetime import date, timedelta
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.transaction import Transaction, TransactionType
+from app.services.aggregation import change_percentage
+from app.utils.dates import epoch_days
+
+EPOCH = date(1970, 1, 1)
+
+class TransactionColumns(NamedTuple):
+    """One user's transactions as parallel arrays"""
+    days: np.ndarray # int32 days since 1970-01-01
+    amounts: np.ndarray # float64, positive for both types
+    is_income: np.ndarray # bool
+    category_codes: np.ndarray # int32 index into categories
+    categories: List[str]
+
+    @property
+    def expenses(self) -> np.ndarray:
+        """Amounts with income zeroed out"""
+        return np.where(self.is_income, 0.0, self.amounts)
+
+    @property
+    def incomes(self) -> np.ndarray:
+        """Amounts with expenses zeroed out"""
+        return np.where(self.is_income, self.amounts, 0.0)
+
+def to_day(value: date) -> int:
+    return (value - EPOCH).days
+
+def from_day(day: int) -> date:
+    return EPOCH + timedelta(days=int(day))
+
+# One record per fetched row: (day, amount, is_income, category)
+ROW_DTYPE = np.dtype([("day", np.int32), ("amount", np.float64), ("is_income", np.bool_), ("category", object)])
+
+def columns_from_rows(rows) -> TransactionColumns:
+    """Build the arrays from (day, amount, is_income, category) tuples"""
+    if rows and not isinstance(rows[0], tuple):
+        # asyncpg returns Record objects; structured arrays need tuples
+        rows = [tuple(row) for row in rows]
+    # One C-level pass over the tuples, then contiguous copies per column
+    records = np.array(rows, dtype=ROW_DTYPE)
+    # Factorize categories in first-seen order with one dict lookup per row
+    index = {}
+    codes = np.fromiter(
+        (index.setdefault(category, len(index)) for category in records["category"]),
+        dtype=np.int32,
+        count=len(records),
+    )
+    return TransactionColumns(
+        np.ascontiguousarray(records["day"]),
+        np.ascontiguousarray(records["amount"]),
+        np.ascontiguousarray(records["is_income"]),
+        codes,
+        list(index),
+    )
+
+def load_columns(db: Session, user_id, end_date: Optional[date] = None) -> TransactionColumns:
+    """
+    Load a user's transactions (up to end_date) as arrays. Dates arrive as
+    integer day numbers and the type as a boolean, so the driver creates
+    no date or enum objects, and rows are read from the DBAPI cursor
+    without building Row objects.
+    """
+    stmt = select(
+        epoch_days(db, Transaction.date),
+        Transaction.amount,
+        Transaction.type == TransactionType.INCOME,
+        Transaction.category,
+    ).where(Transaction.user_id == user_id)
+    if end_date is not None:
+        stmt = stmt.where(Transaction.date <= end_date)
+    # A Core execution, so the statement is still compiled, cached and
+    # instrumented like any other; only the fetch bypasses the result layer
+    result = db.connection().execute(stmt)
+    try:
+        rows = result.cursor.fetchall()
+    finally:
+        result.close()
+    return columns_from_rows(rows)
+
+def daily_sums(days: np.ndarray, weights: np.ndarray, first_day: int, last_day: int) -> np.ndarray:
+    """Sum weights per day for every day in [first_day, last_day]"""
+    mask = (days >= first_day) & (days <= last_day)
+    return np.bincount(days[mask] - first_day, weights=weights[mask], minlength=last_day - first_day + 1)
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing mean over `window` values; the first window - 1 positions
+    average the values available so far
+    """
+    sums = np.cumsum(values, dtype=np.float64)
+    sums[window:] = sums[window:] - sums[:-window]
+    return sums / np.minimum(np.arange(1, len(values) + 1), window)
+
+def group_sums(codes: np.ndarray, weights: np.ndarray, groups: int) -> np.ndarray:
+    """Sum weights per group code"""
+    return np.bincount(codes, weights=weights, minlength=groups)
+
+def month_numbers(days: np.ndarray) -> np.ndarray:
+    """Months since January 1970 for day numbers"""
+    return days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+def month_label(month_number: int) -> str:
+    return date(1970 + month_number // 12, month_number % 12 + 1, 1).strftime("%b %Y")
+
+def monthly_summary(columns: TransactionColumns, start_date: date) -> List[dict]:
+    """Income, expense and net per month from start_date onwards"""
+    mask = columns.days >= to_day(start_date)
+    if not mask.any():
+        return []
+    months = month_numbers(columns.days[mask])
+    first = int(months.min())
+    offsets = months - first
+    income = np.bincount(offsets, weights=columns.incomes[mask]).tolist()
+    expense = np.bincount(offsets, weights=columns.expenses[mask]).tolist()
+    return [
+        {
+            "month": month_label(first + offset),
+            "income": income[offset],
+            "expense": expense[offset],
+            "net": income[offset] - expense[offset],
+        }
+        for offset in np.flatnonzero(np.bincount(offsets)).tolist()
+    ]
+
+def category_breakdown(columns: TransactionColumns) -> List[dict]:
+    """Expense total and share per category, largest first"""
+    expense = ~columns.is_income
+    totals = group_sums(columns.category_codes[expense], columns.amounts[expense], len(columns.categories))
+    present = np.bincount(columns.category_codes[expense], minlength=len(columns.categories)) > 0
+    total_expense = totals.sum()
+    breakdown = [
+        {
+            "name": columns.categories[code],
+            "amount": float(totals[code]),
+            "percentage": round(float(totals[code] / total_expense * 100), 2) if total_expense > 0 else 0,
+        }
+        for code in np.flatnonzero(present).tolist()
+    ]
+    breakdown.sort(key=lambda x: x["amount"], reverse=True)
+    return breakdown
+
+def income_vs_expense(columns: TransactionColumns) -> dict:
+    income = float(columns.amounts[columns.is_income].sum())
+    expense = float(columns.amounts[~columns.is_income].sum())
+    return {"income": income, "expense": expense, "net": income - expense}
+
+def transaction_trends(columns: TransactionColumns, end_date: date, days: int = 90, window: int = 7) -> dict:
+    """
+    Daily income/expense with a rolling expense average and running
+    balance over the last `days` days, spending velocity, and per-category
+    trends comparing the last `window` days with the `window` before
+    """
+    last = to_day(end_date)
+    first = last - days + 1
+    # Daily series start early enough for full windows on day one and for
+    # the velocity comparison
+    lead = min(first - (window - 1), last - 2 * window + 1)
+    income = daily_sums(columns.days, columns.incomes, lead, last)
+    expense = daily_sums(columns.days, columns.expenses, lead, last)
+    expense_average = rolling_mean(expense, window)
+
+    shown = slice(first - lead, None)
+    net = income[shown] - expense[shown]
+    opening_balance = float(columns.incomes[columns.days < first].sum() - columns.expenses[columns.days < first].sum())
+    balance = opening_balance + np.cumsum(net)
+
+    series = {
+        "income": income[shown],
+        "expense": expense[shown],
+        "net": net,
+        "balance": balance,
+        "expense_rolling_average": expense_average[shown],
+    }
+    rounded = {name: np.round(values, 2).tolist() for name, values in series.items()}
+    daily = [
+        {"date": from_day(first + offset), **{name: values[offset] for name, values in rounded.items()}}
+        for offset in range(days)
+    ]
+
+    recent_daily = float(expense[-window:].mean())
+    previous_daily = float(expense[-2 * window:-window].mean())
+    month_first = to_day(end_date.replace(day=1))
+    month_to_date = float(columns.expenses[(columns.days >= month_first) & (columns.days <= last)].sum())
+    days_in_month = calendar.monthrange(end_date.year, end_date.month)[1]
+    velocity = {
+        "recent_daily_expense": round(recent_daily, 2),
+        "previous_daily_expense": round(previous_daily, 2),
+        "change_percentage": change_percentage(recent_daily, previous_daily),
+        "month_to_date_expense": round(month_to_date, 2),
+        "projected_month_expense": round(month_to_date / end_date.day * days_in_month, 2),
+    }
+
+    return {
+        "start_date": from_day(first),
+        "end_date": end_date,
+        "window_days": window,
+        "opening_balance": round(opening_balance, 2),
+        "daily": daily,
+        "velocity": velocity,
+        "categories": category_trends(columns, first, last, window),
+    }
+
+def category_trends(columns: TransactionColumns, first: int, last: int, window: int) -> List[dict]:
+    """
+    Per expense category over day numbers [first, last]: total, daily
+    average of the last `window` days against the `window` before, and a
+    monthly series
+    """
+    groups = len(columns.categories)
+    expense = ~columns.is_income
+    in_range = expense & (columns.days >= first) & (columns.days <= last)
+    codes = columns.category_codes[in_range]
+    amounts = columns.amounts[in_range]
+    days = columns.days[in_range]
+    totals = group_sums(codes, amounts, groups)
+
+    recent = days > last - window
+    previous = (days > last - 2 * window) & ~recent
+    recent_daily = group_sums(codes[recent], amounts[recent], groups) / window
+    previous_daily = group_sums(codes[previous], amounts[previous], groups) / window
+
+    first_month = int(month_numbers(np.array([first]))[0])
+    month_count = int(month_numbers(np.array([last]))[0]) - first_month + 1
+    by_month = np.bincount(
+        codes.astype(np.int64) * month_count + (month_numbers(days) - first_month),
+        weights=amounts,
+        minlength=groups * month_count,
+    ).reshape(groups, month_count)
+    labels = [month_label(first_month + offset) for offset in range(month_count)]
+
+    order = np.argsort(-totals, kind="stable")
+    return [
+        {
+            "name": columns.categories[code],
+            "total": round(float(totals[code]), 2),
+            "recent_daily_average": round(float(recent_daily[code]), 2),
+            "previous_daily_average": round(float(previous_daily[code]), 2),
+            "change_percentage": change_percentage(float(recent_daily[code]), float(previous_daily[code])),
+            "monthly": [
+                {"month": label, "amount": amount}
+                for label, amount in zip(labels, np.round(by_month[code], 2).tolist())
+            ],
+        }
+        for code in order.tolist()
+        if totals[code] > 0
+    ]
+
+def get_transaction_trends(db: Session, user_id, days: int = 90, window: int = 7, end_date: Optional[date] = None) -> dict:
+    """Compute the trends payload for a user up to end_date (default today)"""
+    end_date = end_date or date.today()
+    return transaction_trends(load_columns(db, user_id, end_date), end_date, days, window)
@@ -0,0 +1,276 @@
+import csv
+import io
+import json
+import re
+import uuid
+from typing import IO, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.transaction import Transaction
+from app.schemas.transaction import TransactionCreate
+from app.services import budget_spend, rollups
+
+SUPPORTED_FORMATS = ("csv", "ndjson", "ofx")
+
+# File extensions recognised when no format is given explicitly
+EXTENSION_FORMATS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".ofx": "ofx",
+    ".qfx": "ofx",
+}
+
+# Rows validated and inserted per batch; memory use is bounded by this,
+# not by the size of the upload
+CHUNK_SIZE = 1000
+
+# Only the first errors are returned in full; the rest are counted
+MAX_REPORTED_ERRORS = 100
+
+OFX_READ_SIZE = 64 * 1024
+OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+# A parsed record: (1-based record number, fields, parse error)
+ParsedRecord = Tuple[int, Optional[dict], Optional[str]]
+
+def detect_format(filename: Optional[str], requested: Optional[str] = None) -> Optional[str]:
+    """
+    Resolve the import format from an explicit value or the file extension
+    """
+    if requested:
+        return requested.lower() if requested.lower() in SUPPORTED_FORMATS else None
+    for extension, file_format in EXTENSION_FORMATS.items():
+        if (filename or "").lower().endswith(extension):
+            return file_format
+    return None
+
+def parse_csv(stream: IO[bytes]) -> Iterator[ParsedRecord]:
+    """
+    Yield rows of a CSV file with a header line, one at a time
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    number = 0
+    try:
+        for row in csv.DictReader(text):
+            number += 1
+            yield number, {key: value for key, value in row.items() if key}, None
+    except (csv.Error, UnicodeDecodeError) as exc:
+        yield number + 1, None, f"Unreadable CSV: {exc}"
+    finally:
+        # Don't let the wrapper close the upload when it is garbage collected
+        text.detach()
+
+def parse_ndjson(stream: IO[bytes]) -> Iterator[ParsedRecord]:
+    """
+    Yield one JSON object per non-empty line
+    """
+    number = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            value = json.loads(line)
+        except ValueError as exc:
+            yield number, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(value, dict):
+            yield number, None, "Expected a JSON object"
+            continue
+        yield number, value, None
+
+def _ofx_fields(transaction: dict) -> dict:
+    """
+    Map an OFX <STMTTRN> block to transaction fields
+    """
+    posted = transaction.get("DTPOSTED", "")
+    name = transaction.get("NAME") or transaction.get("PAYEE")
+    memo = transaction.get("MEMO")
+    return {
+        "description": name or memo,
+        "amount": transaction.get("TRNAMT"),
+        "date": f"{posted[:4]}-{posted[4:6]}-{posted[6:8]}" if len(posted) >= 8 else posted,
+        "notes": memo if name else None,
+    }
+
+def parse_ofx(stream: IO[bytes]) -> Iterator[ParsedRecord]:
+    """
+    Yield the <STMTTRN> entries of an OFX/QFX statement, SGML (v1) or XML (v2),
+    reading the file in fixed-size blocks
+    """
+    number = 0
+    current = None
+    buffer = ""
+    while True:
+        block = stream.read(OFX_READ_SIZE)
+        buffer += block.decode("utf-8", errors="replace")
+        # Only handle complete tags; keep a trailing partial tag for the next block
+        cut = len(buffer) if not block else buffer.rfind("<")
+        if cut <= 0 and block:
+            continue
+        for closing, tag, value in OFX_TAG.findall(buffer[:cut]):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if closing and current is not None:
+                    number += 1
+                    yield number, _ofx_fields(current), None
+                current = None if closing else {}
+            elif current is not None and not closing:
+                current[tag] = value.strip()
+        buffer = buffer[cut:]
+        if not block:
+            break
+
+PARSERS = {
+    "csv": parse_csv,
+    "ndjson": parse_ndjson,
+    "ofx": parse_ofx,
+}
+
+def normalize_fields(fields: dict, default_category: str) -> dict:
+    """
+    Clean up a raw record before validation: lower-case keys, drop empty
+    values, default the category, and take the type from the amount's sign
+    when the file has no type column (as in most bank exports)
+    """
+    normalized = {}
+    for key, value in fields.items():
+        if isinstance(value, str):
+            value = value.strip()
+            if not value:
+                continue
+        if value is not None:
+            normalized[str(key).strip().lower()] = value
+
+    normalized.setdefault("category", default_category)
+    if isinstance(normalized.get("type"), str):
+        normalized["type"] = normalized["type"].lower()
+    elif "type" not in normalized and "amount" in normalized:
+        try:
+            amount = float(normalized["amount"])
+        except (TypeError, ValueError):
+            return normalized
+        normalized["type"] = "expense" if amount < 0 else "income"
+        normalized["amount"] = abs(amount)
+    return normalized
+
+def _format_validation_error(exc: ValidationError) -> str:
+    """Flatten a pydantic error into one line per failing field"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+COPY_COLUMNS = ("id", "user_id", "description", "amount", "date", "type", "category", "notes")
+
+def _copy_rows(db: Session, rows: List[dict]):
+    """
+    Load rows with COPY ... FROM STDIN on the session's own connection
+    (Postgres with psycopg2), so they stay in the import's DB transaction
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([
+            row["id"],
+            row["user_id"],
+            row["description"],
+            row["amount"],
+            row["date"].isoformat(),
+            row["type"].name, # Enum columns store member names
+            row["category"],
+            row["notes"], # None is written unquoted, which COPY reads as NULL
+        ])
+    buffer.seek(0)
+
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY transactions ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+def insert_rows(db: Session, rows: List[dict]):
+    """
+    Bulk-write complete transaction rows (COPY_COLUMNS keys): COPY on
+    Postgres, a multi-row INSERT elsewhere. Rollups are not updated.
+    """
+    bind = db.get_bind()
+    if bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2":
+        _copy_rows(db, rows)
+    else:
+        db.execute(insert(Transaction.__table__), rows) # Core: no ORM bookkeeping per row
+
+def _insert_chunk(db: Session, user_id, chunk: List[TransactionCreate], batch: rollups.RollupBatch):
+    """
+    Write a batch of validated rows. Rollup deltas are accumulated in `batch`.
+    """
+    rows = [{**item.model_dump(), "id": uuid.uuid4(), "user_id": user_id} for item in chunk]
+    insert_rows(db, rows)
+
+    for row in rows:
+        batch.add(rollups.RollupEntry(user_id, row["date"], row["category"], row["type"], row["amount"]))
+
+def import_transactions(
+    db: Session,
+    user_id,
+    stream: IO[bytes],
+    file_format: str,
+    default_category: str = "Uncategorized",
+    chunk_size: int = CHUNK_SIZE,
+) -> dict:
+    """
+    Stream records from an uploaded file into the transactions table.
+    Invalid rows are skipped and reported; valid rows are written in
+    batches; the monthly rollups are updated once per touched bucket and
+    the budgets' spent amounts recomputed at the end. The caller commits,
+    so the whole import is one DB transaction.
+    """
+    summary = {
+        "format": file_format,
+        "total_rows": 0,
+        "imported": 0,
+        "failed": 0,
+        "errors": [],
+        "errors_truncated": False,
+    }
+
+    def fail(number: int, message: str):
+        summary["failed"] += 1
+        if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+            summary["errors"].append({"row": number, "error": message})
+        else:
+            summary["errors_truncated"] = True
+
+    batch = rollups.RollupBatch()
+    chunk: List[TransactionCreate] = []
+    for number, fields, error in PARSERS[file_format](stream):
+        summary["total_rows"] += 1
+        if error is not None:
+            fail(number, error)
+            continue
+        try:
+            chunk.append(TransactionCreate.model_validate(normalize_fields(fields, default_category)))
+        except ValidationError as exc:
+            fail(number, _format_validation_error(exc))
+            continue
+
+        if len(chunk) >= chunk_size:
+            _insert_chunk(db, user_id, chunk, batch)
+            summary["imported"] += len(chunk)
+            chunk = []
+
+    if chunk:
+        _insert_chunk(db, user_id, chunk, batch)
+        summary["imported"] += len(chunk)
+    batch.flush(db)
+    if summary["imported"]:
+        budget_spend.refresh_spent(db, user_id)
+
+    return summary
@@ -0,0 +1,240 @@
+"""
+In-process background jobs backed by the jobs table. No broker: every
+worker process runs a JobRunner (started in app.main's lifespan) that polls
+for due jobs. A job is claimed with a conditional UPDATE, so each runs once
+even with several processes. Failed jobs are retried with exponential
+backoff up to max_attempts; jobs left running by a crashed process are
+requeued after JOBS_TIMEOUT_SECONDS.
+
+Handlers are registered with @handler("kind") and receive a sync Session
+and the job's payload; their changes are committed when they return.
+"""
+import asyncio
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.core import database
+from app.core.config import settings
+from app.models.job import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Session, dict], None]
+HANDLERS: Dict[str, Handler] = {}
+# Functions the runner calls about once a minute, e.g. to queue nightly work
+PERIODIC: List[Callable[[Session], None]] = []
+
+# Longest error text kept on a job
+MAX_ERROR_LENGTH = 4000
+HOUSEKEEPING_SECONDS = 60
+
+def handler(kind: str):
+    """Register a function as the handler for jobs of this kind"""
+    def register(function: Handler) -> Handler:
+        HANDLERS[kind] = function
+        return function
+    return register
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+def _insert_ignoring_duplicates(db: Session):
+    """INSERT that skips jobs whose key is already taken"""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return dialect_insert(Job).on_conflict_do_nothing(index_elements=["key"])
+
+def enqueue_many(db: Session, kind: str, payloads: List[dict], keys: Optional[List[str]] = None, delay: float = 0):
+    """
+    Queue one job per payload in the caller's transaction. A job whose key
+    already exists (queued, running or finished) is skipped.
+    """
+    if not payloads:
+        return
+    run_at = _now() + timedelta(seconds=delay)
+    db.execute(_insert_ignoring_duplicates(db), [
+        {
+            "id": uuid.uuid4(),
+            "kind": kind,
+            "payload": payload,
+            "key": keys[index] if keys else None,
+            "status": JobStatus.QUEUED,
+            "attempts": 0,
+            "max_attempts": settings.JOBS_MAX_ATTEMPTS,
+            "run_at": run_at,
+        }
+        for index, payload in enumerate(payloads)
+    ])
+
+def enqueue(db: Session, kind: str, payload: Optional[dict] = None, key: Optional[str] = None, delay: float = 0):
+    """Queue a job in the caller's transaction"""
+    enqueue_many(db, kind, [payload or {}], [key] if key else None, delay)
+
+def claim(db: Session) -> Optional[uuid.UUID]:
+    """Mark the oldest due job as running and return its id, or None"""
+    now = _now()
+    candidates = db.execute(
+        select(Job.id)
+        .where(Job.status == JobStatus.QUEUED, Job.run_at <= now)
+        .order_by(Job.run_at)
+        .limit(10)
+    ).scalars().all()
+    for job_id in candidates:
+        # Another process may have claimed it since the select
+        claimed = db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == JobStatus.QUEUED)
+            .values(status=JobStatus.RUNNING, attempts=Job.attempts + 1, started_at=now)
+        ).rowcount
+        db.commit()
+        if claimed:
+            return job_id
+    return None
+
+def _retry_delay(attempts: int) -> float:
+    return settings.JOBS_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+
+def run_job(job_id) -> bool:
+    """Run a claimed job in its own session; returns whether it succeeded"""
+    db = database.SessionLocal()
+    try:
+        job = db.get(Job, job_id)
+        try:
+            handle = HANDLERS.get(job.kind)
+            if handle is None:
+                raise LookupError(f"No handler for job kind {job.kind!r}")
+            handle(db, dict(job.payload))
+            job.status = JobStatus.DONE
+            job.last_error = None
+            job.finished_at = _now()
+            db.commit()
+            return True
+        except Exception as exc:
+            db.rollback()
+            job = db.get(Job, job_id)
+            job.last_error = f"{type(exc).__name__}: {exc}"[:MAX_ERROR_LENGTH]
+            if job.attempts < job.max_attempts:
+                job.status = JobStatus.QUEUED
+                job.run_at = _now() + timedelta(seconds=_retry_delay(job.attempts))
+                logger.warning("Job %s (%s) failed, attempt %d of %d: %s", job_id, job.kind, job.attempts, job.max_attempts, exc)
+            else:
+                job.status = JobStatus.FAILED
+                job.finished_at = _now()
+                logger.exception("Job %s (%s) failed for good after %d attempts", job_id, job.kind, job.attempts)
+            db.commit()
+            return False
+    finally:
+        db.close()
+
+def housekeeping(db: Session):
+    """
+    Requeue (or fail) jobs whose process died while running them, delete
+    old finished jobs and run the periodic functions
+    """
+    now = _now()
+    stale = now - timedelta(seconds=settings.JOBS_TIMEOUT_SECONDS)
+    running = (Job.status == JobStatus.RUNNING) & (Job.started_at < stale)
+    db.execute(
+        update(Job)
+        .where(running, Job.attempts < Job.max_attempts)
+        .values(status=JobStatus.QUEUED, run_at=now, last_error="Timed out")
+    )
+    db.execute(
+        update(Job)
+        .where(running, Job.attempts >= Job.max_attempts)
+        .values(status=JobStatus.FAILED, finished_at=now, last_error="Timed out")
+    )
+    db.execute(
+        delete(Job).where(
+            Job.status.in_((JobStatus.DONE, JobStatus.FAILED)),
+            Job.finished_at < now - timedelta(days=settings.JOBS_RETENTION_DAYS),
+        )
+    )
+    for periodic in PERIODIC:
+        periodic(db)
+    db.commit()
+
+def _claim_in_new_session() -> Optional[uuid.UUID]:
+    db = database.SessionLocal()
+    try:
+        return claim(db)
+    finally:
+        db.close()
+
+def _housekeeping_in_new_session():
+    db = database.SessionLocal()
+    try:
+        housekeeping(db)
+    finally:
+        db.close()
+
+def run_until_empty(concurrency: int = 1) -> int:
+    """
+    Run due jobs on `concurrency` threads until none are left, including
+    jobs they queue; returns how many ran. For the CLI and tests.
+    """
+    ran = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while True:
+            job_ids = []
+            while len(job_ids) < concurrency:
+                job_id = _claim_in_new_session()
+                if job_id is None:
+                    break
+                job_ids.append(job_id)
+            if not job_ids:
+                return ran
+            list(pool.map(run_job, job_ids))
+            ran += len(job_ids)
+
+class JobRunner:
+    """
+    Polls for due jobs and runs at most JOBS_CONCURRENCY at a time on the
+    threadpool, so long jobs don't block the event loop
+    """
+
+    def __init__(self, concurrency: int, poll_seconds: float):
+        self.slots = asyncio.Semaphore(concurrency)
+        self.poll_seconds = poll_seconds
+        self._tasks = set()
+
+    async def _run(self, job_id):
+        try:
+            await run_in_threadpool(run_job, job_id)
+        finally:
+            self.slots.release()
+
+    async def run(self):
+        """Run until cancelled"""
+        loop = asyncio.get_running_loop()
+        next_housekeeping = 0.0
+        while True:
+            if loop.time() >= next_housekeeping:
+                next_housekeeping = loop.time() + HOUSEKEEPING_SECONDS
+                try:
+                    await run_in_threadpool(_housekeeping_in_new_session)
+                except Exception:
+                    logger.exception("Job housekeeping failed")
+            await self.slots.acquire()
+            try:
+                job_id = await run_in_threadpool(_claim_in_new_session)
+            except Exception:
+                # Typically the database being unreachable; try again later
+                logger.exception("Claiming a job failed")
+                job_id = None
+            if job_id is None:
+                self.slots.release()
+                await asyncio.sleep(self.poll_seconds)
+                continue
+            task = asyncio.create_task(self._run(job_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
@@ -0,0 +1,213 @@
+"""
+Postgres range partitioning of the transactions table by date.
+
+A partitioned transactions table has one partition per year or month
+(transactions_2025, transactions_2025_03) plus transactions_default, which
+catches dates no partition covers yet so inserts never fail. Queries
+bounded by date only scan the partitions overlapping the range, and old
+partitions can be detached, then archived or dropped, without touching the
+rest of the table.
+
+The table is converted by migration 0006 (when
+TRANSACTION_PARTITION_INTERVAL is set, with the indexes of that revision)
+or `python -m app.cli partition-transactions` (with the current model's);
+`python -m app.cli create-partitions` is the job that creates the coming
+periods' partitions ahead of time. Detaching or dropping partitions
+rebuilds the rollups and budget spend of the users whose rows left.
+"""
+import re
+from datetime import date
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+
+from app.models.transaction import Transaction
+from app.services import budget_spend, rollups, search
+from app.utils.dates import month_start, next_month_start
+
+TABLE = "transactions"
+DEFAULT_PARTITION = f"{TABLE}_default"
+INTERVALS = ("year", "month")
+
+_BOUND = re.compile(r"FROM \('([\d-]+)'\) TO \('([\d-]+)'\)")
+
+class Partition(NamedTuple):
+    """A partition of the transactions table and its [start, end) range"""
+    name: str
+    start: Optional[date] # None for the default partition
+    end: Optional[date]
+
+def period_start(day: date, interval: str) -> date:
+    return day.replace(month=1, day=1) if interval == "year" else month_start(day)
+
+def next_period_start(day: date, interval: str) -> date:
+    return date(day.year + 1, 1, 1) if interval == "year" else next_month_start(day)
+
+def partition_name(start: date, interval: str) -> str:
+    return f"{TABLE}_{start:%Y}" if interval == "year" else f"{TABLE}_{start:%Y_%m}"
+
+def is_partitioned(conn: Connection) -> bool:
+    return conn.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+        {"table": TABLE},
+    ).scalar()
+
+def list_partitions(conn: Connection) -> List[Partition]:
+    """Partitions of the transactions table, the default one last"""
+    rows = conn.execute(text(
+        "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+        "FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = to_regclass(:table)"
+    ), {"table": TABLE})
+    partitions = []
+    for name, bound in rows:
+        match = _BOUND.search(bound)
+        if match:
+            partitions.append(Partition(name, date.fromisoformat(match[1]), date.fromisoformat(match[2])))
+        else:
+            partitions.append(Partition(name, None, None))
+    return sorted(partitions, key=lambda partition: (partition.start is None, partition.start))
+
+def detect_interval(partitions: List[Partition], fallback: str) -> str:
+    """The interval existing partitions were created with"""
+    for partition in partitions:
+        if partition.start is not None:
+            return "year" if (partition.end - partition.start).days > 31 else "month"
+    return fallback
+
+def _create_partition(conn: Connection, name: str, start: date, end: date):
+    create = f"CREATE TABLE {name} PARTITION OF {TABLE} FOR VALUES FROM ('{start}') TO ('{end}')"
+    in_range = f"date >= '{start}' AND date < '{end}'"
+    if conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_range})")).scalar():
+        # Rows for this period landed in the default partition before it
+        # existed; Postgres refuses the new partition until they move
+        conn.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {DEFAULT_PARTITION}"))
+        conn.execute(text(create))
+        conn.execute(text(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}"))
+        conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"))
+        conn.execute(text(f"ALTER TABLE {TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    else:
+        conn.execute(text(create))
+
+def ensure_partitions(conn: Connection, first_day: date, last_day: date, interval: Optional[str] = None) -> List[str]:
+    """
+    Create the missing partitions covering first_day to last_day (and the
+    default partition); returns the names created
+    """
+    partitions = list_partitions(conn)
+    interval = detect_interval(partitions, interval or "year")
+    existing = {partition.name for partition in partitions}
+    created = []
+    if DEFAULT_PARTITION not in existing:
+        conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT"))
+        created.append(DEFAULT_PARTITION)
+    start = period_start(first_day, interval)
+    while start <= last_day:
+        end = next_period_start(start, interval)
+        name = partition_name(start, interval)
+        if name not in existing:
+            _create_partition(conn, name, start, end)
+            created.append(name)
+        start = end
+    return created
+
+def create_future_partitions(conn: Connection, periods_ahead: int, today: Optional[date] = None) -> List[str]:
+    """Make sure the current period and the next periods_ahead have partitions"""
+    today = today or date.today()
+    interval = detect_interval(list_partitions(conn), "year")
+    last_day = today
+    for _ in range(periods_ahead):
+        last_day = next_period_start(last_day, interval)
+    return ensure_partitions(conn, today, last_day, interval)
+
+def detach_partitions(db: Session, before: date, drop: bool = False) -> List[str]:
+    """
+    Detach (or drop) the partitions holding only dates before `before`. A
+    detached partition is a plain table that can be archived (pg_dump -t)
+    and dropped at leisure. The rollups and budget spend of the users whose
+    rows left are rebuilt, and their cached responses invalidated, in the
+    same DB transaction (caller commits). Returns the names.
+    """
+    conn = db.connection()
+    names, user_ids = [], set()
+    for partition in list_partitions(conn):
+        if partition.end is None or partition.end > before:
+            continue
+        user_ids.update(conn.execute(text(f"SELECT DISTINCT user_id FROM {partition.name}")).scalars())
+        conn.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {partition.name}"))
+        if drop:
+            conn.execute(text(f"DROP TABLE {partition.name}"))
+        names.append(partition.name)
+    for user_id in user_ids:
+        budget_spend.refresh_spent(db, user_id)
+        rollups.rebuild_rollups(db, user_id) # Also bumps the user's data version
+    return names
+
+def model_indexes(conn: Connection) -> Dict[str, str]:
+    """Name -> CREATE INDEX statement of the transactions indexes the current code declares"""
+    indexes = {index.name: str(CreateIndex(index).compile(dialect=conn.dialect)) for index in Transaction.__table__.indexes}
+    if search.has_trigram(conn):
+        indexes[search.TRIGRAM_INDEX] = search.TRIGRAM_INDEX_DDL
+    return indexes
+
+def _move_table(conn: Connection, indexes: Dict[str, str]) -> str:
+    """Rename the current table out of the way, dropping its indexes"""
+    old = f"{TABLE}_old"
+    for name in indexes:
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    conn.execute(text(f"ALTER TABLE {TABLE} RENAME TO {old}"))
+    conn.execute(text(f"ALTER TABLE {old} RENAME CONSTRAINT {TABLE}_pkey TO {old}_pkey"))
+    return old
+
+def _finish_table(conn: Connection, old: str, indexes: Dict[str, str]):
+    """Copy the rows over, drop the old table and index the new one"""
+    conn.execute(text(f"INSERT INTO {TABLE} SELECT * FROM {old}"))
+    conn.execute(text(f"DROP TABLE {old}"))
+    conn.execute(text(f"ALTER TABLE {TABLE} ADD FOREIGN KEY (user_id) REFERENCES users (id)"))
+    # Indexes on a partitioned table are created on every partition
+    for statement in indexes.values():
+        conn.execute(text(statement))
+    conn.execute(text(f"ANALYZE {TABLE}"))
+
+def partition_table(
+    conn: Connection,
+    interval: str,
+    periods_ahead: int = 2,
+    today: Optional[date] = None,
+    indexes: Optional[Dict[str, str]] = None,
+):
+    """
+    Convert the transactions table into one range-partitioned by date,
+    with partitions for all existing rows and periods_ahead future periods.
+    Copies every row under an exclusive lock; run it in a quiet period.
+    `indexes` (name -> CREATE INDEX) defaults to model_indexes().
+    """
+    if interval not in INTERVALS:
+        raise ValueError(f"Partition interval must be one of {INTERVALS}, not {interval!r}")
+    if is_partitioned(conn):
+        return
+    today = today or date.today()
+    indexes = model_indexes(conn) if indexes is None else indexes
+    old = _move_table(conn, indexes)
+    conn.execute(text(
+        f"CREATE TABLE {TABLE} (LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) PARTITION BY RANGE (date)"
+    ))
+    # The partition key must be part of the primary key; ids stay UUIDs
+    conn.execute(text(f"ALTER TABLE {TABLE} ADD PRIMARY KEY (id, date)"))
+    first_day = conn.execute(text(f"SELECT min(date) FROM {old}")).scalar() or today
+    ensure_partitions(conn, min(first_day, today), today, interval)
+    create_future_partitions(conn, periods_ahead, today)
+    _finish_table(conn, old, indexes)
+
+def unpartition_table(conn: Connection, indexes: Optional[Dict[str, str]] = None):
+    """Convert a partitioned transactions table back into a plain one"""
+    if not is_partitioned(conn):
+        return
+    indexes = model_indexes(conn) if indexes is None else indexes
+    old = _move_table(conn, indexes)
+    conn.execute(text(f"CREATE TABLE {TABLE} (LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    conn.execute(text(f"ALTER TABLE {TABLE} ADD PRIMARY KEY (id)"))
+    _finish_table(conn, old, indexes) # Dropping the old table drops its partitions
@@ -0,0 +1,222 @@
+"""
+Recurring transactions. Each RecurringRule describes a series of dates
+(weekly, monthly on day N, or yearly, every `interval` periods from
+start_date up to end_date); the scheduler writes the occurrences that have
+fallen due as ordinary transactions.
+
+Occurrence k of a rule is computed directly from start_date, so a series
+never drifts (monthly on the 31st is the 28th or 29th in February and the
+31st again in March). Writing is idempotent per occurrence: a rule's
+transactions and the advance of its next_date / materialized_through
+cursor commit together, so a run that dies part-way is simply redone for
+the rules it had not committed. On Postgres due rules are claimed with
+FOR UPDATE SKIP LOCKED, so concurrent runs split them instead of both
+writing them.
+
+The scheduler runs as a daily job (RECURRING_MATERIALIZE_HOUR) and on
+demand with `python -m app.cli materialize-recurring`; new and edited rules
+are caught up as they are saved, up to RECURRING_CATCH_UP_LIMIT occurrences
+(a job writes the rest). project() lists future occurrences
+without writing them.
+"""
+import calendar
+import heapq
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import bindparam, func, select, text, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.recurring import RecurrenceFrequency, RecurringRule
+from app.models.transaction import TransactionType
+from app.services import budget_spend, jobs, rollups
+from app.services.importer import insert_rows
+from app.services.response_cache import bump_data_versions
+from app.utils.dates import add_months
+
+def _month_day(month_index: int, day: int) -> date:
+    """Day `day` of a month counted from year 0, clamped to the month's length"""
+    year, month = divmod(month_index, 12)
+    return date(year, month + 1, min(day, calendar.monthrange(year, month + 1)[1]))
+
+def occurrence(rule, k: int) -> date:
+    """The k-th date of a rule's series (k=0 is the first period's)"""
+    start = rule.start_date
+    if rule.frequency == RecurrenceFrequency.WEEKLY:
+        return start + timedelta(weeks=k * rule.interval)
+    if rule.frequency == RecurrenceFrequency.MONTHLY:
+        return _month_day(start.year * 12 + start.month - 1 + k * rule.interval, rule.day_of_month or start.day)
+    return add_months(start, 12 * k * rule.interval)
+
+def _first_index(rule, on_or_after: date) -> int:
+    """The index of the rule's first occurrence on or after a date (and start_date)"""
+    on_or_after = max(on_or_after, rule.start_date)
+    start = rule.start_date
+    if rule.frequency == RecurrenceFrequency.WEEKLY:
+        k = -(-(on_or_after - start).days // (7 * rule.interval))
+    elif rule.frequency == RecurrenceFrequency.MONTHLY:
+        k = ((on_or_after.year - start.year) * 12 + on_or_after.month - start.month) // rule.interval
+    else:
+        k = (on_or_after.year - start.year) // rule.interval
+    k = max(k, 0)
+    while occurrence(rule, k) < on_or_after:
+        k += 1
+    return k
+
+def occurrences(rule, start: date, end: date) -> Iterator[date]:
+    """The rule's dates from start to end inclusive, computed as they are iterated"""
+    if rule.end_date is not None:
+        end = min(end, rule.end_date)
+    k = _first_index(rule, start)
+    while True:
+        day = occurrence(rule, k)
+        if day > end:
+            return
+        yield day
+        k += 1
+
+def next_occurrence(rule, after: date) -> Optional[date]:
+    """The rule's first date after a given one, or None if the series has ended by then"""
+    day = occurrence(rule, _first_index(rule, after + timedelta(days=1)))
+    if rule.end_date is not None and day > rule.end_date:
+        return None
+    return day
+
+def schedule(rule: RecurringRule):
+    """Set a new or edited rule's next_date from where its written occurrences end"""
+    written = rule.materialized_through or rule.start_date - timedelta(days=1)
+    rule.next_date = next_occurrence(rule, written)
+
+# Postgres: the cursors of a whole batch as two array parameters
+ADVANCE_CURSORS = text("""
+UPDATE recurring_rules SET next_date = cursors.next, materialized_through = :through, updated_at = now()
+FROM unnest(CAST(:rule_ids AS uuid[]), CAST(:next_dates AS date[])) AS cursors (rule_id, next)
+WHERE recurring_rules.id = cursors.rule_id
+""")
+
+def _advance_cursors(db: Session, cursors: List[dict], through: date):
+    """Set the rules' next_date and materialized_through, with one statement on Postgres"""
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(ADVANCE_CURSORS, {
+            "through": through,
+            "rule_ids": [str(cursor["rule_id"]) for cursor in cursors],
+            "next_dates": [cursor["next"] for cursor in cursors],
+        })
+        return
+    table = RecurringRule.__table__
+    db.execute(
+        update(table)
+        .where(table.c.id == bindparam("rule_id"))
+        .values(next_date=bindparam("next"), materialized_through=through, updated_at=func.now()),
+        cursors,
+    )
+
+def _materialize(db: Session, rules: List, through: date) -> int:
+    """
+    Write the rules' occurrences from next_date through `through` with one
+    bulk insert, and advance their cursors. Returns the number of
+    transactions written. The caller commits.
+    """
+    rows, entries, cursors = [], [], []
+    for rule in rules:
+        last = through if rule.end_date is None else min(through, rule.end_date)
+        k = _first_index(rule, rule.next_date)
+        day = occurrence(rule, k)
+        while day <= last:
+            rows.append({
+                "id": uuid.uuid4(),
+                "user_id": rule.user_id,
+                "description": rule.description,
+                "amount": rule.amount,
+                "date": day,
+                "type": rule.type,
+                "category": rule.category,
+                "notes": rule.notes,
+            })
+            entries.append(rollups.RollupEntry(rule.user_id, day, rule.category, TransactionType(rule.type), rule.amount))
+            k += 1
+            day = occurrence(rule, k)
+        # The first date past `through` is the next one, unless the series ends first
+        next_date = day if rule.end_date is None or day <= rule.end_date else None
+        cursors.append({"rule_id": rule.id, "next": next_date})
+    if rows:
+        insert_rows(db, rows)
+        rollups.record_entries(db, entries)
+        budget_spend.record_entries(db, entries)
+        bump_data_versions(db, {row["user_id"] for row in rows})
+    if cursors:
+        _advance_cursors(db, cursors, through)
+    return len(rows)
+
+def save_rule(db: Session, rule: RecurringRule, today: Optional[date] = None) -> int:
+    """
+    Schedule a new or edited rule and write its occurrences already due,
+    in the caller's DB transaction. At most RECURRING_CATCH_UP_LIMIT are
+    written here; a longer backlog (e.g. an old start_date) is left to a
+    materialize_recurring job. Returns the number written.
+    """
+    today = today or date.today()
+    schedule(rule)
+    db.flush()
+    if rule.next_date is None or rule.next_date > today:
+        return 0
+    through = today
+    last = occurrence(rule, _first_index(rule, rule.next_date) + settings.RECURRING_CATCH_UP_LIMIT - 1)
+    if last < today and (rule.end_date is None or last < rule.end_date):
+        through = last
+        jobs.enqueue(db, "materialize_recurring")
+    written = _materialize(db, [rule], through)
+    db.refresh(rule)
+    return written
+
+def materialize(db: Session, through: Optional[date] = None, batch_size: Optional[int] = None) -> dict:
+    """
+    Write every user's occurrences due through a date (default today),
+    committing after each batch of rules. Returns counts of rules and
+    transactions.
+    """
+    through = through or date.today()
+    batch_size = batch_size or settings.RECURRING_BATCH_SIZE
+    due = (
+        select(*RecurringRule.__table__.c)
+        .where(RecurringRule.next_date <= through)
+        .order_by(RecurringRule.next_date)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    summary = {"rules": 0, "transactions": 0}
+    while True:
+        rules = db.execute(due).all()
+        if not rules:
+            return summary
+        summary["transactions"] += _materialize(db, rules, through)
+        summary["rules"] += len(rules)
+        db.commit()
+
+def project(rules: Iterable, end: date) -> Iterator[Tuple[date, object]]:
+    """
+    (date, rule) for the rules' occurrences not yet written, from their
+    next_date through `end`, in date order. Nothing is written, and dates
+    are only computed as far as the caller iterates.
+    """
+    def series(rule):
+        if rule.next_date is not None:
+            for day in occurrences(rule, rule.next_date, end):
+                yield day, rule
+
+    return heapq.merge(*(series(rule) for rule in rules), key=lambda item: item[0])
+
+@jobs.handler("materialize_recurring")
+def materialize_recurring(db: Session, payload: dict):
+    materialize(db)
+
+def schedule_daily(db: Session, now: Optional[datetime] = None):
+    """Queue today's materialize_recurring job once RECURRING_MATERIALIZE_HOUR has passed"""
+    now = now or datetime.now()
+    if settings.RECURRING_MATERIALIZE_HOUR < 0 or now.hour < settings.RECURRING_MATERIALIZE_HOUR:
+        return
+    jobs.enqueue(db, "materialize_recurring", key=f"materialize_recurring:{now.date().isoformat()}")
+
+jobs.PERIODIC.append(schedule_daily)
@@ -0,0 +1,164 @@
+import hashlib
+import threading
+from datetime import date
+from typing import Any, Callable, Iterable, NamedTuple
+
+from fastapi import BackgroundTasks, Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core import database, replicas
+from app.models.user import User
+from app.utils.cache import TTLCache
+
+# Computes the response data from a sync session (async routes run it with
+# AsyncSession.run_sync)
+Compute = Callable[[Session], Any]
+
+class CachedBody(NamedTuple):
+    version: int
+    etag: str
+    body: bytes
+
+# Serialized dashboard responses keyed by user, path, query and day
+response_cache = TTLCache(maxsize=settings.RESPONSE_CACHE_MAX_ENTRIES, ttl=settings.RESPONSE_CACHE_TTL_SECONDS)
+
+# Keys being recomputed in the background (stale-while-revalidate)
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+def bump_data_version(db: Session, user_id):
+    """
+    Mark the user's data as changed. Call inside the write's DB transaction
+    so the new version becomes visible together with the data.
+    """
+    db.execute(update(User).where(User.id == user_id).values(data_version=User.data_version + 1))
+
+def bump_data_versions(db: Session, user_ids: Iterable):
+    """bump_data_version for many users at once, e.g. after a bulk write"""
+    user_ids = list(user_ids)
+    if user_ids:
+        db.execute(update(User).where(User.id.in_(user_ids)).values(data_version=User.data_version + 1))
+
+def bump_all_data_versions(db: Session):
+    """bump_data_version for every user, e.g. after a maintenance rebuild"""
+    db.execute(update(User).values(data_version=User.data_version + 1))
+
+def data_version_statement(user_id):
+    return select(User.data_version).where(User.id == user_id)
+
+def _data_version(db: Session, user_id) -> int:
+    version = db.execute(data_version_statement(user_id)).scalar_one_or_none()
+    if version is None:
+        # A new user may not have reached the replica yet; ask the primary
+        replicas.use_primary(db)
+        version = db.execute(data_version_statement(user_id)).scalar_one()
+    return version
+
+async def _data_version_async(db: AsyncSession, user_id) -> int:
+    version = (await db.execute(data_version_statement(user_id))).scalar_one_or_none()
+    if version is None:
+        replicas.use_primary(db)
+        version = (await db.execute(data_version_statement(user_id))).scalar_one()
+    return version
+
+def _cache_key(request: Request, user_id) -> str:
+    # Responses depend on today's date (timeframes, days left), so the
+    # day is part of the key as well as the ETag
+    query = "&".join(sorted(request.url.query.split("&")))
+    return f"{user_id}:{request.url.path}?{query}:{date.today().isoformat()}"
+
+def _etag(key: str, version: int) -> str:
+    return '"' + hashlib.sha1(f"{key}:{version}".encode()).hexdigest()[:20] + '"'
+
+def _headers(etag: str) -> dict:
+    # Let browsers keep the body but revalidate it on every use
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+def _lookup(request: Request, key: str, version: int):
+    """
+    Return a response that can be sent without computing anything (304,
+    fresh cached body, or stale body under stale-while-revalidate) and
+    whether a background refresh is needed
+    """
+    etag = _etag(key, version)
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=_headers(etag)), False
+
+    cached = response_cache.get(key)
+    if cached is not None and cached.version == version:
+        return Response(cached.body, media_type="application/json", headers=_headers(etag)), False
+    if cached is not None and settings.RESPONSE_CACHE_STALE_WHILE_REVALIDATE:
+        with _refreshing_lock:
+            start_refresh = key not in _refreshing
+            _refreshing.add(key)
+        # The stale body keeps its own ETag, so clients revalidate next time
+        return Response(cached.body, media_type="application/json", headers=_headers(cached.etag)), start_refresh
+    return None, False
+
+def _store(key: str, version: int, response_type, data) -> Response:
+    adapter = TypeAdapter(response_type)
+    body = adapter.dump_json(adapter.validate_python(data))
+    etag = _etag(key, version)
+    response_cache.set(key, CachedBody(version, etag, body))
+    return Response(body, media_type="application/json", headers=_headers(etag))
+
+def _refresh(key: str, user_id, response_type, compute: Compute):
+    db = database.SessionLocal()
+    try:
+        version = db.execute(data_version_statement(user_id)).scalar_one()
+        _store(key, version, response_type, compute(db))
+    finally:
+        db.close()
+        with _refreshing_lock:
+            _refreshing.discard(key)
+
+async def _refresh_async(key: str, user_id, response_type, compute: Compute):
+    try:
+        async with database.AsyncSessionLocal() as db:
+            version = (await db.execute(data_version_statement(user_id))).scalar_one()
+            _store(key, version, response_type, await db.run_sync(compute))
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(key)
+
+def cached_json_response(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session,
+    user_id,
+    response_type,
+    compute: Compute,
+) -> Response:
+    """
+    Serve a per-user JSON response validated by the user's data version:
+    a 304 when If-None-Match matches, the cached body when it is current,
+    otherwise compute(db) serialized as response_type
+    """
+    key = _cache_key(request, user_id)
+    version = _data_version(db, user_id)
+    response, start_refresh = _lookup(request, key, version)
+    if start_refresh:
+        background_tasks.add_task(_refresh, key, user_id, response_type, compute)
+    return response or _store(key, version, response_type, compute(db))
+
+async def cached_json_response_async(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession,
+    user_id,
+    response_type,
+    compute: Compute,
+) -> Response:
+    """
+    Async version of cached_json_response
+    """
+    key = _cache_key(request, user_id)
+    version = await _data_version_async(db, user_id)
+    response, start_refresh = _lookup(request, key, version)
+    if start_refresh:
+        background_tasks.add_task(_refresh_async, key, user_id, response_type, compute)
+    return response or _store(key, version, response_type, await db.run_sync(compute))
@@ -0,0 +1,281 @@
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.models.rollup import MonthlyRollup
+from app.models.transaction import Transaction, TransactionType
+from app.services.response_cache import bump_all_data_versions, bump_data_version
+from app.utils.dates import month_bucket, month_start, next_month_start
+
+class RollupEntry(NamedTuple):
+    """The fields of a transaction that determine its rollup bucket and value"""
+    user_id: object
+    date: date
+    category: str
+    type: TransactionType
+    amount: float
+
+def snapshot(transaction: Transaction) -> RollupEntry:
+    """
+    Capture a transaction's rollup fields, e.g. before applying an update
+    """
+    return RollupEntry(
+        user_id=transaction.user_id,
+        date=transaction.date,
+        category=transaction.category,
+        type=TransactionType(transaction.type),
+        amount=transaction.amount,
+    )
+
+def _upsert_statement(db: Session):
+    """
+    Get a dialect-specific INSERT ... ON CONFLICT that adds the inserted
+    total/count to an existing bucket
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    stmt = dialect_insert(MonthlyRollup.__table__) # Core, so a batch skips the ORM's per-row bookkeeping
+    return stmt.on_conflict_do_update(
+        index_elements=["user_id", "month", "category", "type"],
+        set_={
+            "total": MonthlyRollup.total + stmt.excluded.total,
+            "count": MonthlyRollup.count + stmt.excluded.count,
+        },
+    )
+
+def _bucket_key(entry: RollupEntry) -> dict:
+    """Primary key of the rollup bucket an entry belongs to"""
+    return {
+        "user_id": entry.user_id,
+        "month": month_start(entry.date),
+        "category": entry.category,
+        "type": entry.type,
+    }
+
+def _apply(db: Session, entry: RollupEntry, sign: int):
+    """
+    Add (sign=1) or remove (sign=-1) one transaction from its rollup bucket.
+    Runs inside the caller's DB transaction, so it commits or rolls back
+    together with the transaction write.
+    """
+    key = _bucket_key(entry)
+    db.execute(_upsert_statement(db), {**key, "total": sign * entry.amount, "count": sign})
+
+    if sign < 0:
+        # Drop buckets that no longer hold any transactions
+        db.execute(
+            delete(MonthlyRollup).where(
+                *(getattr(MonthlyRollup, column) == value for column, value in key.items()),
+                MonthlyRollup.count <= 0,
+            )
+        )
+
+# Postgres: a batch's bucket deltas as array parameters, upserted in one statement
+ADD_DELTAS = text("""
+INSERT INTO monthly_rollups (user_id, month, category, type, total, count)
+SELECT * FROM unnest(CAST(:user_ids AS uuid[]), CAST(:months AS date[]), CAST(:categories AS varchar[]),
+    CAST(:types AS transactiontype[]), CAST(:totals AS float8[]), CAST(:counts AS integer[]))
+ON CONFLICT (user_id, month, category, type)
+DO UPDATE SET total = monthly_rollups.total + excluded.total, count = monthly_rollups.count + excluded.count
+""")
+
+class RollupBatch:
+    """
+    Accumulates the rollup deltas of many new transactions so they can be
+    written with one upsert per bucket, e.g. during a bulk import. Memory
+    is bounded by the number of buckets touched, not by the number of rows.
+    """
+
+    def __init__(self):
+        self.deltas: Dict[tuple, list] = {}
+
+    def add(self, entry: RollupEntry):
+        """Count one new transaction towards its bucket"""
+        key = (entry.user_id, month_start(entry.date), entry.category, entry.type)
+        delta = self.deltas.setdefault(key, [0.0, 0])
+        delta[0] += entry.amount
+        delta[1] += 1
+
+    def flush(self, db: Session):
+        """Write the accumulated deltas in the caller's DB transaction, one statement on Postgres"""
+        deltas, self.deltas = self.deltas, {}
+        if not deltas:
+            return
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(ADD_DELTAS, {
+                "user_ids": [str(user_id) for user_id, _, _, _ in deltas],
+                "months": [month for _, month, _, _ in deltas],
+                "categories": [category for _, _, category, _ in deltas],
+                "types": [TransactionType(kind).name for _, _, _, kind in deltas], # Enum columns store member names
+                "totals": [total for total, _ in deltas.values()],
+                "counts": [count for _, count in deltas.values()],
+            })
+            return
+        db.execute(
+            _upsert_statement(db),
+            [
+                {"user_id": user_id, "month": month, "category": category, "type": kind, "total": total, "count": count}
+                for (user_id, month, category, kind), (total, count) in deltas.items()
+            ],
+        )
+
+def record_entries(db: Session, entries: Iterable[RollupEntry]):
+    """
+    Add many new transactions at once, with one upsert per touched bucket
+    """
+    batch = RollupBatch()
+    for entry in entries:
+        batch.add(entry)
+    batch.flush(db)
+
+def record_transaction(db: Session, transaction: Transaction):
+    """
+    Add a newly created transaction to the rollups
+    """
+    _apply(db, snapshot(transaction), 1)
+
+def remove_transaction(db: Session, transaction: Transaction):
+    """
+    Remove a deleted transaction from the rollups
+    """
+    _apply(db, snapshot(transaction), -1)
+
+def update_transaction(db: Session, before: RollupEntry, transaction: Transaction):
+    """
+    Move an edited transaction between buckets. `before` is the snapshot
+    taken before the update was applied.
+    """
+    after = snapshot(transaction)
+    if after == before:
+        return
+    _apply(db, before, -1)
+    _apply(db, after, 1)
+
+def rebuild_rollups(db: Session, user_id=None) -> int:
+    """
+    Recompute rollups from the transactions table, for one user or everyone,
+    and invalidate the cached responses computed from the old ones. Used to
+    repair drift. Returns the number of buckets written. The caller commits.
+    """
+    clear = delete(MonthlyRollup)
+    if user_id is not None:
+        clear = clear.where(MonthlyRollup.user_id == user_id)
+    db.execute(clear)
+
+    month = month_bucket(db, Transaction.date)
+    grouped = select(
+        Transaction.user_id,
+        month,
+        Transaction.category,
+        Transaction.type,
+        func.sum(Transaction.amount),
+        func.count(Transaction.id),
+    ).group_by(Transaction.user_id, month, Transaction.category, Transaction.type)
+    if user_id is not None:
+        grouped = grouped.where(Transaction.user_id == user_id)
+
+    result = db.execute(
+        insert(MonthlyRollup).from_select(
+            ["user_id", "month", "category", "type", "total", "count"], grouped
+        )
+    )
+    if user_id is not None:
+        bump_data_version(db, user_id)
+    else:
+        bump_all_data_versions(db)
+    return result.rowcount
+
+def totals_by_type_and_category(db: Session, user_id) -> List[Tuple]:
+    """
+    Get (type, category, total) rows for a user from the rollups
+    """
+    return (
+        db.query(MonthlyRollup.type, MonthlyRollup.category, func.sum(MonthlyRollup.total))
+        .filter(MonthlyRollup.user_id == user_id)
+        .group_by(MonthlyRollup.type, MonthlyRollup.category)
+        .all()
+    )
+
+def monthly_totals(db: Session, user_id, start_date: date) -> List[Tuple]:
+    """
+    Get (month, type, total) rows for a user from `start_date` onwards.
+    Whole months come from the rollups; a partial first month is summed
+    from the (date-bounded) transactions.
+    """
+    first_full_month = start_date if start_date.day == 1 else next_month_start(start_date)
+
+    rows = (
+        db.query(MonthlyRollup.month, MonthlyRollup.type, func.sum(MonthlyRollup.total))
+        .filter(
+            MonthlyRollup.user_id == user_id,
+            MonthlyRollup.month >= first_full_month,
+        )
+        .group_by(MonthlyRollup.month, MonthlyRollup.type)
+        .all()
+    )
+
+    partial: List[Tuple] = []
+    if first_full_month != start_date:
+        partial = [
+            (month_start(start_date), type_, total)
+            for type_, total in (
+                db.query(Transaction.type, func.sum(Transaction.amount))
+                .filter(
+                    Transaction.user_id == user_id,
+                    Transaction.date >= start_date,
+                    Transaction.date < first_full_month,
+                )
+                .group_by(Transaction.type)
+                .all()
+            )
+        ]
+
+    return partial + rows
+
+def monthly_totals_between(db: Session, user_id, start_date: date, end_date: date) -> List[Tuple]:
+    """
+    Get (month, type, total, count) rows for a user from start_date to
+    end_date inclusive. Whole months come from the rollups; partial months
+    at either end are summed from the (date-bounded) transactions.
+    """
+    end_exclusive = end_date + timedelta(days=1)
+    first_full_month = start_date if start_date.day == 1 else next_month_start(start_date)
+    after_full_months = month_start(end_exclusive)
+
+    rows: List[Tuple] = []
+    if first_full_month < after_full_months:
+        rows = (
+            db.query(MonthlyRollup.month, MonthlyRollup.type, func.sum(MonthlyRollup.total), func.sum(MonthlyRollup.count))
+            .filter(
+                MonthlyRollup.user_id == user_id,
+                MonthlyRollup.month >= first_full_month,
+                MonthlyRollup.month < after_full_months,
+            )
+            .group_by(MonthlyRollup.month, MonthlyRollup.type)
+            .all()
+        )
+
+    partial_ranges = []
+    if start_date < first_full_month:
+        partial_ranges.append((start_date, min(first_full_month, end_exclusive)))
+    if first_full_month <= after_full_months < end_exclusive:
+        partial_ranges.append((after_full_months, end_exclusive))
+    for range_start, range_end in partial_ranges:
+        rows += [
+            (month_start(range_start), type_, total, count)
+            for type_, total, count in (
+                db.query(Transaction.type, func.sum(Transaction.amount), func.count(Transaction.id))
+                .filter(
+                    Transaction.user_id == user_id,
+                    Transaction.date >= range_start,
+                    Transaction.date < range_end,
+                )
+                .group_by(Transaction.type)
+                .all()
+            )
+        ]
+    return rows
@@ -0,0 +1,95 @@
+"""
+Ranked full-text search over transaction descriptions and notes. Every
+word of the query is matched as a prefix ("amaz ref" finds "Amazon refund").
+
+Postgres matches against the GIN-indexed SEARCH_DOCUMENT tsvector and ranks
+with ts_rank. Where the pg_trgm extension is installed, descriptions are
+also trigram-indexed and matched by word similarity, so misspellings
+("amazn") still find them. SQLite matches against the transactions_fts FTS5
+table and ranks with bm25.
+"""
+import re
+from typing import Dict, List, Optional
+
+from sqlalchemy import column, func, literal, literal_column, select, table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.models.transaction import SEARCH_DOCUMENT, SQLITE_SEARCH_DDL, Transaction
+
+TRIGRAM_INDEX = "ix_transactions_description_trgm"
+TRIGRAM_INDEX_DDL = f"CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} ON transactions USING gin (description gin_trgm_ops)"
+MAX_WORDS = 8
+
+_WORD = re.compile(r"\w+")
+_fts = table("transactions_fts", column("rowid"), column("rank"))
+# Engine URL -> whether pg_trgm is installed there
+_trigram_available: Dict[str, bool] = {}
+
+def query_words(q: str) -> List[str]:
+    """The words of a search query, lowercased; punctuation is dropped"""
+    return _WORD.findall(q.lower())[:MAX_WORDS]
+
+def has_trigram(conn: Connection) -> bool:
+    return conn.execute(text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")).scalar()
+
+def create_trigram_index(conn: Connection) -> bool:
+    """Index descriptions for fuzzy matching if pg_trgm is installed"""
+    if not has_trigram(conn):
+        return False
+    conn.execute(text(TRIGRAM_INDEX_DDL))
+    return True
+
+def rebuild_sqlite_index(conn: Connection):
+    """Create the FTS5 table and triggers if needed and reindex every transaction"""
+    for statement in SQLITE_SEARCH_DDL:
+        conn.execute(text(statement))
+    conn.execute(text("INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')"))
+
+def _fuzzy(db: Session) -> bool:
+    bind = db.get_bind()
+    key = str(bind.url)
+    if key not in _trigram_available:
+        _trigram_available[key] = has_trigram(db.connection())
+    return _trigram_available[key]
+
+def _postgres_statement(db: Session, user_id, words: List[str]) -> Select:
+    document = literal_column(SEARCH_DOCUMENT)
+    # Words are \w+ only, so they need no escaping inside the tsquery
+    tsquery = func.to_tsquery(literal_column("'simple'"), " & ".join(f"{word}:*" for word in words))
+    matches = document.op("@@")(tsquery)
+    # Normalization 1 divides by the document's log length, like bm25 favours short matches
+    rank = func.ts_rank(document, tsquery, 1)
+    if _fuzzy(db):
+        phrase = " ".join(words)
+        # <% is word similarity above pg_trgm.word_similarity_threshold (0.6)
+        matches = matches | literal(phrase).op("<%")(Transaction.description)
+        rank = func.greatest(rank, func.word_similarity(phrase, Transaction.description))
+    return (
+        select(Transaction)
+        .where(Transaction.user_id == user_id, matches)
+        .order_by(rank.desc(), Transaction.date.desc(), Transaction.id.desc())
+    )
+
+def _sqlite_statement(user_id, words: List[str]) -> Select:
+    match = " ".join(f'"{word}"*' for word in words)
+    return (
+        select(Transaction)
+        .join(_fts, _fts.c.rowid == literal_column("transactions.rowid"))
+        .where(Transaction.user_id == user_id, literal_column("transactions_fts").op("MATCH")(match))
+        # FTS5's rank is bm25, lower for better matches
+        .order_by(_fts.c.rank, Transaction.date.desc(), Transaction.id.desc())
+    )
+
+def search_statement(db: Session, user_id, q: str) -> Optional[Select]:
+    """
+    A SELECT of the user's transactions matching q, best matches first, or
+    None when q has no words. Filters and paging can be added to it.
+    """
+    words = query_words(q)
+    if not words:
+        return None
+    if db.get_bind().dialect.name == "postgresql":
+        return _postgres_statement(db, user_id, words)
+    return _sqlite_statement(user_id, words)
@@ -0,0 +1,93 @@
+"""
+Precomputed analytics. Background jobs store each user's analytics
+response for every timeframe in analytics_snapshots; get_analytics serves
+a snapshot while it matches the user's data_version and was computed
+today, and computes the response on the spot otherwise.
+
+Snapshots are refreshed nightly (ANALYTICS_SNAPSHOT_HOUR), after bulk
+imports, and on demand with `python -m app.cli snapshot-analytics`.
+"""
+from datetime import date, datetime
+from typing import Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.snapshot import AnalyticsSnapshot
+from app.models.user import User
+from app.services import jobs
+from app.services.aggregation import TIMEFRAME_MONTHS, get_transaction_analytics
+from app.services.response_cache import data_version_statement
+
+TIMEFRAMES = tuple(TIMEFRAME_MONTHS)
+
+def snapshot_key(user_id, data_version: int, day: date) -> str:
+    """Job key: one snapshot job per user, data version and day"""
+    return f"snapshot:{user_id}:{day.isoformat()}:{data_version}"
+
+def get_analytics(db: Session, user_id, timeframe: str) -> dict:
+    """The analytics payload, from a fresh snapshot when there is one"""
+    if timeframe in TIMEFRAMES:
+        data = db.execute(
+            select(AnalyticsSnapshot.data)
+            .join(User, User.id == AnalyticsSnapshot.user_id)
+            .where(
+                AnalyticsSnapshot.user_id == user_id,
+                AnalyticsSnapshot.timeframe == timeframe,
+                AnalyticsSnapshot.computed_on == date.today(),
+                AnalyticsSnapshot.data_version == User.data_version,
+            )
+        ).scalar_one_or_none()
+        if data is not None:
+            return data
+    return get_transaction_analytics(db, user_id, timeframe)
+
+def compute_snapshots(db: Session, user_id):
+    """Recompute a user's snapshots for every timeframe (caller commits)"""
+    version = db.execute(data_version_statement(user_id)).scalar_one()
+    today = date.today()
+    for timeframe in TIMEFRAMES:
+        db.merge(AnalyticsSnapshot(
+            user_id=user_id,
+            timeframe=timeframe,
+            data_version=version,
+            computed_on=today,
+            data=get_transaction_analytics(db, user_id, timeframe),
+        ))
+
+def enqueue_snapshots(db: Session, users: Iterable, delay: float = 0):
+    """Queue snapshot jobs for (user_id, data_version) pairs, skipping ones already queued or done today"""
+    today = date.today()
+    users = list(users)
+    jobs.enqueue_many(
+        db,
+        "snapshot_user",
+        [{"user_id": str(user_id)} for user_id, _ in users],
+        [snapshot_key(user_id, version, today) for user_id, version in users],
+        delay,
+    )
+
+def enqueue_user_snapshots(db: Session, user_id, delay: float = 0):
+    """Queue a refresh of one user's snapshots, e.g. after a bulk change"""
+    version = db.execute(data_version_statement(user_id)).scalar_one()
+    enqueue_snapshots(db, [(user_id, version)], delay)
+
+@jobs.handler("snapshot_user")
+def snapshot_user(db: Session, payload: dict):
+    compute_snapshots(db, UUID(payload["user_id"]))
+
+@jobs.handler("snapshot_all")
+def snapshot_all(db: Session, payload: dict):
+    """Fan out one snapshot job per user, so they spread over the runners"""
+    enqueue_snapshots(db, db.execute(select(User.id, User.data_version)).all())
+
+def schedule_nightly(db: Session, now: Optional[datetime] = None):
+    """Queue today's snapshot_all job once ANALYTICS_SNAPSHOT_HOUR has passed"""
+    now = now or datetime.now()
+    if settings.ANALYTICS_SNAPSHOT_HOUR < 0 or now.hour < settings.ANALYTICS_SNAPSHOT_HOUR:
+        return
+    jobs.enqueue(db, "snapshot_all", key=f"snapshot_all:{now.date().isoformat()}")
+
+jobs.PERIODIC.append(schedule_nightly)
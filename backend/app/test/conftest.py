@@ -0,0 +1,61 @@
+import os
+
+# Settings are read from the environment when app.core.config is imported,
+# so provide defaults for everything the app requires before any test runs.
+os.environ.setdefault("ENV", "testing")
+os.environ.setdefault("PROJECT_NAME", "Finance Tracker")
+os.environ.setdefault("PROJECT_VERSION", "test")
+os.environ.setdefault("PROJECT_DESCRIPTION", "Finance Tracker test suite")
+os.environ.setdefault("DATABASE_URL", os.getenv("TEST_DATABASE_URL", "sqlite:///./test.db"))
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-key")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
+os.environ.setdefault("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+@pytest.fixture
+def app_engine():
+    """An in-memory database with the full schema, shared by all threads"""
+    from app.core.database import Base
+    from app.models import user, transaction, budget, rollup, job, snapshot, recurring  # noqa: F401
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def client(app_engine):
+    """A TestClient for the app with its sessions bound to app_engine"""
+    from app.core import database, security
+    from app.main import app
+    from app.services.response_cache import response_cache
+
+    TestSession = sessionmaker(bind=app_engine, autoflush=False)
+
+    def get_test_db():
+        db = TestSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[database.get_db] = get_test_db
+    response_cache.clear()
+    security.user_cache.clear()
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+@pytest.fixture
+def auth_headers(client) -> dict:
+    """Authorization header for a freshly signed-up user"""
+    credentials = {"email": "test@example.com", "password": "secret1"}
+    client.post("/api/auth/signup", json={"name": "Test", **credentials})
+    token = client.post("/api/auth/login", json=credentials).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,106 @@
+from datetime import date
+
+import pytest
+
+from app.core.config import settings
+from app.services import aggregation
+from app.utils import dates
+
+def test_calendar_buckets():
+    assert dates.bucket_start(date(2026, 3, 1), "week") == date(2026, 2, 23) # A Sunday
+    assert dates.bucket_start(date(2026, 8, 31), "quarter") == date(2026, 7, 1)
+    assert dates.next_bucket_start(date(2026, 11, 5), "quarter") == date(2027, 1, 1)
+    assert dates.add_months(date(2026, 3, 31), -1) == date(2026, 2, 28)
+    assert dates.bucket_label(date(2026, 1, 1), "quarter") == "Q1 2026"
+    assert dates.bucket_label(date(2025, 12, 29), "week") == "2026-W01"
+
+def test_previous_period():
+    # Whole months compare with the same number of months before
+    assert aggregation.previous_period(date(2026, 3, 1), date(2026, 3, 31), "month") == (date(2026, 2, 1), date(2026, 2, 28))
+    assert aggregation.previous_period(date(2026, 4, 1), date(2026, 9, 30), "quarter") == (date(2025, 10, 1), date(2026, 3, 31))
+    # Anything else with the same number of days
+    assert aggregation.previous_period(date(2026, 3, 10), date(2026, 3, 16), "day") == (date(2026, 3, 3), date(2026, 3, 9))
+
+def test_series_range():
+    assert aggregation.series_range(None, date(2026, 5, 20), "quarter") == (date(2023, 7, 1), date(2026, 5, 20))
+    with pytest.raises(ValueError):
+        aggregation.series_range(date(2026, 5, 2), date(2026, 5, 1), "day")
+    with pytest.raises(ValueError):
+        aggregation.series_range(date(2020, 1, 1), date(2026, 1, 1), "day")
+
+@pytest.mark.parametrize("use_rollups", [True, False])
+def test_series_endpoint(client, auth_headers, monkeypatch, use_rollups):
+    monkeypatch.setattr(settings, "ANALYTICS_USE_ROLLUPS", use_rollups)
+    for day, amount, kind in (
+        ("2025-12-20", 70.0, "expense"),
+        ("2026-01-10", 1000.0, "income"), # Before the range
+        ("2026-01-20", 50.0, "expense"),
+        ("2026-03-31", 25.0, "expense"),
+        ("2026-04-01", 99.0, "expense"), # After it
+    ):
+        client.post(
+            "/api/transactions",
+            json={"description": "x", "amount": amount, "date": day, "type": kind, "category": "Food"},
+            headers=auth_headers,
+        )
+
+    response = client.get(
+        "/api/analytics/series",
+        params={"from": "2026-01-15", "to": "2026-03-31", "granularity": "month"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    series = response.json()
+
+    current = series["current"]
+    assert [bucket["label"] for bucket in current["buckets"]] == ["Jan 2026", "Feb 2026", "Mar 2026"]
+    assert [bucket["expense"] for bucket in current["buckets"]] == [50.0, 0.0, 25.0]
+    assert current["buckets"][1] == {
+        "start": "2026-02-01", "end": "2026-02-28", "label": "Feb 2026",
+        "income": 0.0, "expense": 0.0, "net": 0.0, "count": 0,
+    }
+    # The 76 days before: 2025-10-31 to 2026-01-14
+    previous = series["previous"]
+    assert (previous["start_date"], previous["end_date"]) == ("2025-10-31", "2026-01-14")
+    assert [bucket["label"] for bucket in previous["buckets"]] == ["Oct 2025", "Nov 2025", "Dec 2025", "Jan 2026"]
+    assert (previous["income"], previous["expense"]) == (1000.0, 70.0)
+    assert series["expense_change_percentage"] == round((75 - 70) / 70 * 100, 2)
+
+    weekly = client.get(
+        "/api/analytics/series",
+        params={"from": "2026-03-23", "to": "2026-04-05", "granularity": "week"},
+        headers=auth_headers,
+    ).json()
+    assert [(bucket["start"], bucket["expense"]) for bucket in weekly["current"]["buckets"]] == [
+        ("2026-03-23", 0.0), ("2026-03-30", 124.0),
+    ]
+
+    assert client.get("/api/analytics/series", params={"granularity": "hour"}, headers=auth_headers).status_code == 422
+
+def test_rebuilt_rollups_replace_cached_series(client, auth_headers, app_engine):
+    from sqlalchemy import text
+    from sqlalchemy.orm import Session
+
+    from app.services.rollups import rebuild_rollups
+
+    client.post(
+        "/api/transactions",
+        json={"description": "x", "amount": 40.0, "date": "2026-02-10", "type": "expense", "category": "Food"},
+        headers=auth_headers,
+    )
+
+    def february_expense() -> float:
+        params = {"from": "2026-02-01", "to": "2026-02-28", "granularity": "month"}
+        return client.get("/api/analytics/series", params=params, headers=auth_headers).json()["current"]["expense"]
+
+    # Drifted rollups get served and cached...
+    with Session(app_engine) as db:
+        db.execute(text("UPDATE monthly_rollups SET total = 0"))
+        db.execute(text("UPDATE users SET data_version = data_version + 1"))
+        db.commit()
+    assert february_expense() == 0.0
+    # ...until a rebuild replaces both
+    with Session(app_engine) as db:
+        rebuild_rollups(db)
+        db.commit()
+    assert february_expense() == 40.0
@@ -0,0 +1,79 @@
+def add(client, headers, start, end, category="Food"):
+    body = {"name": category, "category": category, "amount": 300.0, "period": "custom", "start_date": start, "end_date": end}
+    return client.post("/api/budgets", json=body, headers=headers)
+
+def test_overlapping_budgets_are_rejected(client, auth_headers):
+    january = add(client, auth_headers, "2026-01-01", "2026-01-31").json()
+    assert add(client, auth_headers, "2026-03-01", "2026-03-31").status_code == 201
+    # Adjacent periods and other categories do not overlap
+    assert add(client, auth_headers, "2026-02-01", "2026-02-28").status_code == 201
+    assert add(client, auth_headers, "2026-01-15", "2026-02-15", category="Travel").status_code == 201
+
+    response = add(client, auth_headers, "2025-12-20", "2026-01-01") # Shares the 1st
+    assert response.status_code == 400
+    assert response.json()["detail"] == "An overlapping budget for category 'Food' already exists for this period."
+    assert add(client, auth_headers, "2025-06-01", "2026-12-31").status_code == 400 # Covers them all
+
+    # Updates are checked too, against every budget but their own
+    url = f"/api/budgets/{january['id']}"
+    assert client.put(url, json={"end_date": "2026-02-10"}, headers=auth_headers).status_code == 400
+    assert client.put(url, json={"category": "Travel"}, headers=auth_headers).status_code == 400
+    assert client.put(url, json={"start_date": "2025-12-01"}, headers=auth_headers).status_code == 200
+    assert client.put(url, json={"category": "Rent"}, headers=auth_headers).status_code == 200
+    assert len(client.get("/api/budgets", headers=auth_headers).json()) == 4
+
+def test_spent_amount_follows_transaction_writes(client, auth_headers, app_engine):
+    from sqlalchemy import text
+    from sqlalchemy.orm import Session
+
+    from app.services import budget_spend
+
+    january = add(client, auth_headers, "2026-01-01", "2026-01-31").json()
+    february = add(client, auth_headers, "2026-02-01", "2026-02-28").json()
+    travel = add(client, auth_headers, "2026-01-01", "2026-01-31", category="Travel").json()
+
+    def spent() -> dict:
+        budgets = client.get("/api/budgets", headers=auth_headers).json()
+        return {budget["id"]: budget["spent_amount"] for budget in budgets}
+
+    def expect(january_spent, february_spent, travel_spent):
+        assert spent() == {january["id"]: january_spent, february["id"]: february_spent, travel["id"]: travel_spent}
+
+    body = {"description": "Groceries", "amount": 40.0, "date": "2026-01-31", "type": "expense", "category": "Food"}
+    transaction = client.post("/api/transactions", json=body, headers=auth_headers).json()
+    client.post("/api/transactions", json={**body, "type": "income"}, headers=auth_headers)
+    expect(40.0, 0.0, 0.0)
+
+    url = f"/api/transactions/{transaction['id']}"
+    client.put(url, json={"date": "2026-02-01", "amount": 55.0}, headers=auth_headers)
+    expect(0.0, 55.0, 0.0)
+    client.put(url, json={"category": "Travel", "date": "2026-01-10"}, headers=auth_headers)
+    expect(0.0, 0.0, 55.0)
+    client.put(url, json={"type": "income"}, headers=auth_headers)
+    expect(0.0, 0.0, 0.0)
+    client.put(url, json={"type": "expense", "date": "2026-03-01"}, headers=auth_headers) # No budget
+    expect(0.0, 0.0, 0.0)
+    client.put(url, json={"date": "2026-01-02"}, headers=auth_headers)
+    expect(0.0, 0.0, 55.0)
+
+    # A budget covering existing expenses starts with them
+    client.put(f"/api/budgets/{travel['id']}", json={"category": "Gifts"}, headers=auth_headers)
+    expect(0.0, 0.0, 0.0)
+    client.put(f"/api/budgets/{january['id']}", json={"category": "Travel"}, headers=auth_headers)
+    expect(55.0, 0.0, 0.0)
+    assert client.get(f"/api/budgets/{january['id']}", headers=auth_headers).json()["remaining_amount"] == 245.0
+
+    client.delete(url, headers=auth_headers)
+    expect(0.0, 0.0, 0.0)
+
+    # Drift is found and repaired, and the cached list recomputed
+    with Session(app_engine) as db:
+        db.execute(text("UPDATE budgets SET spent_amount = 99"))
+        db.execute(text("UPDATE users SET data_version = data_version + 1"))
+        db.commit()
+    expect(99.0, 99.0, 99.0)
+    with Session(app_engine) as db:
+        assert budget_spend.reconcile(db) == 3
+        assert budget_spend.reconcile(db) == 0
+        db.commit()
+    expect(0.0, 0.0, 0.0)
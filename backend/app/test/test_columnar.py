@@ -0,0 +1,54 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.services import columnar
+
+def test_kernels():
+    np.testing.assert_allclose(columnar.rolling_mean(np.array([2.0, 4.0, 6.0, 8.0]), 2), [2.0, 3.0, 5.0, 7.0])
+    np.testing.assert_allclose(
+        columnar.daily_sums(np.array([10, 12, 12, 20]), np.array([1.0, 2.0, 3.0, 4.0]), 10, 13),
+        [1.0, 0.0, 5.0, 0.0],
+    )
+
+def test_trends_from_rows():
+    end = date(2024, 3, 31)
+    rows = [
+        (columnar.to_day(end - timedelta(days=40)), 1000.0, True, "Salary"),
+        (columnar.to_day(end - timedelta(days=10)), 70.0, False, "Food"),
+        (columnar.to_day(end), 14.0, False, "Food"),
+        (columnar.to_day(end), 7.0, False, "Transport"),
+    ]
+    trends = columnar.transaction_trends(columnar.columns_from_rows(rows), end, days=30, window=7)
+
+    assert trends["opening_balance"] == 1000.0
+    assert len(trends["daily"]) == 30
+    assert trends["daily"][-1]["expense"] == 21.0
+    assert trends["daily"][-1]["balance"] == 909.0
+    assert trends["daily"][-1]["expense_rolling_average"] == 3.0
+    assert trends["velocity"]["recent_daily_expense"] == 3.0
+    assert trends["velocity"]["previous_daily_expense"] == 10.0
+    assert [category["name"] for category in trends["categories"]] == ["Food", "Transport"]
+    assert trends["categories"][0]["monthly"] == [{"month": "Mar 2024", "amount": 84.0}]
+
+def test_trends_endpoint(client, auth_headers):
+    today = date.today()
+    for amount, kind, category in ((500.0, "income", "Salary"), (20.0, "expense", "Food")):
+        client.post(
+            "/api/transactions",
+            json={"description": category, "amount": amount, "date": today.isoformat(), "type": kind, "category": category},
+            headers=auth_headers,
+        )
+
+    response = client.get("/api/analytics/trends?days=14&window=7", headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["daily"][-1] == {
+        "date": today.isoformat(),
+        "income": 500.0,
+        "expense": 20.0,
+        "net": 480.0,
+        "balance": 480.0,
+        "expense_rolling_average": round(20 / 7, 2),
+    }
+    assert client.get("/api/analytics/trends?days=3", headers=auth_headers).status_code == 422
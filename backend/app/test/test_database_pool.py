@@ -0,0 +1,55 @@
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from app.core import database
+from app.core.config import settings
+
+def test_engine_options_follow_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_POOL_SIZE", 3)
+    monkeypatch.setattr(settings, "DATABASE_STATEMENT_TIMEOUT_MS", 5000)
+
+    options = database.engine_options("postgresql://user@localhost/finance")
+    assert options["pool_size"] == 3
+    assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+    assert database.engine_options("postgresql+asyncpg://user@localhost/finance")["connect_args"] == {
+        "server_settings": {"statement_timeout": "5000"}
+    }
+    # In-memory SQLite keeps its own single-connection pool
+    assert database.engine_options("sqlite://") == {"pool_pre_ping": True}
+
+    monkeypatch.setattr(settings, "DATABASE_EXTERNAL_POOLER", True)
+    options = database.engine_options("postgresql://user@pgbouncer/finance")
+    assert options["poolclass"] is NullPool
+    assert "pool_size" not in options
+
+def test_warm_up_opens_the_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_POOL_SIZE", 3)
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+    engine = create_engine(url, **database.engine_options(url))
+    try:
+        assert database.warm_up_pool(engine) == 3
+        assert engine.pool.checkedin() == 3
+    finally:
+        engine.dispose()
+
+def test_async_sqlite_file_engine_gets_a_queue_pool(tmp_path, monkeypatch):
+    import asyncio
+
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    monkeypatch.setattr(settings, "DATABASE_POOL_SIZE", 2)
+    url = f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}"
+    engine = create_async_engine(url, **database.engine_options(url))
+
+    async def check():
+        try:
+            async with engine.connect() as connection:
+                assert (await connection.execute(text("SELECT 1"))).scalar() == 1
+            assert await database.warm_up_async_pool(engine) == 2
+        finally:
+            await engine.dispose()
+
+    assert isinstance(engine.pool, AsyncAdaptedQueuePool)
+    asyncio.run(check())
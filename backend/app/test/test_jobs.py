@@ -0,0 +1,74 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import sessionmaker
+
+from app.core import database
+from app.core.config import settings
+from app.models.job import Job, JobStatus
+from app.models.snapshot import AnalyticsSnapshot
+from app.models.user import User
+from app.services import jobs, snapshots
+from app.services.aggregation import get_transaction_analytics
+
+@pytest.fixture
+def Session(app_engine, monkeypatch):
+    """Point the job runner's sessions at the test database"""
+    session_factory = sessionmaker(bind=app_engine, autoflush=False)
+    monkeypatch.setattr(database, "SessionLocal", session_factory)
+    return session_factory
+
+@jobs.handler("test_flaky")
+def flaky(db, payload):
+    raise RuntimeError("try again")
+
+def test_failing_job_is_retried_with_backoff_then_failed(Session, monkeypatch):
+    with Session() as db:
+        jobs.enqueue(db, "test_flaky", {"n": 1}, key="flaky")
+        jobs.enqueue(db, "test_flaky", {"n": 2}, key="flaky") # Same key: skipped
+        db.commit()
+
+    assert jobs.run_until_empty() == 1
+    with Session() as db:
+        job = db.execute(select(Job)).scalar_one()
+        assert (job.status, job.attempts, job.last_error) == (JobStatus.QUEUED, 1, "RuntimeError: try again")
+        assert job.payload == {"n": 1}
+        # Not due again until the backoff has passed
+        assert jobs.claim(db) is None
+
+        # Make it due, and the retries after it too
+        db.execute(update(Job).values(run_at=jobs._now()))
+        db.commit()
+    monkeypatch.setattr(settings, "JOBS_RETRY_BASE_SECONDS", 0)
+    assert jobs.run_until_empty() == settings.JOBS_MAX_ATTEMPTS - 1
+    with Session() as db:
+        job = db.execute(select(Job)).scalar_one()
+        assert (job.status, job.attempts) == (JobStatus.FAILED, settings.JOBS_MAX_ATTEMPTS)
+
+def test_snapshots_are_served_while_fresh(client, auth_headers, Session, monkeypatch):
+    transaction = {"description": "Rent", "amount": 900.0, "date": date.today().isoformat(), "type": "expense", "category": "Housing"}
+    client.post("/api/transactions", json=transaction, headers=auth_headers)
+    monkeypatch.setattr(settings, "ANALYTICS_SNAPSHOT_HOUR", 0)
+    with Session() as db:
+        snapshots.schedule_nightly(db)
+        snapshots.schedule_nightly(db) # Once a day
+        db.commit()
+
+    # snapshot_all, then the snapshot_user job it queued
+    assert jobs.run_until_empty() == 2
+    marker = {"monthly_summary": [], "category_breakdown": [], "income_vs_expense": {"from": "snapshot"}}
+    with Session() as db:
+        assert db.execute(select(func.count()).select_from(AnalyticsSnapshot)).scalar() == len(snapshots.TIMEFRAMES)
+        # Mark the stored copies so they can be told apart from a fresh computation
+        db.execute(update(AnalyticsSnapshot).values(data=marker))
+        db.commit()
+
+    response = client.get("/api/analytics", params={"timeframe": "quarter"}, headers=auth_headers)
+    assert response.json() == marker
+
+    # Any write bumps the data version, which retires the snapshots
+    client.post("/api/transactions", json=transaction, headers=auth_headers)
+    with Session() as db:
+        user_id = db.execute(select(User.id)).scalar_one()
+        assert snapshots.get_analytics(db, user_id, "quarter") == get_transaction_analytics(db, user_id, "quarter")
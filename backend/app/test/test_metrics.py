@@ -0,0 +1,33 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.core import metrics, query_monitor
+
+def test_requests_are_recorded_per_route_template():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    metrics.instrument_engine(engine, "metrics-test")
+    app = FastAPI()
+    app.add_middleware(metrics.MetricsMiddleware)
+    app.add_middleware(query_monitor.QueryContextMiddleware)
+
+    @app.get("/metrics-test/{item_id}")
+    def read_item(item_id: int):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            connection.execute(text("SELECT 2"))
+        return {"id": item_id}
+
+    client = TestClient(app)
+    for item_id in (1, 2):
+        assert client.get(f"/metrics-test/{item_id}").status_code == 200
+
+    lines = metrics.render().splitlines()
+    labels = 'method="GET",route="/metrics-test/{item_id}"'
+    assert f'http_requests_total{{{labels},status="200"}} 2' in lines
+    assert f"http_request_duration_seconds_count{{{labels}}} 2" in lines
+    # Sync handlers run in the threadpool; their queries still count
+    assert f"http_request_db_queries_sum{{{labels}}} 4" in lines
+    assert 'db_queries_total{pool="metrics-test"} 4' in lines
+    assert 'db_pool_checkout_wait_seconds_count{pool="metrics-test"} 2' in lines
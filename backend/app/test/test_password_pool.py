@@ -0,0 +1,35 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.hashing import PasswordHashingPool
+
+def test_saturated_pool_rejects_with_503():
+    pool = PasswordHashingPool(workers=1, max_pending=1)
+    release = threading.Event()
+    running = [pool._submit(release.wait), pool._submit(release.wait)]
+
+    with pytest.raises(HTTPException) as exc:
+        pool.call(str, "rejected")
+    assert exc.value.status_code == 503
+
+    release.set()
+    for future in running:
+        future.result()
+    assert pool.call(str.upper, "ok") == "OK"
+    stats = pool.stats()
+    assert (stats["completed"], stats["rejected"], stats["in_flight"]) == (3, 1, 0)
+
+def test_run_does_not_block_the_event_loop():
+    pool = PasswordHashingPool(workers=1, max_pending=0)
+    release = threading.Event()
+
+    async def scenario():
+        hashing = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.01) # The loop keeps serving other work meanwhile
+        release.set()
+        return await hashing
+
+    assert asyncio.run(scenario()) is True
@@ -0,0 +1,63 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.core import query_monitor
+from app.core.config import settings
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    query_monitor.instrument_engine(engine, "monitor-test")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        connection.execute(text("INSERT INTO items (id, name) VALUES (:id, :name)"), [{"id": i, "name": f"item {i}"} for i in range(30)])
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def client(engine):
+    app = FastAPI()
+    app.add_middleware(query_monitor.QueryContextMiddleware)
+
+    @app.get("/items")
+    def list_items(count: int):
+        with engine.connect() as connection:
+            return [connection.execute(text("SELECT name FROM items WHERE id = :id"), {"id": i}).scalar() for i in range(count)]
+
+    return TestClient(app, raise_server_exceptions=True)
+
+def test_normalize_ignores_literals_and_in_list_length():
+    assert query_monitor.normalize("SELECT * FROM t WHERE id IN (?, ?, ?) AND name = 'x'") == \
+        query_monitor.normalize("SELECT *  FROM t\nWHERE id IN (?, ?) AND name = 'y'")
+    assert query_monitor.normalize("SELECT * FROM t WHERE id = 41") == "SELECT * FROM t WHERE id = ?"
+
+def test_repeated_statement_raises_outside_production(client, monkeypatch):
+    monkeypatch.setattr(settings, "SQL_N_PLUS_ONE_THRESHOLD", 5)
+    assert len(client.get("/items", params={"count": 5}).json()) == 5
+    with pytest.raises(query_monitor.NPlusOneError, match="/items"):
+        client.get("/items", params={"count": 6})
+
+def test_repeated_statement_is_logged_in_production(client, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SQL_N_PLUS_ONE_THRESHOLD", 5)
+    monkeypatch.setenv("ENV", "production")
+    with caplog.at_level(logging.WARNING, logger="app.sql"):
+        assert len(client.get("/items", params={"count": 20}).json()) == 20
+    # Logged once per request and statement
+    assert [record.getMessage() for record in caplog.records if "N+1" in record.getMessage()] == [
+        "N+1 query pattern on /items: statement run more than 5 times in one request: "
+        "SELECT name FROM items WHERE id = ?"
+    ]
+
+def test_slow_queries_are_logged_without_parameters(engine, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SQL_SLOW_QUERY_MS", 1e-6)
+    with caplog.at_level(logging.WARNING, logger="app.sql"), engine.connect() as connection:
+        connection.execute(text("SELECT id FROM items WHERE name = :name AND id > :id"), {"name": "hunter2", "id": 7})
+    message = caplog.records[-1].getMessage()
+    assert message.startswith("slow query: ")
+    assert message.endswith("on - (pool monitor-test, 2 parameters redacted): SELECT id FROM items WHERE name = ? AND id > ?")
+    assert "hunter2" not in message
@@ -0,0 +1,183 @@
+import os
+import uuid
+from datetime import date, datetime, timezone
+from itertools import islice
+from pathlib import Path
+
+import pytest
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import sessionmaker
+
+from app.models.recurring import RecurrenceFrequency, RecurringRule
+from app.models.transaction import Transaction, TransactionType
+from app.services import recurring, rollups
+from app.utils.dates import add_months
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "")
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+def rule(frequency, start, **fields):
+    return RecurringRule(frequency=RecurrenceFrequency(frequency), start_date=start, interval=fields.pop("interval", 1), **fields)
+
+def test_occurrences():
+    month_end = rule("monthly", date(2026, 1, 31))
+    assert list(recurring.occurrences(month_end, date(2026, 1, 1), date(2026, 4, 30))) == [
+        date(2026, 1, 31), date(2026, 2, 28), date(2026, 3, 31), date(2026, 4, 30),
+    ]
+    # The first occurrence on day N is on or after start_date
+    payday = rule("monthly", date(2026, 1, 20), day_of_month=5, interval=2)
+    assert list(recurring.occurrences(payday, date(2026, 1, 1), date(2026, 8, 1))) == [date(2026, 3, 5), date(2026, 5, 5), date(2026, 7, 5)]
+
+    fortnightly = rule("weekly", date(2026, 1, 2), interval=2, end_date=date(2026, 2, 13))
+    assert list(recurring.occurrences(fortnightly, date(2026, 1, 10), date(2026, 12, 31))) == [date(2026, 1, 16), date(2026, 1, 30), date(2026, 2, 13)]
+    assert recurring.next_occurrence(fortnightly, date(2026, 2, 13)) is None
+
+    leap = rule("yearly", date(2024, 2, 29))
+    assert list(recurring.occurrences(leap, date(2024, 3, 1), date(2028, 12, 31))) == [
+        date(2025, 2, 28), date(2026, 2, 28), date(2027, 2, 28), date(2028, 2, 29),
+    ]
+
+@pytest.fixture
+def Session(app_engine):
+    return sessionmaker(bind=app_engine, autoflush=False)
+
+def test_rules_are_written_once_per_occurrence(client, auth_headers, Session):
+    today = date.today()
+    body = {
+        "description": "Rent", "amount": 900.0, "type": "expense", "category": "Housing",
+        "frequency": "monthly", "start_date": add_months(today, -3).isoformat(),
+    }
+    response = client.post("/api/recurring", json=body, headers=auth_headers)
+    assert response.status_code == 201
+    rent = response.json()
+    assert rent["materialized_through"] == today.isoformat()
+    assert rent["next_date"] == add_months(date.fromisoformat(body["start_date"]), 4).isoformat()
+
+    def written() -> int:
+        with Session() as db:
+            return db.execute(select(func.count()).select_from(Transaction)).scalar()
+
+    # The months already due were caught up on creation
+    assert written() == 4
+    budget = {"name": "Rent", "category": "Housing", "amount": 1000.0, "period": "custom", "start_date": today.isoformat(), "end_date": add_months(today, 2).isoformat()}
+    budget_id = client.post("/api/budgets", json=budget, headers=auth_headers).json()["id"]
+
+    # Projection computes upcoming occurrences without writing them
+    projection = client.get("/api/recurring/projection", params={"months": 12}, headers=auth_headers).json()
+    assert [item["date"] for item in projection][:2] == [rent["next_date"], add_months(date.fromisoformat(body["start_date"]), 5).isoformat()]
+    assert len(projection) == 12
+    assert written() == 4
+
+    # A run that dies before committing leaves nothing behind; the rerun writes each occurrence once
+    through = add_months(today, 2)
+    with Session() as db:
+        rules = db.execute(select(*RecurringRule.__table__.c)).all()
+        assert recurring._materialize(db, rules, through) == 2
+        db.rollback()
+    with Session() as db:
+        assert recurring.materialize(db, through) == {"rules": 1, "transactions": 2}
+        assert recurring.materialize(db, through) == {"rules": 0, "transactions": 0}
+    assert written() == 6
+    # Budget spend follows the bulk insert
+    in_budget = recurring.occurrences(rule("monthly", date.fromisoformat(body["start_date"])), today, through)
+    assert client.get(f"/api/budgets/{budget_id}", headers=auth_headers).json()["spent_amount"] == 900.0 * len(list(in_budget))
+
+def test_long_backlog_is_left_to_the_job(client, auth_headers, Session, monkeypatch):
+    from app.core.config import settings
+    from app.models.job import Job
+
+    monkeypatch.setattr(settings, "RECURRING_CATCH_UP_LIMIT", 10)
+    today = date.today()
+    body = {
+        "description": "Gym", "amount": 10.0, "type": "expense", "category": "Health",
+        "frequency": "weekly", "start_date": add_months(today, -12).isoformat(),
+    }
+    gym = client.post("/api/recurring", json=body, headers=auth_headers).json()
+    due = list(recurring.occurrences(rule("weekly", date.fromisoformat(body["start_date"])), date.min, today))
+
+    with Session() as db:
+        assert db.execute(select(func.count()).select_from(Transaction)).scalar() == 10
+        assert gym["materialized_through"] == due[9].isoformat()
+        assert db.execute(select(Job.kind)).scalars().all() == ["materialize_recurring"]
+
+        stale = datetime(2000, 1, 1, tzinfo=timezone.utc)
+        db.execute(update(RecurringRule).values(updated_at=stale))
+        assert recurring.materialize(db) == {"rules": 1, "transactions": len(due) - 10}
+        assert db.execute(select(RecurringRule.updated_at)).scalar().year > 2000
+
+def test_rule_fields_are_validated(client, auth_headers):
+    body = {
+        "description": "Rent", "amount": 900.0, "type": "expense", "category": "Housing",
+        "frequency": "monthly", "start_date": date.today().isoformat(),
+    }
+    assert client.post("/api/recurring", json={**body, "frequency": "weekly", "day_of_month": 5}, headers=auth_headers).status_code == 422
+    url = f"/api/recurring/{client.post('/api/recurring', json=body, headers=auth_headers).json()['id']}"
+
+    for field in ("start_date", "interval", "frequency", "amount", "description"):
+        assert client.put(url, json={field: None}, headers=auth_headers).status_code == 422
+    assert client.put(url, json={"frequency": "weekly", "day_of_month": 31}, headers=auth_headers).status_code == 422
+    assert client.put(url, json={"day_of_month": 28}, headers=auth_headers).status_code == 200
+    # Checked against the stored rule too
+    assert client.put(url, json={"frequency": "weekly"}, headers=auth_headers).status_code == 400
+    assert client.put(url, json={"frequency": "weekly", "day_of_month": None}, headers=auth_headers).status_code == 200
+    assert client.put(url, json={"notes": None}, headers=auth_headers).status_code == 200
+
+@pytest.mark.skipif(not TEST_DATABASE_URL.startswith("postgresql"), reason="set TEST_DATABASE_URL to a Postgres database")
+def test_rule_being_edited_is_skipped_by_the_scheduler():
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import create_engine, delete
+    from sqlalchemy.orm import Session
+
+    from app.models.rollup import MonthlyRollup
+    from app.models.user import User
+    from app.routes.recurring import get_user_rule
+
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    config.set_main_option("sqlalchemy.url", TEST_DATABASE_URL)
+    command.upgrade(config, "head")
+    engine = create_engine(TEST_DATABASE_URL)
+    today = date.today()
+    user_id, rule_id = uuid.uuid4(), uuid.uuid4()
+    user = User(id=user_id, name="lock", email=f"lock-{uuid.uuid4()}@example.com", password="x")
+    rent = rule("monthly", today, id=rule_id, user_id=user_id, description="Rent", amount=900.0,
+                type=TransactionType.EXPENSE, category="Housing", next_date=today)
+    with Session(engine) as db:
+        db.add(user)
+        db.flush()
+        db.add(rent)
+        db.commit()
+    editor, scheduler = Session(engine), Session(engine)
+    try:
+        # The update request holds the rule's lock until it commits...
+        get_user_rule(editor, rule_id, user_id, for_update=True)
+        recurring.materialize(scheduler, today)
+        assert scheduler.get(RecurringRule, rule_id).next_date == today
+        editor.rollback()
+        # ...after which the scheduler writes from the committed cursor
+        recurring.materialize(scheduler, today)
+        scheduler.expire_all()
+        assert scheduler.get(RecurringRule, rule_id).next_date == add_months(today, 1)
+        # Its rollup bucket was upserted from array parameters; a later batch adds to it
+        rollups.record_entries(scheduler, [rollups.RollupEntry(user_id, today, "Housing", TransactionType.EXPENSE, 900.0)])
+        bucket = scheduler.execute(select(MonthlyRollup.total, MonthlyRollup.count).where(MonthlyRollup.user_id == user_id)).one()
+        assert tuple(bucket) == (1800.0, 2)
+    finally:
+        editor.close()
+        scheduler.close()
+        with Session(engine) as db:
+            for model in (Transaction, MonthlyRollup, RecurringRule):
+                db.execute(delete(model).where(model.user_id == user_id))
+            db.execute(delete(User).where(User.id == user_id))
+            db.commit()
+        engine.dispose()
+
+def test_projection_merges_rules_lazily():
+    rules = [
+        rule("weekly", date(2026, 1, 1), next_date=date(2026, 1, 1)),
+        rule("monthly", date(2026, 1, 3), next_date=date(2026, 1, 3)),
+        rule("yearly", date(2026, 6, 1), end_date=date(2026, 1, 1), next_date=None), # Ended
+    ]
+    occurrences = recurring.project(rules, date(9999, 1, 1))
+    assert [day for day, _ in islice(occurrences, 4)] == [date(2026, 1, 1), date(2026, 1, 3), date(2026, 1, 8), date(2026, 1, 15)]
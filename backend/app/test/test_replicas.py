@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import database, replicas, security
+from app.core.replicas import ReplicaSet, RoutingSession
+
+@pytest.fixture
+def routed_client(tmp_path, monkeypatch):
+    """
+    The app on a primary and one replica, two SQLite files that never
+    replicate, so which one served a read shows in the response
+    """
+    from app.main import app
+    from app.services.response_cache import response_cache
+    from app.models import user, transaction, budget, rollup, job, snapshot, recurring  # noqa: F401
+
+    engines = {}
+    for name in ("primary", "replica"):
+        engines[name] = create_engine(f"sqlite:///{tmp_path / name}.db", connect_args={"check_same_thread": False})
+        database.Base.metadata.create_all(engines[name])
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(class_=RoutingSession, autoflush=False, bind=engines["primary"]))
+    monkeypatch.setattr(database, "replica_set", ReplicaSet({"replica1": engines["replica"]}))
+    for cache in (response_cache, security.user_cache, replicas.recent_writers):
+        cache.clear()
+    yield TestClient(app)
+    for engine in engines.values():
+        engine.dispose()
+
+def test_reads_use_the_replica_outside_the_read_your_writes_window(routed_client):
+    credentials = {"email": "replica@example.com", "password": "secret1"}
+    routed_client.post("/api/auth/signup", json={"name": "Replica", **credentials})
+    token = routed_client.post("/api/auth/login", json=credentials).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    security.user_cache.clear()
+
+    # The user only exists on the primary; authentication falls back to it
+    assert routed_client.get("/api/transactions", headers=headers).json() == []
+
+    transaction = {"description": "Lunch", "amount": 12.5, "date": "2026-10-01", "type": "expense", "category": "Food"}
+    assert routed_client.post("/api/transactions", json=transaction, headers=headers).status_code == 201
+    # Within the window the writer reads the primary...
+    assert len(routed_client.get("/api/transactions", headers=headers).json()) == 1
+    # ...and afterwards the (never updated) replica
+    replicas.recent_writers.clear()
+    assert routed_client.get("/api/transactions", headers=headers).json() == []
+
+def test_replica_set_skips_unhealthy_replicas(tmp_path):
+    healthy = create_engine(f"sqlite:///{tmp_path / 'healthy.db'}")
+    broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'broken.db'}")
+    replica_set = ReplicaSet({"replica1": healthy, "replica2": broken})
+    assert {replica_set.choose() for _ in range(4)} == {healthy, broken}
+
+    asyncio.run(replica_set.check(timeout=5))
+
+    assert [replica.healthy for replica in replica_set.replicas] == [True, False]
+    assert {replica_set.choose() for _ in range(4)} == {healthy}
@@ -0,0 +1,33 @@
+from sqlalchemy import event
+
+from app.core import security
+
+def test_authenticated_request_checks_out_one_connection(client, app_engine, auth_headers):
+    checkouts = []
+    event.listen(app_engine, "checkout", lambda *args: checkouts.append(args))
+
+    for user_cached in (False, True):
+        if not user_cached:
+            security.user_cache.clear()
+        checkouts.clear()
+        assert client.get("/api/transactions", headers=auth_headers).status_code == 200
+        assert len(checkouts) == 1
+
+def test_current_user_can_be_updated_by_the_handler(client, auth_headers):
+    # The user from get_current_user lives in the handler's own session
+    for name in ("Renamed", "Renamed again"):
+        response = client.put("/api/auth/me", json={"name": name}, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["name"] == name
+
+def test_export_streams_through_the_request_session(client, app_engine, auth_headers):
+    body = {"description": "Rent", "amount": 900.0, "date": "2026-03-01", "type": "expense", "category": "Housing"}
+    client.post("/api/transactions", json=body, headers=auth_headers)
+    checkouts = []
+    event.listen(app_engine, "checkout", lambda *args: checkouts.append(args))
+
+    response = client.get("/api/transactions/export", params={"format": "ndjson"}, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert [line for line in response.text.splitlines() if '"Rent"' in line]
+    assert len(checkouts) == 1
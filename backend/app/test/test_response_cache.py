@@ -0,0 +1,25 @@
+def add_expense(client, headers, amount: float):
+    response = client.post(
+        "/api/transactions",
+        json={"description": "Lunch", "amount": amount, "date": "2026-09-01", "type": "expense", "category": "Food"},
+        headers=headers,
+    )
+    assert response.status_code == 201
+
+def test_unchanged_summary_is_not_modified_until_a_write(client, auth_headers):
+    headers = auth_headers
+    add_expense(client, headers, 10)
+
+    first = client.get("/api/transactions/summary", headers=headers)
+    etag = first.headers["ETag"]
+    assert first.json()["total_expense"] == 10
+
+    revalidated = client.get("/api/transactions/summary", headers={**headers, "If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+
+    add_expense(client, headers, 5)
+    changed = client.get("/api/transactions/summary", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["total_expense"] == 15
@@ -0,0 +1,56 @@
+from datetime import date
+
+from app.services import search
+
+def add(client, headers, description, amount=10.0, category="Shopping", notes=None, day=None):
+    body = {
+        "description": description,
+        "amount": amount,
+        "date": (day or date.today()).isoformat(),
+        "type": "expense",
+        "category": category,
+        "notes": notes,
+    }
+    return client.post("/api/transactions", json=body, headers=headers).json()
+
+def find(client, headers, q, **params) -> list:
+    response = client.get("/api/transactions/search", params={"q": q, **params}, headers=headers)
+    assert response.status_code == 200
+    return [transaction["description"] for transaction in response.json()]
+
+def test_query_words():
+    assert search.query_words("Amazon  refund!") == ["amazon", "refund"]
+    assert search.query_words("'\" * OR") == ["or"]
+    assert search.query_words("--") == []
+
+def test_search_ranks_and_filters(client, auth_headers):
+    add(client, auth_headers, "Amazon refund", amount=25.0, day=date(2026, 1, 5))
+    add(client, auth_headers, "Amazon", amount=40.0, day=date(2026, 2, 1))
+    add(client, auth_headers, "Bookshop", notes="amazon gift card for Sam", category="Gifts")
+    add(client, auth_headers, "Corner Grocer", category="Food")
+
+    # Prefixes of every word must match, in the description or the notes
+    assert find(client, auth_headers, "amaz ref") == ["Amazon refund"]
+    # Shorter documents, where the word weighs more, rank first
+    assert find(client, auth_headers, "amazon") == ["Amazon", "Amazon refund", "Bookshop"]
+    assert find(client, auth_headers, "gift sam") == ["Bookshop"]
+    assert find(client, auth_headers, "amazon", category="Gifts") == ["Bookshop"]
+    assert find(client, auth_headers, "amazon", min_amount=30, end_date="2026-03-01") == ["Amazon"]
+    assert find(client, auth_headers, "?!") == []
+
+    # Other users' transactions are not searched
+    credentials = {"email": "other@example.com", "password": "secret1"}
+    client.post("/api/auth/signup", json={"name": "Other", **credentials})
+    token = client.post("/api/auth/login", json=credentials).json()["access_token"]
+    assert find(client, {"Authorization": f"Bearer {token}"}, "amazon") == []
+
+def test_search_index_follows_edits(client, auth_headers):
+    transaction = add(client, auth_headers, "Fuel Station")
+    assert find(client, auth_headers, "fuel") == ["Fuel Station"]
+
+    client.put(f"/api/transactions/{transaction['id']}", json={"description": "Taxi"}, headers=auth_headers)
+    assert find(client, auth_headers, "fuel") == []
+    assert find(client, auth_headers, "taxi") == ["Taxi"]
+
+    client.delete(f"/api/transactions/{transaction['id']}", headers=auth_headers)
+    assert find(client, auth_headers, "taxi") == []
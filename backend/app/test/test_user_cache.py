@@ -0,0 +1,70 @@
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.core.security import create_access_token, get_current_user, invalidate_cached_user, user_cache
+from app.models import user, transaction, budget, rollup, job, snapshot, recurring  # noqa: F401
+from app.models.user import User
+from app.utils import cache as cache_module
+from app.utils.cache import TTLCache
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def statements(engine):
+    executed = []
+    event.listen(engine, "before_cursor_execute", lambda *args: executed.append(args[2]))
+    return executed
+
+def test_ttl_cache_expires_and_evicts(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=2, ttl=10)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3) # evicts "b", the least recently used
+    assert cache.get("b") is None
+
+    now[0] += 11
+    assert cache.get("a") is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "size": 1}
+
+def test_current_user_is_cached_until_invalidated(engine, statements):
+    user_cache.clear()
+    with Session(engine) as db:
+        db.add(User(id=uuid.uuid4(), name="Ada", email="ada@example.com", password="x"))
+        db.commit()
+        user_id = db.query(User.id).scalar()
+    token = create_access_token(subject=str(user_id))
+
+    with Session(engine) as db:
+        assert get_current_user(db, token).email == "ada@example.com"
+
+    statements.clear()
+    with Session(engine) as db:
+        cached = get_current_user(db, token)
+        assert cached in db
+        assert cached.email == "ada@example.com"
+    assert statements == []
+
+    invalidate_cached_user(user_id)
+    with Session(engine) as db:
+        get_current_user(db, token)
+    assert len(statements) == 1
+
+def test_unknown_user_is_rejected(engine):
+    with Session(engine) as db, pytest.raises(HTTPException) as exc:
+        get_current_user(db, create_access_token(subject=str(uuid.uuid4())))
+    assert exc.value.status_code == 401
@@ -0,0 +1,95 @@
+import calendar
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import Date, Integer, cast, func, literal
+
+# Calendar bucket sizes for time series; weeks start on Monday (ISO)
+GRANULARITIES = ("day", "week", "month", "quarter")
+
+def month_start(value: date) -> date:
+    """Get the first day of the month containing a date"""
+    return value.replace(day=1)
+
+def next_month_start(value: date) -> date:
+    """Get the first day of the month after the one containing a date"""
+    if value.month == 12:
+        return date(value.year + 1, 1, 1)
+    return date(value.year, value.month + 1, 1)
+
+def add_months(value: date, months: int) -> date:
+    """Move a date by whole months, clamping the day to the target month's length"""
+    month_index = value.year * 12 + value.month - 1 + months
+    year, month = divmod(month_index, 12)
+    return date(year, month + 1, min(value.day, calendar.monthrange(year, month + 1)[1]))
+
+def bucket_start(value: date, granularity: str) -> date:
+    """Get the first day of the calendar bucket containing a date"""
+    if granularity == "week":
+        return value - timedelta(days=value.weekday())
+    if granularity == "month":
+        return value.replace(day=1)
+    if granularity == "quarter":
+        return date(value.year, (value.month - 1) // 3 * 3 + 1, 1)
+    return value
+
+def next_bucket_start(value: date, granularity: str) -> date:
+    """Get the first day of the calendar bucket after the one containing a date"""
+    start = bucket_start(value, granularity)
+    if granularity == "week":
+        return start + timedelta(days=7)
+    if granularity == "month":
+        return add_months(start, 1)
+    if granularity == "quarter":
+        return add_months(start, 3)
+    return start + timedelta(days=1)
+
+def bucket_label(start: date, granularity: str) -> str:
+    """Display name of the bucket starting on a date"""
+    if granularity == "week":
+        year, week, _ = start.isocalendar()
+        return f"{year}-W{week:02d}"
+    if granularity == "month":
+        return start.strftime("%b %Y")
+    if granularity == "quarter":
+        return f"Q{(start.month - 1) // 3 + 1} {start.year}"
+    return start.isoformat()
+
+def date_bucket(db, column, granularity: str):
+    """
+    Truncate a date column to the first day of its calendar bucket, using
+    the database's own date functions so grouping happens in SQL
+    """
+    if granularity == "day":
+        return column
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(func.date_trunc(granularity, column), Date)
+    # SQLite (local development/tests) has no date_trunc
+    if granularity == "week":
+        # The Sunday ending the week, then back to its Monday
+        return func.date(column, "weekday 0", "-6 days")
+    if granularity == "quarter":
+        months_into_quarter = (cast(func.strftime("%m", column), Integer) - 1) % 3
+        return func.date(column, "start of month", func.printf("-%d months", months_into_quarter))
+    return func.strftime("%Y-%m-01", column)
+
+def month_bucket(db, column):
+    """Truncate a date column to the first day of its month"""
+    return date_bucket(db, column, "month")
+
+def epoch_days(db, column):
+    """
+    Express a date column as whole days since 1970-01-01, so it can be
+    loaded straight into integer arrays
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return column - literal(date(1970, 1, 1), Date)
+    # julianday() of a date is always at midnight, i.e. N + 0.5
+    return cast(func.julianday(column) - 2440587.5, Integer)
+
+def to_date(value) -> date:
+    """Normalize a date value returned by the database to a date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
@@ -0,0 +1,19 @@
+import base64
+import json
+from datetime import date
+from typing import Tuple
+from uuid import UUID
+
+def encode_cursor(row_date: date, row_id: UUID) -> str:
+    """Encode the (date, id) sort key of the last row on a page as an opaque cursor"""
+    payload = json.dumps({"d": row_date.isoformat(), "i": str(row_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[date, UUID]:
+    """Decode a cursor from encode_cursor; raises ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return date.fromisoformat(payload["d"]), UUID(payload["i"])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
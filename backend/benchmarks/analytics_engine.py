@@ -0,0 +1,117 @@
+"""
+Compare the pure-Python analytics functions with the NumPy kernels in
+app.services.columnar on one user's full history.
+
+Run from the backend directory:
+
+    python -m benchmarks.analytics_engine [--database-url URL] [--transactions 200000] [--rounds 3]
+
+The database is filled by benchmarks.synthetic_data (a throwaway SQLite file
+unless --database-url is given; Postgres databases must already be
+migrated). Loading and computing are timed separately, best of --rounds:
+the Python path loads ORM objects and runs calculate_* from
+app.routes.analytics; the columnar path loads arrays with load_columns and
+runs the equivalent kernels. Both must produce the same results.
+"""
+import argparse
+import math
+import os
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from benchmarks.synthetic_data import seed_database, user_email
+
+def best_of(rounds: int, function):
+    """Return (fastest seconds, last result)"""
+    best, result = float("inf"), None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+def same(python_result, columnar_result) -> bool:
+    """Equal up to floating point summation order"""
+    if isinstance(python_result, dict):
+        return python_result.keys() == columnar_result.keys() and all(
+            same(python_result[key], columnar_result[key]) for key in python_result
+        )
+    if isinstance(python_result, list):
+        return len(python_result) == len(columnar_result) and all(map(same, python_result, columnar_result))
+    if isinstance(python_result, float):
+        return math.isclose(python_result, columnar_result, rel_tol=1e-9, abs_tol=1e-6)
+    return python_result == columnar_result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.analytics_engine")
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file")
+    parser.add_argument("--transactions", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--timeframe", choices=("month", "quarter", "year"), default="year")
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark.db')}"
+    seed_database(database_url, 1, args.transactions, args.seed)
+
+    from app.core.database import SessionLocal
+    from app.models.transaction import Transaction
+    from app.models.user import User
+    from app.routes.analytics import (
+        calculate_category_breakdown,
+        calculate_income_vs_expense,
+        calculate_monthly_summary,
+    )
+    from app.services import columnar
+
+    # calculate_monthly_summary keeps transactions after now - 30 days per month
+    months = {"month": 6, "quarter": 12, "year": 24}[args.timeframe]
+    start_date = (datetime.now() - timedelta(days=30 * months)).date() + timedelta(days=1)
+
+    db = SessionLocal()
+    try:
+        user_id = db.query(User.id).filter(User.email == user_email(0)).scalar()
+        count = db.query(Transaction).filter(Transaction.user_id == user_id).count()
+
+        def load_objects():
+            db.expunge_all()
+            return db.query(Transaction).filter(Transaction.user_id == user_id).all()
+
+        def python_compute():
+            return {
+                "monthly_summary": calculate_monthly_summary(transactions, args.timeframe),
+                "category_breakdown": calculate_category_breakdown(transactions),
+                "income_vs_expense": calculate_income_vs_expense(transactions),
+            }
+
+        def columnar_compute():
+            return {
+                "monthly_summary": columnar.monthly_summary(columns, start_date),
+                "category_breakdown": columnar.category_breakdown(columns),
+                "income_vs_expense": columnar.income_vs_expense(columns),
+            }
+
+        timings = {}
+        timings["python load"], transactions = best_of(args.rounds, load_objects)
+        timings["python compute"], expected = best_of(args.rounds, python_compute)
+        timings["columnar load"], columns = best_of(args.rounds, lambda: columnar.load_columns(db, user_id))
+        timings["columnar compute"], actual = best_of(args.rounds, columnar_compute)
+        timings["trends compute"], _ = best_of(args.rounds, lambda: columnar.transaction_trends(columns, date.today()))
+    finally:
+        db.close()
+
+    print(f"{count} transactions on {database_url.split(':', 1)[0]}, best of {args.rounds}")
+    for name, seconds in timings.items():
+        print(f"{name:<17} {seconds * 1000:9.1f} ms")
+    python_total = timings["python load"] + timings["python compute"]
+    columnar_total = timings["columnar load"] + timings["columnar compute"]
+    print(f"speed-up: compute {timings['python compute'] / timings['columnar compute']:.1f}x, "
+          f"load + compute {python_total / columnar_total:.1f}x")
+    for name in expected:
+        if not same(expected[name], actual[name]):
+            raise SystemExit(f"Results differ for {name}")
+    print("Results match")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Compare concurrent-request throughput of the sync and async database modes.
+
+Run from the backend directory (the usual .env / environment settings apply):
+
+    python -m benchmarks.async_vs_sync [--database-url URL] [--concurrency 64] [--duration 20]
+
+Each mode gets its own single-worker uvicorn process on the same database,
+seeded by benchmarks.synthetic_data with one user and --transactions rows.
+Without --database-url a throwaway SQLite file is used (sqlite / aiosqlite);
+pass a Postgres URL to compare psycopg2 with asyncpg. Postgres databases
+must already be migrated.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.load_test import start_server, stop_server, wait_for_server
+from benchmarks.synthetic_data import PASSWORD, seed_database, user_email
+
+ENDPOINTS = (
+    "/api/transactions?limit=50",
+    "/api/transactions/summary",
+    "/api/analytics",
+    "/api/budgets",
+)
+
+async def run_load(base_url: str, credentials: dict, concurrency: int, duration: float, request_timeout: float) -> dict:
+    """
+    Send GET requests from `concurrency` concurrent clients for `duration`
+    seconds, cycling through ENDPOINTS, and measure throughput and latency.
+    Requests that fail or time out count as errors, not throughput.
+    """
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=request_timeout) as client:
+        await wait_for_server(client)
+        token = (await client.post("/api/auth/login", json=credentials)).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        for path in ENDPOINTS: # Warm up connections and caches
+            (await client.get(path, headers=headers)).raise_for_status()
+
+        latencies = []
+        errors = 0
+
+        async def worker(offset: int):
+            nonlocal errors
+            i = offset
+            while time.perf_counter() < deadline:
+                sent = time.perf_counter()
+                try:
+                    response = await client.get(ENDPOINTS[i % len(ENDPOINTS)], headers=headers)
+                except httpx.TimeoutException:
+                    errors += 1
+                else:
+                    if response.status_code == 200:
+                        latencies.append(time.perf_counter() - sent)
+                    else:
+                        errors += 1
+                i += 1
+
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 2),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1) if latencies else None,
+        "p95_ms": round(latencies[max(int(len(latencies) * 0.95) - 1, 0)] * 1000, 1) if latencies else None,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.async_vs_sync")
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds of load per mode")
+    parser.add_argument("--transactions", type=int, default=5000, help="Rows seeded for the benchmark user")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Seconds before a request counts as an error")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark.db')}"
+    seed_database(database_url, users=1, transactions=args.transactions)
+    credentials = {"email": user_email(0), "password": PASSWORD}
+
+    results = {}
+    for mode in ("sync", "async"):
+        server = start_server(database_url, mode == "async", args.port)
+        try:
+            results[mode] = asyncio.run(
+                run_load(f"http://127.0.0.1:{args.port}", credentials, args.concurrency, args.duration, args.timeout)
+            )
+        finally:
+            stop_server(server)
+
+    print(f"{'mode':<6} {'ok':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    for mode, result in results.items():
+        print(
+            f"{mode:<6} {result['requests']:>7} {result['requests_per_second']:>8} "
+            f"{str(result['p50_ms']):>8} {str(result['p95_ms']):>8} {result['errors']:>7}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+Per-endpoint load test of the API on synthetic data.
+
+Run from the backend directory (the usual .env / environment settings apply):
+
+    python -m benchmarks.load_test [--transport asgi|uvicorn] [--database-url URL]
+        [--users 10] [--transactions 10000] [--concurrency 16] [--duration 10]
+        [--output results.json] [--compare previous.json]
+
+The database is filled by benchmarks.synthetic_data (a throwaway SQLite file
+unless --database-url is given; Postgres databases must already be
+migrated). Each endpoint is then loaded on its own for --duration seconds
+by --concurrency clients spread over the benchmark users, either in-process
+through httpx's ASGI transport or over HTTP against a uvicorn worker.
+
+Results (throughput, p50/p95/p99 latency, status counts per endpoint) are
+printed and written as JSON, by default to benchmarks/results/, so runs can
+be compared over time with --compare.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.synthetic_data import PASSWORD, seed_database, user_email
+
+# name -> (method, path); login posts the user's credentials
+ENDPOINTS = {
+    "login": ("POST", "/api/auth/login"),
+    "list": ("GET", "/api/transactions?limit=50"),
+    "summary": ("GET", "/api/transactions/summary"),
+    "analytics": ("GET", "/api/analytics?timeframe=year"),
+    "budgets": ("GET", "/api/budgets"),
+}
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+def percentile(ordered: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return None
+    return ordered[min(max(int(len(ordered) * fraction + 0.5) - 1, 0), len(ordered) - 1)]
+
+def summarize(latencies: List[float], statuses: Counter, errors: int, elapsed: float) -> dict:
+    latencies.sort()
+
+    def ms(value):
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "seconds": round(elapsed, 2),
+        "requests_per_second": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": ms(percentile(latencies, 0.50)),
+        "p95_ms": ms(percentile(latencies, 0.95)),
+        "p99_ms": ms(percentile(latencies, 0.99)),
+        "max_ms": ms(latencies[-1] if latencies else None),
+    }
+
+def start_server(database_url: str, async_mode: bool, port: int, extra_env: Optional[dict] = None) -> subprocess.Popen:
+    """Start a single uvicorn worker serving app.main on the given database"""
+    env = {
+        **os.environ,
+        **(extra_env or {}),
+        "DATABASE_URL": database_url,
+        "DATABASE_ASYNC": str(async_mode).lower(),
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+
+def stop_server(server: subprocess.Popen):
+    server.terminate()
+    try:
+        server.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+async def wait_for_server(client: httpx.AsyncClient, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if (await client.get("/api/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError("Server did not start")
+        await asyncio.sleep(0.2)
+
+async def load_endpoint(
+    client: httpx.AsyncClient,
+    name: str,
+    users: List[dict],
+    concurrency: int,
+    duration: float,
+) -> dict:
+    """
+    Hit one endpoint from `concurrency` clients for `duration` seconds.
+    Non-2xx responses and timeouts count as errors, not throughput.
+    """
+    method, path = ENDPOINTS[name]
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    errors = 0
+
+    def request(user: dict):
+        if name == "login":
+            return client.post(path, json=user["credentials"])
+        return client.request(method, path, headers=user["headers"])
+
+    async def worker(offset: int):
+        nonlocal errors
+        user = users[offset % len(users)]
+        while time.perf_counter() < deadline:
+            sent = time.perf_counter()
+            try:
+                response = await request(user)
+            except httpx.TimeoutException:
+                errors += 1
+                statuses["timeout"] += 1
+                continue
+            statuses[response.status_code] += 1
+            if response.is_success:
+                latencies.append(time.perf_counter() - sent)
+            else:
+                errors += 1
+
+    for user in users: # Warm up connections, caches and the code path
+        (await request(user)).raise_for_status()
+
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    return summarize(latencies, statuses, errors, time.perf_counter() - started)
+
+async def run(client: httpx.AsyncClient, args) -> Dict[str, dict]:
+    users = []
+    for index in range(args.users):
+        credentials = {"email": user_email(index), "password": PASSWORD}
+        response = await client.post("/api/auth/login", json=credentials)
+        response.raise_for_status()
+        users.append({
+            "credentials": credentials,
+            "headers": {"Authorization": f"Bearer {response.json()['access_token']}"},
+        })
+
+    results = {}
+    for name in args.endpoints:
+        results[name] = await load_endpoint(client, name, users, args.concurrency, args.duration)
+        print(f"  {name}: {results[name]['requests_per_second']} req/s", file=sys.stderr)
+    return results
+
+async def run_in_process(args) -> Dict[str, dict]:
+    """Drive app.main through httpx's ASGI transport: no network or server process"""
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=args.timeout) as client:
+        return await run(client, args)
+
+async def run_against_server(args, port: int) -> Dict[str, dict]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=args.timeout) as client:
+        await wait_for_server(client)
+        return await run(client, args)
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_table(results: Dict[str, dict], baseline: Optional[Dict[str, dict]] = None):
+    print(f"{'endpoint':<10} {'ok':>7} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, result in results.items():
+        print(
+            f"{name:<10} {result['requests']:>7} {result['errors']:>7} {result['requests_per_second']:>8} "
+            f"{str(result['p50_ms']):>8} {str(result['p95_ms']):>8} {str(result['p99_ms']):>8}"
+        )
+        previous = (baseline or {}).get(name)
+        if previous:
+            changes = []
+            for key in ("requests_per_second", "p50_ms", "p95_ms", "p99_ms"):
+                if result[key] is not None and previous.get(key):
+                    changes.append(f"{key} {(result[key] - previous[key]) / previous[key] * 100:+.1f}%")
+            print(f"{'':<10} vs baseline: {', '.join(changes)}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load_test")
+    parser.add_argument("--transport", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file")
+    parser.add_argument("--async-db", action="store_true", help="Serve with DATABASE_ASYNC=true")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--transactions", type=int, default=10000, help="Transactions per user")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--endpoints", nargs="+", choices=tuple(ENDPOINTS), default=list(ENDPOINTS))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per endpoint")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Seconds before a request counts as an error")
+    parser.add_argument(
+        "--response-cache", action=argparse.BooleanOptionalAction, default=True,
+        help="Keep the per-process response cache on (off measures the queries behind each response)",
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", type=Path, default=None, help="JSON results file (default benchmarks/results/)")
+    parser.add_argument("--compare", type=Path, default=None, help="Earlier JSON results to compare against")
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark.db')}"
+    app_env = {"ENV": "production"} # Log rather than raise on N+1 patterns
+    if not args.response_cache:
+        app_env["RESPONSE_CACHE_MAX_ENTRIES"] = "0"
+    if args.transport == "asgi":
+        # Settings are read once, when the generator first imports the app
+        os.environ.update(app_env, DATABASE_ASYNC=str(args.async_db).lower())
+
+    print(f"Generating data for {args.users} users x {args.transactions} transactions", file=sys.stderr)
+    seed_database(database_url, args.users, args.transactions, args.seed)
+
+    print(f"Loading endpoints through {args.transport}", file=sys.stderr)
+    if args.transport == "asgi":
+        results = asyncio.run(run_in_process(args))
+    else:
+        server = start_server(database_url, args.async_db, args.port, app_env)
+        try:
+            results = asyncio.run(run_against_server(args, args.port))
+        finally:
+            stop_server(server)
+
+    report = {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "config": {
+            "transport": args.transport,
+            "database": database_url.split(":", 1)[0],
+            "async_db": args.async_db,
+            "users": args.users,
+            "transactions_per_user": args.transactions,
+            "seed": args.seed,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "response_cache": args.response_cache,
+        },
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"load-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+
+    baseline = json.loads(args.compare.read_text())["results"] if args.compare else None
+    print_table(results, baseline)
+    print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main()
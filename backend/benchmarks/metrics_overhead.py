@@ -0,0 +1,82 @@
+"""
+Measure the per-request cost of the metrics middleware and query hooks.
+
+    python -m benchmarks.metrics_overhead [--requests 20000] [--rounds 5]
+
+Drives two identical in-process ASGI apps, one instrumented and one not,
+with a route that runs one query on an in-memory SQLite database. No
+network is involved, so the difference is the instrumentation itself.
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.core import metrics, query_monitor
+
+def build_app(instrumented: bool) -> FastAPI:
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    if instrumented:
+        metrics.instrument_engine(engine, "benchmark")
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        with engine.connect() as connection:
+            return {"id": item_id, "value": connection.execute(text("SELECT 1")).scalar()}
+
+    if instrumented:
+        app.add_middleware(metrics.MetricsMiddleware)
+        app.add_middleware(query_monitor.QueryContextMiddleware)
+    return app
+
+async def drive(app, requests: int) -> float:
+    """Send requests straight through the ASGI interface; returns seconds"""
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for i in range(requests):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": f"/items/{i}",
+            "raw_path": f"/items/{i}".encode(),
+            "query_string": b"",
+            "headers": [],
+            "client": ("127.0.0.1", 1234),
+            "server": ("testserver", 80),
+        }
+        await app(scope, receive, send)
+    return time.perf_counter() - started
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.metrics_overhead")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    apps = {"plain": build_app(False), "metrics": build_app(True)}
+    best = {name: float("inf") for name in apps}
+    for _ in range(args.rounds):
+        # Alternate so both see the same machine conditions
+        for name, app in apps.items():
+            best[name] = min(best[name], asyncio.run(drive(app, args.requests)))
+
+    per_request = {name: seconds / args.requests * 1e6 for name, seconds in best.items()}
+    overhead = per_request["metrics"] - per_request["plain"]
+    print(f"plain    {per_request['plain']:8.1f} us/request")
+    print(f"metrics  {per_request['metrics']:8.1f} us/request")
+    print(f"overhead {overhead:8.1f} us/request ({overhead / per_request['plain'] * 100:.1f}%)")
+
+if __name__ == "__main__":
+    main()
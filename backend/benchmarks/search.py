@@ -0,0 +1,104 @@
+"""
+Compare transaction search through the full-text index (app.services.search)
+with the ILIKE scan it replaces, on a large table.
+
+Run from the backend directory:
+
+    python -m benchmarks.search [--database-url URL] [--users 10] [--transactions 100000] [--rounds 5]
+
+The database is filled by benchmarks.synthetic_data (a throwaway SQLite file
+unless --database-url is given; Postgres databases must already be
+migrated), 1M transactions by default. For each query both versions fetch
+the first page of one user's matches, best of --rounds; the indexes each
+plan uses are printed next to the timings.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic_data import seed_database, user_email
+
+QUERIES = ("dentist", "split friends", "hotel", "freelance invoice", "refund")
+PAGE = 50
+
+def best_of(rounds: int, function):
+    """Return (fastest seconds, last result)"""
+    best, result = float("inf"), None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+def plan_indexes(db, stmt) -> str:
+    """The indexes (or table scans) in the statement's query plan"""
+    from sqlalchemy import text
+
+    sql = stmt.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    if db.get_bind().dialect.name == "sqlite":
+        details = [row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+        return "; ".join(detail for detail in details if detail.startswith(("SCAN", "SEARCH")))
+    names, stack = [], [db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()[0]["Plan"]]
+    while stack:
+        node = stack.pop()
+        if "Index Name" in node:
+            names.append(node["Index Name"])
+        elif node["Node Type"] == "Seq Scan":
+            names.append(f"Seq Scan on {node['Relation Name']}")
+        stack.extend(node.get("Plans", []))
+    return ", ".join(sorted(set(names)))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.search")
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--transactions", type=int, default=100000, help="Transactions per user")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark.db')}"
+    seed_database(database_url, args.users, args.transactions, args.seed)
+
+    from sqlalchemy import and_, func, or_, select, text
+
+    from app.core.database import SessionLocal
+    from app.models.transaction import Transaction
+    from app.models.user import User
+    from app.services import search
+
+    db = SessionLocal()
+    try:
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(text("ANALYZE transactions"))
+        total = db.execute(select(func.count()).select_from(Transaction)).scalar()
+        user_id = db.execute(select(User.id).where(User.email == user_email(0))).scalar()
+        print(f"{total} transactions on {database_url.split(':', 1)[0]}, best of {args.rounds}, first {PAGE} matches")
+
+        for q in QUERIES:
+            words = search.query_words(q)
+            # What a search did before: substring scans of the user's rows
+            scan = (
+                select(Transaction)
+                .where(
+                    Transaction.user_id == user_id,
+                    and_(*(or_(Transaction.description.ilike(f"%{word}%"), Transaction.notes.ilike(f"%{word}%")) for word in words)),
+                )
+                .order_by(Transaction.date.desc(), Transaction.id.desc())
+                .limit(PAGE)
+            )
+            indexed = search.search_statement(db, user_id, q).limit(PAGE)
+
+            scan_seconds, scan_rows = best_of(args.rounds, lambda: db.execute(scan).scalars().all())
+            indexed_seconds, indexed_rows = best_of(args.rounds, lambda: db.execute(indexed).scalars().all())
+            if {row.id for row in scan_rows} - {row.id for row in indexed_rows} and len(scan_rows) < PAGE:
+                raise SystemExit(f"The index missed matches for {q!r}")
+            print(f"{q!r}: {len(indexed_rows)} rows")
+            print(f"  ILIKE  {scan_seconds * 1000:8.2f} ms  {plan_indexes(db, scan)}")
+            print(f"  index  {indexed_seconds * 1000:8.2f} ms  {plan_indexes(db, indexed)}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Deterministic synthetic data for benchmarks: users with realistic
+transaction histories (salary, rent, bills, subscriptions and day-to-day
+spending) and monthly budgets for their main spending categories.
+
+Run from the backend directory against a migrated database (SQLite files
+get their schema created):
+
+    python -m benchmarks.synthetic_data --database-url URL [--users 10] [--transactions 100000] [--seed 42] [--end-date YYYY-MM-DD]
+
+--transactions is per user. The same seed, user count and end date always
+produce the same rows and IDs. Users are bench-<n>@example.com with the
+password "benchmark"; existing ones are skipped, so reruns are cheap.
+"""
+import argparse
+import math
+import os
+import random
+import time
+import uuid
+from datetime import date, timedelta
+from typing import Dict, Iterator, List
+
+PASSWORD = "benchmark"
+CHUNK_SIZE = 10000
+
+# category -> (weight among day-to-day spending, median amount, merchants)
+SPENDING = {
+    "Food": (0.38, 18.0, ("Corner Grocer", "FreshMart", "Bakery", "Noodle Bar", "Pizza Place", "Cafe")),
+    "Transport": (0.18, 12.0, ("Metro", "Fuel Station", "Taxi", "Bike Share", "Parking")),
+    "Shopping": (0.14, 45.0, ("Online Store", "Department Store", "Hardware Shop", "Bookshop")),
+    "Entertainment": (0.12, 25.0, ("Cinema", "Concert Hall", "Bowling", "Game Store")),
+    "Health": (0.08, 30.0, ("Pharmacy", "Dentist", "Gym Day Pass", "Optician")),
+    "Travel": (0.04, 180.0, ("Airline", "Hotel", "Rail Pass", "Car Rental")),
+    "Gifts": (0.06, 40.0, ("Florist", "Gift Shop", "Donation")),
+}
+# Monthly fixed items: (description, category, type, amount, day of month, price jitter)
+MONTHLY = (
+    ("Salary", "Salary", "income", 4200.0, 25, 0.0),
+    ("Rent", "Rent", "expense", 1450.0, 1, 0.0),
+    ("Electricity", "Utilities", "expense", 65.0, 8, 0.25),
+    ("Water", "Utilities", "expense", 30.0, 12, 0.15),
+    ("Internet", "Utilities", "expense", 45.0, 15, 0.0),
+    ("Streaming", "Subscriptions", "expense", 15.99, 3, 0.0),
+    ("Phone plan", "Subscriptions", "expense", 25.0, 20, 0.0),
+)
+BUDGET_CATEGORIES = ("Food", "Transport", "Shopping", "Entertainment")
+BUDGET_MONTHS = 3
+
+def user_email(index: int) -> str:
+    return f"bench-{index}@example.com"
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+def _month_starts(end_date: date, months: int) -> List[date]:
+    starts = []
+    year, month = end_date.year, end_date.month
+    for _ in range(months):
+        starts.append(date(year, month, 1))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return starts[::-1]
+
+def transaction_rows(rng: random.Random, user_id, count: int, end_date: date) -> Iterator[dict]:
+    """
+    Yield `count` transactions ending at end_date. The history is long
+    enough for ~4 day-to-day purchases a day (at least 3 months, at most
+    10 years); monthly fixed items come first, the rest is day-to-day
+    spending with more on weekends and an occasional freelance payment.
+    """
+    from app.models.transaction import TransactionType
+
+    months = min(max(math.ceil(count / 120), 3), 120)
+    start_date = _month_starts(end_date, months)[0]
+    span_days = (end_date - start_date).days + 1
+
+    def row(description, category, kind, amount, day, notes=None):
+        return {
+            "id": _uuid(rng),
+            "user_id": user_id,
+            "description": description,
+            "amount": round(amount, 2),
+            "date": day,
+            "type": TransactionType(kind),
+            "category": category,
+            "notes": notes,
+        }
+
+    produced = 0
+    for month_start in _month_starts(end_date, months):
+        for description, category, kind, amount, day_of_month, jitter in MONTHLY:
+            day = month_start.replace(day=min(day_of_month, 28))
+            if day > end_date or produced >= count:
+                continue
+            yield row(description, category, kind, amount * (1 + rng.uniform(-jitter, jitter)), day)
+            produced += 1
+
+    categories = list(SPENDING)
+    weights = [SPENDING[category][0] for category in categories]
+    while produced < count:
+        day = start_date + timedelta(days=rng.randrange(span_days))
+        # Weekend days are half again as likely to have a purchase
+        if day.weekday() < 5 and rng.random() < 1 / 3:
+            continue
+        if rng.random() < 0.01:
+            yield row("Freelance invoice", "Freelance", "income", rng.uniform(200, 1500), day)
+        else:
+            category = rng.choices(categories, weights)[0]
+            _, median, merchants = SPENDING[category]
+            amount = max(rng.lognormvariate(math.log(median), 0.6), 0.5)
+            notes = "split with friends" if rng.random() < 0.02 else None
+            yield row(rng.choice(merchants), category, "expense", amount, day, notes)
+        produced += 1
+
+def budget_rows(rng: random.Random, user_id, end_date: date) -> Iterator[dict]:
+    """Monthly budgets for the main spending categories over the last few months"""
+    from app.models.budget import BudgetPeriod
+
+    for month_start in _month_starts(end_date, BUDGET_MONTHS):
+        next_month = (month_start + timedelta(days=32)).replace(day=1)
+        for category in BUDGET_CATEGORIES:
+            yield {
+                "id": _uuid(rng),
+                "user_id": user_id,
+                "name": f"{category} {month_start:%b %Y}",
+                "category": category,
+                "amount": float(rng.choice((200, 250, 300, 400, 500, 750))),
+                "period": BudgetPeriod.MONTHLY,
+                "start_date": month_start,
+                "end_date": next_month - timedelta(days=1),
+            }
+
+def generate(db, users: int, transactions: int, seed: int = 42, end_date: date = None) -> Dict[str, int]:
+    """
+    Write `users` users with `transactions` transactions each, their
+    budgets and rollups, committing per user. Returns counts of what was
+    written.
+    """
+    from sqlalchemy import insert, select
+
+    from app.core.security import get_password_hash
+    from app.models.budget import Budget
+    from app.models.user import User
+    from app.services.budget_spend import refresh_spent
+    from app.services.importer import insert_rows
+    from app.services.rollups import rebuild_rollups
+
+    end_date = end_date or date.today()
+    password_hash = get_password_hash(PASSWORD)
+    written = {"users": 0, "transactions": 0, "budgets": 0, "skipped_users": 0}
+    for index in range(users):
+        rng = random.Random(f"{seed}:{index}")
+        email = user_email(index)
+        if db.execute(select(User.id).where(User.email == email)).first() is not None:
+            written["skipped_users"] += 1
+            continue
+
+        user_id = _uuid(rng)
+        db.execute(insert(User).values(id=user_id, name=f"Benchmark User {index}", email=email, password=password_hash))
+        chunk = []
+        for row in transaction_rows(rng, user_id, transactions, end_date):
+            chunk.append(row)
+            if len(chunk) >= CHUNK_SIZE:
+                insert_rows(db, chunk)
+                chunk = []
+        if chunk:
+            insert_rows(db, chunk)
+        budgets = list(budget_rows(rng, user_id, end_date))
+        db.execute(insert(Budget), budgets)
+        refresh_spent(db, user_id)
+        rebuild_rollups(db, user_id=user_id)
+        db.commit()
+        written["users"] += 1
+        written["transactions"] += transactions
+        written["budgets"] += len(budgets)
+    return written
+
+def seed_database(database_url: str, users: int, transactions: int, seed: int = 42, end_date: date = None) -> Dict[str, int]:
+    """
+    Point the app at database_url, create the schema on SQLite and
+    generate the data (through the sync engine)
+    """
+    os.environ["DATABASE_URL"] = database_url
+    from app.core.database import Base, SessionLocal, engine
+    # Import all models so relationships between them can be resolved
+    from app.models import user, transaction, budget, rollup, job, snapshot, recurring  # noqa: F401
+
+    if engine.dialect.name == "sqlite":
+        Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        return generate(db, users, transactions, seed, end_date)
+    finally:
+        db.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.synthetic_data")
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--transactions", type=int, default=100000, help="Transactions per user")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None, help="Last day of the histories (default today)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    written = seed_database(args.database_url, args.users, args.transactions, args.seed, args.end_date)
+    print(
+        f"Wrote {written['users']} users, {written['transactions']} transactions and "
+        f"{written['budgets']} budgets in {time.perf_counter() - started:.1f}s "
+        f"({written['skipped_users']} existing users skipped)"
+    )
+
+if __name__ == "__main__":
+    main()
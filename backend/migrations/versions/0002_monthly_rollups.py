@@ -0,0 +1,49 @@
+"""monthly_rollups table
+
+Backfilled from the existing transactions, since analytics read the
+rollups by default (ANALYTICS_USE_ROLLUPS).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 12:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "monthly_rollups",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("category", sa.String(), nullable=False),
+        # The enum type already exists, created with the transactions table
+        sa.Column("type", postgresql.ENUM("INCOME", "EXPENSE", name="transactiontype", create_type=False), nullable=False),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("user_id", "month", "category", "type"),
+    )
+    if op.get_bind().dialect.name == "postgresql":
+        month = "CAST(date_trunc('month', date) AS date)"
+    else:
+        month = "date(date, 'start of month')"
+    op.execute(
+        "INSERT INTO monthly_rollups (user_id, month, category, type, total, count) "
+        f"SELECT user_id, {month}, category, type, sum(amount), count(*) FROM transactions "
+        f"GROUP BY user_id, {month}, category, type"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("monthly_rollups")
@@ -0,0 +1,47 @@
+"""composite indexes for the transaction and budget hot paths
+
+- transactions(user_id, date): every per-user query, lists ordered by date
+- transactions(user_id, category, type, date): budget progress windows
+- budgets(user_id, category, start_date, end_date): budget listings and
+  the per-category overlap check
+
+On a large existing table, consider creating these by hand with
+CREATE INDEX CONCURRENTLY before running this migration; it skips
+indexes that already exist.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 12:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_transactions_user_id_date", "transactions", ["user_id", "date"]),
+    ("ix_transactions_user_id_category_type_date", "transactions", ["user_id", "category", "type", "date"]),
+    ("ix_budgets_user_id_category_start_date_end_date", "budgets", ["user_id", "category", "start_date", "end_date"]),
+]
+
+
+def upgrade() -> None:
+    existing = {
+        table: {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+        for table in ("transactions", "budgets")
+    }
+    for name, table, columns in INDEXES:
+        if name not in existing[table]:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,31 @@
+"""extend the (user_id, date) transaction index with id for keyset pagination
+
+Listing is ordered by (date DESC, id DESC) and pages seek with
+(date, id) < (cursor_date, cursor_id), which this index serves directly.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_transactions_user_id_date_id", "transactions", ["user_id", "date", "id"])
+    # The new index covers every query the old one served
+    op.drop_index("ix_transactions_user_id_date", table_name="transactions")
+
+
+def downgrade() -> None:
+    op.create_index("ix_transactions_user_id_date", "transactions", ["user_id", "date"])
+    op.drop_index("ix_transactions_user_id_date_id", table_name="transactions")
@@ -0,0 +1,51 @@
+"""range-partition transactions by date (Postgres, opt-in)
+
+With TRANSACTION_PARTITION_INTERVAL set to "year" or "month", converts the
+transactions table into a partitioned one (see app.services.partitions):
+a partition per period covering existing rows and
+TRANSACTION_PARTITIONS_AHEAD future periods, plus a default partition.
+The primary key becomes (id, date). Every row is copied under an exclusive
+lock, so on a large table run it in a maintenance window. Otherwise, and
+on other databases, this does nothing; `python -m app.cli
+partition-transactions` converts later.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+from app.services import partitions
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The transactions indexes as of this revision; later revisions add theirs
+INDEXES = {
+    "ix_transactions_user_id_date_id": "CREATE INDEX ix_transactions_user_id_date_id ON transactions (user_id, date, id)",
+    "ix_transactions_user_id_category_type_date":
+        "CREATE INDEX ix_transactions_user_id_category_type_date ON transactions (user_id, category, type, date)",
+}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or not settings.TRANSACTION_PARTITION_INTERVAL:
+        return
+    partitions.partition_table(
+        bind, settings.TRANSACTION_PARTITION_INTERVAL, settings.TRANSACTION_PARTITIONS_AHEAD, indexes=INDEXES
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        partitions.unpartition_table(bind, indexes=INDEXES)
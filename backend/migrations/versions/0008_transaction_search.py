@@ -0,0 +1,42 @@
+"""full-text search indexes on transaction descriptions and notes
+
+A GIN index on the search tsvector and, where the pg_trgm extension can
+be installed, a trigram index on descriptions for fuzzy matches. Building
+them reads the whole table. (SQLite databases get their FTS5 table from
+create_all, or from `python -m app.cli rebuild-search-index`.)
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copies of app.models.transaction.SEARCH_DOCUMENT and
+# app.services.search's trigram index as of this revision
+SEARCH_DOCUMENT = "to_tsvector('simple', description || ' ' || coalesce(notes, ''))"
+TRIGRAM_INDEX = "ix_transactions_description_trgm"
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # A table partitioned before this revision may already have them
+    op.execute(f"CREATE INDEX IF NOT EXISTS ix_transactions_search ON transactions USING gin (({SEARCH_DOCUMENT}))")
+    available = bind.execute(sa.text("SELECT EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm')")).scalar()
+    if available:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(f"CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} ON transactions USING gin (description gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    op.execute(f"DROP INDEX IF EXISTS {TRIGRAM_INDEX}")
+    op.execute("DROP INDEX IF EXISTS ix_transactions_search")
@@ -0,0 +1,51 @@
+"""reject overlapping budgets in the database
+
+Where the btree_gist extension can be installed, an exclusion constraint
+over (user_id, category, the inclusive date range); otherwise a trigger
+that probes the composite budgets index under a per-(user, category)
+advisory lock. Either way violations name budgets_no_overlap. Existing
+overlapping budgets must be fixed first. (SQLite databases get their
+triggers from create_all.)
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.budget import OVERLAP_CONSTRAINT, create_overlap_guard
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OVERLAPPING = """
+SELECT count(*) FROM (
+    SELECT end_date, lead(start_date) OVER (PARTITION BY user_id, category ORDER BY start_date) AS next_start
+    FROM budgets
+) ordered
+WHERE next_start <= end_date
+"""
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    overlapping = bind.execute(sa.text(OVERLAPPING)).scalar()
+    if overlapping:
+        raise RuntimeError(f"{overlapping} budgets overlap the next one of their category; fix them before upgrading")
+    available = bind.execute(sa.text("SELECT EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'btree_gist')")).scalar()
+    if available:
+        op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    create_overlap_guard(bind)
+
+
+def downgrade() -> None:
+    op.execute(f"ALTER TABLE budgets DROP CONSTRAINT IF EXISTS {OVERLAP_CONSTRAINT}")
+    op.execute(f"DROP TRIGGER IF EXISTS {OVERLAP_CONSTRAINT} ON budgets")
+    op.execute("DROP FUNCTION IF EXISTS budgets_prevent_overlap()")
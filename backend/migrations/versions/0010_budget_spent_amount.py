@@ -0,0 +1,42 @@
+"""add budgets.spent_amount, maintained on transaction writes
+
+Backfilled from the transactions; app.services.budget_spend keeps it
+current from then on.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL = """
+UPDATE budgets SET spent_amount = (
+    SELECT coalesce(sum(transactions.amount), 0) FROM transactions
+    WHERE transactions.user_id = budgets.user_id
+      AND transactions.category = budgets.category
+      AND transactions.type = 'EXPENSE'
+      AND transactions.date BETWEEN budgets.start_date AND budgets.end_date
+)
+"""
+
+
+def upgrade() -> None:
+    op.add_column(
+        "budgets",
+        sa.Column("spent_amount", sa.Float(), nullable=False, server_default="0"),
+    )
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    op.drop_column("budgets", "spent_amount")
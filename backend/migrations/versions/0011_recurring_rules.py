@@ -0,0 +1,55 @@
+"""recurring_rules table
+
+Recurring transactions whose due occurrences app.services.recurring
+writes to the transactions table.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0011"
+down_revision: Union[str, None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "recurring_rules",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("description", sa.String(), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        # The transactions table's enum type
+        sa.Column("type", postgresql.ENUM("INCOME", "EXPENSE", name="transactiontype", create_type=False), nullable=False),
+        sa.Column("category", sa.String(), nullable=False),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("frequency", sa.Enum("WEEKLY", "MONTHLY", "YEARLY", name="recurrencefrequency"), nullable=False),
+        sa.Column("interval", sa.Integer(), nullable=False),
+        sa.Column("day_of_month", sa.Integer(), nullable=True),
+        sa.Column("start_date", sa.Date(), nullable=False),
+        sa.Column("end_date", sa.Date(), nullable=True),
+        sa.Column("next_date", sa.Date(), nullable=True),
+        sa.Column("materialized_through", sa.Date(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_recurring_rules_next_date", "recurring_rules", ["next_date"])
+    op.create_index("ix_recurring_rules_user_id", "recurring_rules", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_recurring_rules_user_id", table_name="recurring_rules")
+    op.drop_index("ix_recurring_rules_next_date", table_name="recurring_rules")
+    op.drop_table("recurring_rules")
+    sa.Enum(name="recurrencefrequency").drop(op.get_bind(), checkfirst=True)